@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+benchmarks.bench
+~~~~~~~~~~~~~~~~
+
+Times `_walk_size()`, `collect()` and `clean()` on synthetic trees, the
+parallel walker at 1, 2, 4, … threads, plus CLI start-up with a cold /
+warm rule cache.
+
+    python -m benchmarks.bench                       # 10k + 100k files
+    python -m benchmarks.bench --sizes 10k 100k 1M --out bench.json
+    python -m benchmarks.bench --compare baseline.json --threshold 0.15
+
+Results are written as JSON (best-of-N seconds per case).  With --compare
+every case slower than the baseline by more than the threshold is flagged
+and the exit status is 1.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+from sweeper.core.cleaner import clean
+from sweeper.core.collector import _iter_profile_caches, _walk_size, collect
+from sweeper.core.index import ScanIndex
+from sweeper.core.rules import Candidate, Rule
+from sweeper.core.walker import walk_tree
+
+from .synth import Layout, build, layout_of
+
+FORMAT_VERSION = 1
+NOISE_FLOOR = 0.005  # seconds – smaller differences are never regressions
+
+
+def _size_arg(text: str) -> int:
+    text = text.lower()
+    mult = {"k": 1_000, "m": 1_000_000}.get(text[-1], 1)
+    return int(float(text.rstrip("km")) * mult)
+
+
+def _label(n: int) -> str:
+    return f"{n // 1_000_000}M" if n % 1_000_000 == 0 else f"{n // 1_000}k"
+
+
+def _best(fn: Callable[[], object], repeat: int) -> list[float]:
+    runs = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - t0)
+    return runs
+
+
+def _rules(lay: Layout) -> list[Rule]:
+    return [
+        Rule("User Temp", lay.temp),
+        Rule("pip Cache", lay.pip, min_age=7),
+        Rule("Edge Cache", lambda: _iter_profile_caches(lay.edge_base)),
+        Rule("Chrome Cache", lambda: _iter_profile_caches(lay.chrome_base)),
+        Rule("WinSxS (aged)", lay.winsxs, min_age=180, severity="aggressive"),
+    ]
+
+
+def _tree(workdir: Path, files: int, seed: int) -> Layout:
+    """Build (or reuse) the read-only tree for *files*."""
+    root = workdir / f"tree-{_label(files)}-{seed}"
+    marker = root / ".complete"
+    if marker.exists():
+        lay = layout_of(root)
+        for k, v in json.loads(marker.read_text()).items():
+            setattr(lay, k, v)
+        return lay
+    shutil.rmtree(root, ignore_errors=True)
+    lay = build(root, files, seed=seed)
+    marker.write_text(json.dumps({"files": lay.files, "bytes": lay.bytes, "areas": lay.areas}))
+    return lay
+
+
+def bench_size(workdir: Path, files: int, repeat: int, seed: int) -> dict[str, list[float]]:
+    out: dict[str, list[float]] = {}
+    lay = _tree(workdir, files, seed)
+    tag = _label(files)
+    print(f"· {tag}: {lay.files:,} files", file=sys.stderr)
+
+    out[f"walk/edge@{tag}"] = _best(lambda: _walk_size(lay.edge_base, cutoff=None), repeat)
+    out[f"walk/winsxs@{tag}"] = _best(lambda: _walk_size(lay.winsxs, cutoff=None), repeat)
+    out[f"walk/all@{tag}"] = _best(lambda: _walk_size(lay.root, cutoff=None), repeat)
+    # 1 -> N scaling of the work-stealing walker, fanned out from the start
+    n = 1
+    while n <= (os.cpu_count() or 1):
+        out[f"walk/threads{n}@{tag}"] = _best(
+            lambda: walk_tree(lay.root, threads=n, parallel_after=0), repeat)
+        n *= 2
+
+    rules = _rules(lay)
+    every = {"safe", "moderate", "aggressive"}
+    out[f"collect/serial@{tag}"] = _best(lambda: collect(rules, include=every), repeat)
+    out[f"collect/workers4@{tag}"] = _best(
+        lambda: collect(rules, include=every, workers=4), repeat)
+
+    db = workdir / f"index-{tag}.sqlite3"
+    for stale in workdir.glob(f"index-{tag}.sqlite3*"):
+        stale.unlink()
+    with ScanIndex(db) as index:
+        out[f"collect/index-cold@{tag}"] = _best(
+            lambda: collect(rules, include=every, index=index), 1)
+        index.flush()
+        out[f"collect/index-warm@{tag}"] = _best(
+            lambda: collect(rules, include=every, index=index), repeat)
+
+    # clean: destructive, so every run gets a fresh copy of the loose areas
+    runs = []
+    for i in range(repeat):
+        scratch = workdir / f"clean-{tag}-{i}"
+        shutil.rmtree(scratch, ignore_errors=True)
+        victim = build(scratch, files, seed=seed, areas=("temp", "edge"))
+        cands = [Candidate(Rule("bench", victim.local), victim.local, victim.bytes)]
+        runs += _best(lambda: clean(cands, echo=False), 1)
+        shutil.rmtree(scratch, ignore_errors=True)
+    out[f"clean/loose@{tag}"] = runs
+    return out
+
+
+def bench_startup(workdir: Path, repeat: int) -> dict[str, list[float]]:
+    """Interpreter + CLI import + load_rules(), cold and warm rule cache."""
+    home = workdir / "home"
+    env = {**os.environ, "HOME": str(home), "USERPROFILE": str(home)}
+    code = "import sweeper.cli.review; from sweeper.core.rules import load_rules; load_rules()"
+    cmd = [sys.executable, "-c", code]
+    repo = Path(__file__).resolve().parent.parent
+
+    def run():
+        subprocess.run(cmd, env=env, cwd=repo, check=True, capture_output=True)
+
+    cold = []
+    for _ in range(repeat):
+        shutil.rmtree(home, ignore_errors=True)
+        cold += _best(run, 1)
+    return {"startup/cold": cold, "startup/warm": _best(run, repeat)}
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Print a comparison table; return the names of regressed cases."""
+    regressed = []
+    print(f"{'case':<28}{'baseline':>10}{'now':>10}{'ratio':>8}")
+    for name, now in sorted(results["results"].items()):
+        old = baseline.get("results", {}).get(name)
+        if old is None:
+            print(f"{name:<28}{'–':>10}{now['best']:>10.4f}")
+            continue
+        ratio = now["best"] / old["best"] if old["best"] else float("inf")
+        bad = ratio > 1 + threshold and now["best"] - old["best"] > NOISE_FLOOR
+        flag = "  ← REGRESSION" if bad else ""
+        print(f"{name:<28}{old['best']:>10.4f}{now['best']:>10.4f}{ratio:>8.2f}{flag}")
+        if bad:
+            regressed.append(name)
+    return regressed
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.bench", description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", nargs="+", type=_size_arg, default=[10_000, 100_000],
+                    metavar="N", help="file counts, e.g. 10k 100k 1M (default: 10k 100k)")
+    ap.add_argument("--repeat", type=int, default=3, help="runs per case (best is kept)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--workdir", type=Path,
+                    help="where trees are generated; reused between runs if given")
+    ap.add_argument("--out", type=Path, help="write results JSON here")
+    ap.add_argument("--compare", type=Path, metavar="BASELINE",
+                    help="flag regressions against a previous results JSON")
+    ap.add_argument("--threshold", type=float, default=0.15,
+                    help="allowed slow-down before a case is flagged (default: 0.15)")
+    ap.add_argument("--no-startup", action="store_true", help="skip start-up timings")
+    args = ap.parse_args(argv)
+
+    workdir = args.workdir or Path(tempfile.mkdtemp(prefix="sweeper-bench-"))
+    workdir.mkdir(parents=True, exist_ok=True)
+    raw: dict[str, list[float]] = {}
+    try:
+        if not args.no_startup:
+            raw.update(bench_startup(workdir, args.repeat))
+        for n in args.sizes:
+            raw.update(bench_size(workdir, n, args.repeat, args.seed))
+    finally:
+        if args.workdir is None:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    results = {
+        "version": FORMAT_VERSION,
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "when": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "sizes": args.sizes,
+            "seed": args.seed,
+        },
+        "results": {k: {"best": min(v), "runs": v} for k, v in raw.items()},
+    }
+    if args.out:
+        args.out.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        return 1 if compare(results, baseline, args.threshold) else 0
+    for name, r in sorted(results["results"].items()):
+        print(f"{name:<28}{r['best']:>10.4f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
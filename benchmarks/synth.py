@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+benchmarks.synth
+~~~~~~~~~~~~~~~~
+
+Deterministic synthetic filesystems for the benchmark suite.
+
+`build(root, files)` lays out a fake machine under *root*:
+
+• LOCAL/Microsoft/Edge + LOCAL/Google/Chrome "User Data" profiles whose
+  Cache/Cache_Data and Code Cache folders hold many small files
+• Windows/WinSxS – deep component trees, a share of files hard-linked
+• LOCAL/Temp and LOCAL/pip/Cache – flat-ish trees of loose files
+
+Every file gets an mtime spread over the last 400 days so `min_age`
+cut-offs split the trees.  Files are created sparse (truncate), so the
+apparent sizes are realistic without filling the disk.
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+DAY = 86_400
+MAX_AGE_DAYS = 400
+
+# share of the requested file count per area
+SPLIT = {"edge": 0.30, "chrome": 0.25, "winsxs": 0.25, "temp": 0.10, "pip": 0.10}
+
+
+@dataclass
+class Layout:
+    root: Path
+    local: Path
+    winsxs: Path
+    temp: Path
+    pip: Path
+    edge_base: Path
+    chrome_base: Path
+    files: int = 0     # hard links included
+    bytes: int = 0     # apparent bytes of distinct files
+    areas: dict[str, int] = field(default_factory=dict)  # files per area
+
+
+class _Writer:
+    def __init__(self, layout: Layout, rng: random.Random, now: float):
+        self.layout = layout
+        self.rng = rng
+        self.now = now
+
+    def mkdir(self, d: Path) -> Path:
+        d.mkdir(parents=True, exist_ok=True)
+        return d
+
+    def file(self, p: Path, size: int) -> None:
+        with open(p, "wb") as fh:
+            if size:
+                fh.truncate(size)
+        age = self.rng.random() * MAX_AGE_DAYS * DAY
+        os.utime(p, (self.now - age, self.now - age))
+        self.layout.files += 1
+        self.layout.bytes += size
+
+    def small(self) -> int:
+        # browser caches: mostly a few KB, a long tail up to ~1 MB
+        return int(self.rng.lognormvariate(8.5, 1.3)) % (1 << 20)
+
+
+def _browser(w: _Writer, base: Path, n: int) -> None:
+    profiles = ["Default"] + [f"Profile {i}" for i in range(1, 4)]
+    per = max(1, n // len(profiles))
+    left = n
+    for prof in profiles:
+        take = min(per, left) if prof != profiles[-1] else left
+        left -= take
+        cache = w.mkdir(base / prof / "Cache" / "Cache_Data")
+        code = w.mkdir(base / prof / "Code Cache" / "js")
+        n_code = take // 5
+        for i in range(take - n_code):
+            w.file(cache / f"f_{i:06x}", w.small())
+        for i in range(n_code):
+            w.file(code / f"{i:016x}_0", w.small())
+        w.mkdir(base / prof / "Network")  # non-cache sibling
+
+
+def _winsxs(w: _Writer, base: Path, n: int) -> None:
+    rng = w.rng
+    made: list[Path] = []
+    i = 0
+    comp = 0
+    while i < n:
+        d = base / f"amd64_component-{comp:05d}_31bf3856ad364e35_10.0.{rng.randrange(19041, 22631)}"
+        for depth in range(rng.randint(1, 5)):
+            d = d / f"sub{depth}"
+        w.mkdir(d)
+        comp += 1
+        for _ in range(min(rng.randint(1, 12), n - i)):
+            p = d / f"file{i:07d}.dll"
+            if made and rng.random() < 0.3:
+                try:
+                    os.link(rng.choice(made), p)  # WinSxS is mostly hard links
+                    w.layout.files += 1
+                    i += 1
+                    continue
+                except OSError:
+                    pass
+            w.file(p, rng.randrange(4096, 2 << 20))
+            made.append(p)
+            i += 1
+
+
+def _loose(w: _Writer, base: Path, n: int, fanout: int) -> None:
+    made: set[Path] = set()
+    for i in range(n):
+        d = base / f"d{(i // fanout) % 97:02d}" / f"{i // (fanout * 97):03d}"
+        if d not in made:
+            made.add(w.mkdir(d))
+        w.file(d / f"tmp{i:07d}.tmp", w.small())
+
+
+def layout_of(root: Path) -> Layout:
+    """Paths of the synthetic machine under *root* (nothing is created)."""
+    root = Path(root)
+    local = root / "LOCAL"
+    return Layout(
+        root=root,
+        local=local,
+        winsxs=root / "Windows" / "WinSxS",
+        temp=local / "Temp",
+        pip=local / "pip" / "Cache",
+        edge_base=local / "Microsoft" / "Edge" / "User Data",
+        chrome_base=local / "Google" / "Chrome" / "User Data",
+    )
+
+
+def build(root: Path, files: int, *, seed: int = 0,
+          areas: tuple[str, ...] = tuple(SPLIT)) -> Layout:
+    """Create a synthetic machine with *files* files under *root*.
+
+    *areas* restricts the layout to some of SPLIT's keys; the file count is
+    then shared between those areas only.
+    """
+    layout = layout_of(root)
+    w = _Writer(layout, random.Random(seed), time.time())
+    weight = sum(SPLIT[a] for a in areas)
+    counts = {a: int(files * SPLIT[a] / weight) for a in areas}
+    counts[areas[0]] += files - sum(counts.values())
+
+    for area, n in counts.items():
+        before = layout.files
+        if area == "edge":
+            _browser(w, layout.edge_base, n)
+        elif area == "chrome":
+            _browser(w, layout.chrome_base, n)
+        elif area == "winsxs":
+            _winsxs(w, layout.winsxs, n)
+        elif area == "temp":
+            _loose(w, layout.temp, n, fanout=40)
+        else:
+            _loose(w, layout.pip, n, fanout=200)
+        layout.areas[area] = layout.files - before
+    return layout
@@ -7,17 +7,162 @@ Command-line entry point that mimics the old monolithic script:
 * report  – show everything
 * clean   – delete safe + moderate
 * deep    – delete all severities
+* watch   – keep sizes warm in memory for instant reports (`report --cached`)
+* aggregate – merge `--report` files from many hosts into fleet totals
 """
 
 from __future__ import annotations
 
 import argparse
+import functools
+import glob
+import json
+import sys
 import textwrap
+import time
 from typing import Set
 
-from ..core.collector import collect, fmt_sz
-from ..core.cleaner import clean
-from ..core.rules import RULES, SEVERITY_ORDER
+from ..core.collector import collect, fmt_sz, iter_collect, refine
+from ..core.cleaner import REUSE_TREE_NODES, clean, iter_clean, log_sweep
+from ..core.index import open_index
+from ..core.report import WORST_HOSTS, RecordStream, aggregate, write_report
+from ..core.agehist import load_snapshot, save_snapshot
+from ..core.rules import SEVERITY_ORDER, Candidate, load_rules, load_settings, parse_size
+from ..core.sizetree import DEFAULT_MAX_NODES, SizeTree
+from ..core.stats import SweepStats
+from ..core.throttle import Limits, Throttle, lower_priority
+from ..core.topn import TopN
+from ..core.watch import DEFAULT_INTERVAL, Watcher, query
+
+
+def _positive_int(text: str) -> int:
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError("must be >= 1")
+    return value
+
+
+def _days(text: str) -> int:
+    value = int(text)
+    if value < 0:
+        raise argparse.ArgumentTypeError("must be >= 0")
+    return value
+
+
+def _size(text: str) -> int:
+    try:
+        return parse_size(text)
+    except ValueError as err:
+        raise argparse.ArgumentTypeError(str(err)) from None
+
+
+def _positive_float(text: str) -> float:
+    value = float(text)
+    if value <= 0:
+        raise argparse.ArgumentTypeError("must be > 0")
+    return value
+
+
+def _auto_clean(text: str) -> tuple[str, int]:
+    label, sep, size = text.rpartition("=")
+    if not sep or not label:
+        raise argparse.ArgumentTypeError("expected LABEL=SIZE, e.g. \"User Temp=2G\"")
+    return label, _size(size)
+
+
+def _print_tree(tree: SizeTree, depth: int, limit: int = 10) -> None:
+    """Biggest sub-folders first, *limit* per level."""
+    for level, node in tree.walk(depth, limit):
+        print(f"{'':>13}{'  ' * level}{fmt_sz(tree.size[node]):>9}  {tree.name(node)}")
+    if tree.truncated:
+        print(f"{'':>15}(tree truncated at {len(tree):,} folders)")
+
+
+def _print_top(top: TopN) -> None:
+    for title, items in (("largest folders", top.dirs), ("largest files", top.files)):
+        if items:
+            print(f"{'':>13}{title}:")
+            for size, path in items:
+                print(f"{'':>15}{fmt_sz(size):>9}  {path}")
+
+
+def _print_table(args: argparse.Namespace, cands: list[Candidate], note: str) -> None:
+    total = sum(c.size for c in cands)
+    print("Disk-cleanup review")
+    if args.links:
+        note = f" | Allocated: {fmt_sz(sum(c.alloc or 0 for c in cands))}" + note
+    print(f"Mode: {args.mode} | Candidates: {len(cands)} | Potential space: {fmt_sz(total)}"
+          + note)
+    print("—" * 88)
+    for c in sorted(cands, key=lambda c: (SEVERITY_ORDER[c.rule.severity], -c.size)):
+        reason = textwrap.shorten(c.rule.reason, width=48, placeholder="…")
+        est = c.estimate is not None and not c.estimate.exact
+        size = ("≈" if est else "") + fmt_sz(c.size)
+        print(f"{size:>9}  {c.rule.label:<22} {c.rule.severity:<10} {reason}")
+        print(f"{'':>13}{c.path}")
+        if c.alloc is not None:
+            print(f"{'':>13}{fmt_sz(c.alloc)} allocated, hard links counted once")
+        if est:
+            print(f"{'':>13}estimated {fmt_sz(c.estimate.low)} – {fmt_sz(c.estimate.high)}"
+                  f" from {c.estimate.probes} probes")
+        if args.tree and c.tree is not None:
+            _print_tree(c.tree, args.tree)
+        if args.top and c.top is not None:
+            _print_top(c.top)
+    print("—" * 88)
+
+
+def _limits(args: argparse.Namespace) -> Limits:
+    """The YAML `settings:` limits, overridden by any CLI flag given."""
+    limits = Limits.from_settings(load_settings())
+    for name in ("stat_rate", "unlink_rate", "delete_rate"):
+        if getattr(args, name) is not None:
+            setattr(limits, name, getattr(args, name))
+    limits.low_priority = limits.low_priority or args.low_priority
+    return limits
+
+
+def _aged(c: Candidate, min_age: int | None) -> Candidate:
+    """*c* sized – and cut off for deletion – as of --min-age, if given."""
+    return c if min_age is None or c.hist is None else c.at_min_age(min_age)
+
+
+def _scan(args: argparse.Namespace, include: Set[str], stats: SweepStats | None,
+          throttle: Throttle | None, out: RecordStream | None = None) -> list[Candidate]:
+    """Walk every rule; roots below min_size are kept for the snapshot.
+
+    With *out* progress and every shown candidate are streamed as they
+    come in, finished walks first.
+    """
+    index = None if args.no_cache else open_index()
+    if index is not None and args.rebuild_index:
+        index.clear()
+    # trees let partial cleans skip what the scan found nothing in
+    opts = dict(include=include, workers=args.workers, index=index, stats=stats,
+                tree_nodes=DEFAULT_MAX_NODES if args.tree else 0,
+                clean_nodes=REUSE_TREE_NODES if args.mode in ("clean", "deep") else 0,
+                top_n=args.top or 0,
+                ages=not args.estimate, keep_small=True, estimate=args.estimate,
+                links=args.links, one_fs=args.one_filesystem, throttle=throttle)
+    try:
+        if out is None:
+            scanned = collect(load_rules(), **opts)
+        else:
+            scanned = []
+            for c in iter_collect(load_rules(), progress=out.progress, ordered=False, **opts):
+                scanned.append(c)
+                c = _aged(c, args.min_age)
+                if c.size >= c.rule.min_size:
+                    out.candidate(c)
+    finally:
+        if index is not None:
+            index.close()
+    if not args.estimate:
+        try:
+            save_snapshot(scanned)
+        except OSError:
+            pass
+    return scanned
 
 
 def _parse_args() -> argparse.Namespace:
@@ -29,14 +174,213 @@ def _parse_args() -> argparse.Namespace:
         "mode",
         nargs="?",
         default="report",
-        choices=["report", "clean", "deep"],
-        help="report (dry-run) | clean (safe + moderate) | deep (all severities)",
+        choices=["report", "clean", "deep", "watch", "aggregate"],
+        help="report (dry-run) | clean (safe + moderate) | deep (all severities) | "
+             "watch (keep sizes warm until Ctrl+C) | aggregate (merge REPORT files)",
+    )
+    ap.add_argument(
+        "reports",
+        nargs="*",
+        metavar="REPORT",
+        help="aggregate: report files written with --report (.gz allowed, globs "
+             "expanded)",
+    )
+    ap.add_argument(
+        "-j", "--workers",
+        type=_positive_int,
+        default=1,
+        metavar="N",
+        help="size rule paths on N threads at once (default: 1)",
+    )
+    ap.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="ignore the scan index and walk every tree in full",
+    )
+    ap.add_argument(
+        "--rebuild-index",
+        action="store_true",
+        help="drop the scan index before scanning",
+    )
+    ap.add_argument(
+        "--cached",
+        action="store_true",
+        help="report from the last scan snapshot (kept warm by `watch`) without walking",
+    )
+    ap.add_argument(
+        "--port",
+        type=_positive_int,
+        metavar="N",
+        help="watch: answer report queries on localhost:N | report: ask that watcher",
+    )
+    ap.add_argument(
+        "--interval",
+        type=_positive_float,
+        default=DEFAULT_INTERVAL,
+        metavar="SECONDS",
+        help=f"watch: seconds between refreshes (default: {DEFAULT_INTERVAL:g})",
+    )
+    ap.add_argument(
+        "--auto-clean",
+        type=_auto_clean,
+        action="append",
+        metavar="LABEL=SIZE",
+        help="watch: delete a rule's candidate once it reaches SIZE (e.g. "
+             "\"User Temp=2G\"); repeatable",
+    )
+    ap.add_argument(
+        "--estimate",
+        action="store_true",
+        help="sample big trees instead of walking them; clean / deep walk the "
+             "estimated candidates exactly before deleting",
+    )
+    ap.add_argument(
+        "--links",
+        action="store_true",
+        help="count hard-linked files once per candidate and show allocated size "
+             "(lists every directory – the scan index is not used)",
+    )
+    ap.add_argument(
+        "-x", "--one-filesystem",
+        action="store_true",
+        help="do not descend into directories on other filesystems",
+    )
+    ap.add_argument(
+        "--min-age",
+        type=_days,
+        metavar="DAYS",
+        help="count only bytes older than DAYS for every rule; a report reuses "
+             "the last scan instead of walking again",
+    )
+    ap.add_argument(
+        "--tree",
+        type=_positive_int,
+        metavar="DEPTH",
+        help="break every candidate down by sub-folder, DEPTH levels deep",
+    )
+    ap.add_argument(
+        "--top",
+        type=_positive_int,
+        metavar="N",
+        help="list the N largest files and sub-folders of every candidate",
+    )
+    ap.add_argument(
+        "--stat-rate",
+        type=_positive_float,
+        metavar="N",
+        help="at most N stat calls per second while scanning (all threads)",
+    )
+    ap.add_argument(
+        "--unlink-rate",
+        type=_positive_float,
+        metavar="N",
+        help="at most N files / folders removed per second",
+    )
+    ap.add_argument(
+        "--delete-rate",
+        type=_size,
+        metavar="SIZE",
+        help="at most SIZE bytes deleted per second (e.g. 50M)",
+    )
+    ap.add_argument(
+        "--low-priority",
+        action="store_true",
+        help="run at background CPU and I/O priority",
+    )
+    ap.add_argument(
+        "--format",
+        choices=["table", "ndjson"],
+        default="table",
+        help="table (default) | ndjson: one flushed JSON record per candidate as it is "
+             "sized, plus progress and summary records, on stdout",
     )
-    return ap.parse_args()
+    ap.add_argument(
+        "--report",
+        metavar="FILE",
+        help="also write a machine-readable report (NDJSON, .gz allowed) to FILE",
+    )
+    ap.add_argument(
+        "--worst",
+        type=_positive_int,
+        default=WORST_HOSTS,
+        metavar="N",
+        help=f"aggregate: list the N hosts with most potential space (default: {WORST_HOSTS})",
+    )
+    ap.add_argument(
+        "--json",
+        action="store_true",
+        help="aggregate: print the fleet totals as JSON",
+    )
+    ap.add_argument(
+        "--stats",
+        action="store_true",
+        help="print per-rule scan / sweep instrumentation",
+    )
+    ap.add_argument(
+        "--stats-json",
+        metavar="FILE",
+        help="write the per-rule instrumentation as JSON to FILE",
+    )
+    args = ap.parse_args()
+    if args.estimate and (args.min_age is not None or args.tree or args.top or args.links):
+        ap.error("--estimate cannot be combined with --min-age, --tree, --top or --links")
+    if args.auto_clean and args.mode != "watch":
+        ap.error("--auto-clean only applies to watch mode")
+    if (args.mode == "aggregate") != bool(args.reports):
+        ap.error("REPORT files go with (and only with) aggregate mode")
+    return args
+
+
+def _watch(args: argparse.Namespace, throttle: Throttle | None) -> None:
+    """Refresh until Ctrl+C, one status line per pass."""
+    watcher = Watcher(load_rules, interval=args.interval, workers=args.workers,
+                      auto_clean=dict(args.auto_clean or ()), throttle=throttle,
+                      one_fs=args.one_filesystem)
+
+    def status(w: Watcher) -> None:
+        shown = [c for c in w.candidates if c.size >= c.rule.min_size]
+        rs = w.stats.rules.values()
+        listed = sum(r.dirs for r in rs) + sum(r.paths for r in rs) - sum(r.cached for r in rs)
+        line = (f"{time.strftime('%H:%M:%S')}  pass {w.refreshes}: {len(shown)} candidates,"
+                f" {fmt_sz(sum(c.size for c in shown))} potential"
+                f" ({time.time() - w.when:.1f} s, {max(0, listed):,} folders listed)")
+        for res in w.cleaned:
+            line += f"\n{'':>10}auto-cleaned {res.candidate.rule.label}: {fmt_sz(res.freed)}"
+        print(line, flush=True)
+
+    if args.port is not None:
+        watcher.serve(args.port)
+        print(f"Answering report queries on localhost:{args.port}")
+    print(f"Watching every {args.interval:g} s – Ctrl+C to stop")
+    try:
+        watcher.run(status)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
 
 
 def main() -> None:
     args = _parse_args()
+    if args.mode == "aggregate":
+        # patterns are expanded here too: cmd.exe does not, and thousands of
+        # names would overflow the command line anyway
+        paths = (p for pat in args.reports for p in sorted(glob.glob(pat)) or [pat])
+        agg = aggregate(paths, worst=args.worst)
+        print(json.dumps(agg.to_dict(), indent=2) if args.json else agg.format_table())
+        return
+    ndjson = args.format == "ndjson"
+    say = functools.partial(print, file=sys.stderr) if ndjson else print  # keep stdout JSON
+    try:
+        limits = _limits(args)
+    except ValueError as err:
+        sys.exit(f"disk-sweeper: {err}")
+    if limits.low_priority and not lower_priority():
+        say("⚠️  Could not lower the process priority")
+    throttle = limits.throttle()
+    if args.mode == "watch":
+        _watch(args, throttle)
+        return
 
     if args.mode == "report":
         include: Set[str] = {"safe", "moderate", "aggressive"}
@@ -46,21 +390,73 @@ def main() -> None:
         include = {"safe", "moderate", "aggressive"}
 
     destructive = args.mode in {"clean", "deep"}
-    cands = collect(RULES, include=include)
-    total = sum(c.size for c in cands)
+    stats = SweepStats() if args.stats or args.stats_json or args.report else None
+    snap, note = None, ""
+    t0 = time.time()
+    if (args.cached or args.port is not None or args.min_age is not None) and not (
+            destructive or args.tree or args.top or args.links or args.one_filesystem):
+        # deletes always follow a fresh scan
+        snap = query(args.port) if args.port is not None else load_snapshot()
+        if snap is None and args.port is not None:
+            say(f"⚠️  No watcher answering on localhost:{args.port} – scanning instead")
+    out = None
+    if snap is not None:
+        when, scanned = snap
+        scanned = [c for c in scanned if c.rule.severity in include]
+        note = f" | From scan of {time.strftime('%Y-%m-%d %H:%M', time.localtime(when))}"
+        cands = [c for c in map(functools.partial(_aged, min_age=args.min_age), scanned)
+                 if c.size >= c.rule.min_size]
+        if ndjson:
+            out = RecordStream(sys.stdout, when=when, stats=stats)
+            for c in cands:
+                out.candidate(c)
+    else:
+        when = t0
+        if ndjson:
+            out = RecordStream(sys.stdout, when=when, stats=stats)
+        scanned = _scan(args, include, stats, throttle, out)
+        cands = [c for c in map(functools.partial(_aged, min_age=args.min_age), scanned)
+                 if c.size >= c.rule.min_size]
+    elapsed = time.time() - t0
+    if out is not None:
+        out.scan(cands, elapsed)
+    else:
+        _print_table(args, cands, note)
+    if args.report:
+        try:
+            write_report(cands, args.report, when=when, elapsed=elapsed, stats=stats)
+        except OSError as exc:
+            say(f"⚠️  Could not write the report: {exc}")
 
-    print("Disk-cleanup review")
-    print(f"Mode: {args.mode} | Candidates: {len(cands)} | Potential space: {fmt_sz(total)}")
-    print("—" * 88)
-    for c in sorted(cands, key=lambda c: (SEVERITY_ORDER[c.rule.severity], -c.size)):
-        reason = textwrap.shorten(c.rule.reason, width=48, placeholder="…")
-        print(f"{fmt_sz(c.size):>9}  {c.rule.label:<22} {c.rule.severity:<10} {reason}")
-        print(f"{'':>13}{c.path}")
-    print("—" * 88)
+    rough = [c for c in cands if c.estimate is not None and not c.estimate.exact]
+    if destructive and rough:
+        say(f"\nWalking {len(rough)} estimated candidate(s) exactly…")
+        exact = dict(zip(map(id, rough), refine(rough, workers=args.workers, stats=stats,
+                                                one_fs=args.one_filesystem,
+                                                throttle=throttle)))
+        cands = [exact.get(id(c), c) for c in cands]
+        cands = [c for c in cands if c.size >= c.rule.min_size]
 
     if destructive and cands:
-        print("\nCleaning selected candidates…")
-        clean(cands)
+        if out is None:
+            print("\nCleaning selected candidates…")
+            clean(cands, stats=stats, throttle=throttle, one_fs=args.one_filesystem)
+        else:
+            t1 = time.time()
+            results = []
+            for res in iter_clean(cands, stats=stats, throttle=throttle,
+                                  one_fs=args.one_filesystem):
+                results.append(res)
+                out.clean(res)
+            log_sweep(sum(res.freed for res in results))
+            out.sweep(results, time.time() - t1)
+
+    if stats is not None:
+        if args.stats:
+            say()
+            say(stats.format_table())
+        if args.stats_json:
+            stats.write_json(args.stats_json)
 
 
 if __name__ == "__main__":
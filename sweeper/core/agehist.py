@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+sweeper.core.agehist
+~~~~~~~~~~~~~~~~~~~~
+
+Per-candidate histogram of bytes by age in whole days, filled during the
+walk, so "bytes older than N days" is a lookup instead of another scan.
+
+Bucket 0 holds entries not older than the scan (age <= 0); bucket b + 1
+holds ages in (b, b + 1] days, which makes `older_than(n)` match the
+walker's own `mtime < now - n days` cutoff exactly for whole days.  Ages
+beyond MAX_DAYS share the last bucket.  Only non-empty buckets are stored
+(a tree rarely spans more than a few hundred distinct days), and
+`compact()` – run once a walk finishes – turns them into sorted suffix
+sums, so `older_than()` is a bisection and hundreds of thousands of
+candidates stay cheap to hold and re-size.
+
+`save_snapshot()` / `load_snapshot()` keep the histograms of the last
+full scan on disk for `disk-sweeper --min-age N` without a rescan; the
+same document (`snapshot_dict()`) is what a watcher serves on its port.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable
+
+from .rules import LOCAL, Candidate, Rule
+
+if TYPE_CHECKING:
+    from .index import IndexedDir
+
+DAY = 86_400
+MAX_DAYS = 3_650
+LAST_SCAN = LOCAL / "DiskSweeper" / "last_scan.json"
+_SNAPSHOT_VERSION = 2  # 2: rule filters stored
+
+
+class AgeHistogram:
+    """Bytes per day of age, relative to the scan time *now*."""
+
+    def __init__(self, now: float, days: int = MAX_DAYS):
+        self.now = now
+        self.days = days
+        self.buckets: dict[int, int] = {}  # bucket -> bytes, non-empty ones only
+        self._keys: array | None = None    # sorted buckets and their
+        self._older: array | None = None   # suffix sums, see compact()
+
+    def _bucket(self, mtime: float) -> int:
+        age = self.now - mtime
+        if age <= 0:
+            return 0
+        b = int(age // DAY)
+        if b * DAY == age:  # (b - 1, b] days
+            b -= 1
+        return min(b, self.days) + 1
+
+    def add(self, mtime: float, size: int) -> None:
+        if size:
+            b = self._bucket(mtime)
+            self.buckets[b] = self.buckets.get(b, 0) + size
+            self._older = None
+
+    def add_row(self, row: IndexedDir) -> None:
+        """Spread an index row (sorted mtimes, cumulative sizes) by bucket."""
+        mtimes, sizes = row.mtimes, row.sizes
+        i, n, before = 0, len(mtimes), 0
+        while i < n:
+            b = self._bucket(mtimes[i])
+            if b == 0:
+                end = n
+            else:  # bucket b holds now - b days <= mtime < now - (b - 1) days
+                end = max(i + 1, bisect_left(mtimes, self.now - (b - 1) * DAY, i))
+            if sizes[end - 1] != before:
+                self.buckets[b] = self.buckets.get(b, 0) + sizes[end - 1] - before
+            before = sizes[end - 1]
+            i = end
+        self._older = None
+
+    def merge(self, other: AgeHistogram) -> None:
+        """Add the buckets of *other* (same `now` and `days`)."""
+        for b, size in other.buckets.items():
+            self.buckets[b] = self.buckets.get(b, 0) + size
+        self._older = None
+
+    def compact(self) -> None:
+        """Build the suffix sums `older_than()` bisects (else done on its
+        first call); cheap to redo after later adds."""
+        keys = array("i", sorted(self.buckets))
+        acc = array("q", bytes(8 * (len(keys) + 1)))
+        for k in range(len(keys) - 1, -1, -1):
+            acc[k] = acc[k + 1] + self.buckets[keys[k]]
+        self._keys, self._older = keys, acc
+
+    def older_than(self, days: float) -> int:
+        """Bytes older than *days* (everything for days <= 0)."""
+        if self._older is None:
+            self.compact()
+        b = 0 if days <= 0 else min(int(days), self.days) + 1
+        return self._older[bisect_left(self._keys, b)]
+
+    def shifted(self, at: float) -> AgeHistogram:
+        """The same bytes, aged to time *at* (whole days)."""
+        out = AgeHistogram(at, self.days)
+        step = max(0, int((at - self.now) // DAY))
+        for b, size in self.buckets.items():
+            nb = min(b + step if b else step, self.days + 1)  # b 0: ≤ step days
+            out.buckets[nb] = out.buckets.get(nb, 0) + size
+        out.compact()
+        return out
+
+    # persistence ------------------------------------------------------------
+    def to_dict(self) -> dict:
+        return {"now": self.now, "days": self.days,
+                "buckets": {str(b): v for b, v in sorted(self.buckets.items())}}
+
+    @classmethod
+    def from_dict(cls, raw: dict) -> AgeHistogram:
+        hist = cls(raw["now"], raw["days"])
+        hist.buckets = {int(b): v for b, v in raw["buckets"].items() if v}
+        return hist
+
+
+# ── last-scan snapshot ──────────────────────────────────────────────────────
+def snapshot_dict(cands: Iterable[Candidate], when: float | None = None) -> dict:
+    """JSON-ready snapshot of every root with a histogram, scanned at *when*."""
+    items = []
+    for c in cands:
+        if c.hist is None:
+            continue
+        r = c.rule
+        items.append({"label": r.label, "path": str(c.path), "min_size": r.min_size,
+                      "min_age": r.min_age, "severity": r.severity, "reason": r.reason,
+                      "include": r.include, "exclude": r.exclude, "prune": r.prune,
+                      "hist": c.hist.to_dict()})
+    return {"version": _SNAPSHOT_VERSION, "when": time.time() if when is None else when,
+            "candidates": items}
+
+
+def snapshot_from_dict(raw: dict) -> tuple[float, list[Candidate]] | None:
+    """(scan time, candidates) of a `snapshot_dict()` document, or None.
+
+    Histograms are aged to the current time and every candidate's size is
+    its rule's own min_age view.
+    """
+    if raw.get("version") != _SNAPSHOT_VERSION:
+        return None
+    now = time.time()
+    cands = []
+    for item in raw["candidates"]:
+        rule = Rule(item["label"], Path(item["path"]), item["min_size"], item["min_age"],
+                    item["severity"], item["reason"], item["include"], item["exclude"],
+                    item["prune"])
+        hist = AgeHistogram.from_dict(item["hist"]).shifted(now)
+        cands.append(Candidate(rule, rule.path, 0, hist=hist).at_min_age(rule.min_age))
+    return raw["when"], cands
+
+
+def save_snapshot(cands: Iterable[Candidate], path: Path | str = LAST_SCAN,
+                  when: float | None = None) -> None:
+    """Store every scanned root (min_size not applied) with its histogram."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(snapshot_dict(cands, when)), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def load_snapshot(path: Path | str = LAST_SCAN) -> tuple[float, list[Candidate]] | None:
+    """(scan time, candidates) of the last saved scan, or None."""
+    try:
+        raw = json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return snapshot_from_dict(raw)
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+sweeper.core.aio
+~~~~~~~~~~~~~~~~
+
+asyncio counterparts of `iter_collect()` / `collect()` and `iter_clean()` /
+`clean()` for embedding in an event loop.
+
+Each call drives the ordinary blocking engine on one background thread and
+hands its results to the loop through a queue, so sync and async callers
+share every walker and cleaner code path.  Leaving an `async for` early,
+`aclose()`, or cancelling the awaiting task cancels the engine's
+CancelToken (walks stop at their next directory, deletes within one batch)
+and waits for the thread to finish before returning.  Progress events
+are coalesced when the consumer falls behind; candidates and results never
+are.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Any, AsyncIterator, Callable, Iterable, Set
+
+from .cleaner import CleanProgress, CleanResult, iter_clean, log_sweep
+from .collector import ScanProgress, iter_collect
+from .rules import Candidate, Rule
+from .walker import CancelToken
+
+PROGRESS_BACKLOG = 64  # queued progress events beyond which new ones are dropped
+
+_DONE = object()
+
+
+class _Failed:
+    __slots__ = ("exc",)
+
+    def __init__(self, exc: BaseException):
+        self.exc = exc
+
+
+async def _stream(run: Callable[[Callable[[object], None], Callable[[object], None]], None],
+                  stop: CancelToken, limiter: asyncio.Semaphore | None) -> AsyncIterator:
+    """Run *run(emit, offer)* on a thread and yield what it sends.
+
+    *emit* queues an item for certain, *offer* only while fewer than
+    PROGRESS_BACKLOG items wait (progress events).
+    """
+    if limiter is not None:
+        await limiter.acquire()
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    finished = loop.create_future()
+
+    def _offer(item: object) -> None:  # on the loop thread
+        if queue.qsize() < PROGRESS_BACKLOG:
+            queue.put_nowait(item)
+
+    def _finish() -> None:
+        if not finished.done():
+            finished.set_result(None)
+
+    def emit(item: object) -> None:
+        loop.call_soon_threadsafe(queue.put_nowait, item)
+
+    def offer(item: object) -> None:
+        loop.call_soon_threadsafe(_offer, item)
+
+    def work() -> None:
+        try:
+            run(emit, offer)
+        except BaseException as exc:  # re-raised in the consumer
+            emit(_Failed(exc))
+        finally:
+            emit(_DONE)
+            loop.call_soon_threadsafe(_finish)
+
+    thread = threading.Thread(target=work, name="sweeper-aio", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                break
+            if isinstance(item, _Failed):
+                raise item.exc
+            yield item
+    finally:
+        stop.cancel()
+        try:
+            await asyncio.shield(finished)
+            thread.join()  # past its last statement already
+        finally:
+            if limiter is not None:
+                limiter.release()
+
+
+def aiter_collect(
+    rules: Iterable[Rule],
+    *,
+    include: Set[str],
+    workers: int = 1,
+    cancel: CancelToken | None = None,
+    progress: bool = False,
+    limiter: asyncio.Semaphore | None = None,
+    **options: Any,
+) -> AsyncIterator[Candidate | ScanProgress]:
+    """Async `iter_collect()`: yield each Candidate once it is sized.
+
+    With *progress* ScanProgress events are yielded in between.  *workers*
+    bounds the walks run at once by this call; a shared *limiter* bounds
+    calls across the program (it is held for the whole scan).  Other
+    keywords (index, stats, ordered, tree_nodes, top_n, ages, …) go to
+    `iter_collect()` unchanged.
+    """
+    stop = CancelToken(cancel)
+    rules = list(rules)
+
+    def run(emit: Callable[[object], None], offer: Callable[[object], None]) -> None:
+        for cand in iter_collect(rules, include=include, workers=workers, cancel=stop,
+                                 progress=offer if progress else None, **options):
+            emit(cand)
+
+    return _stream(run, stop, limiter)
+
+
+async def acollect(
+    rules: Iterable[Rule],
+    *,
+    include: Set[str],
+    workers: int = 1,
+    cancel: CancelToken | None = None,
+    limiter: asyncio.Semaphore | None = None,
+    **options: Any,
+) -> list[Candidate]:
+    """Async `collect()`; a cancelled scan returns what was found so far."""
+    gen = aiter_collect(rules, include=include, workers=workers, cancel=cancel,
+                        limiter=limiter, **options)
+    try:
+        return [c async for c in gen]
+    finally:
+        await gen.aclose()
+
+
+def aiter_clean(
+    candidates: Iterable[Candidate],
+    *,
+    workers: int = 4,
+    cancel: CancelToken | None = None,
+    progress: bool = False,
+    limiter: asyncio.Semaphore | None = None,
+    **options: Any,
+) -> AsyncIterator[CleanResult | CleanProgress]:
+    """Async `iter_clean()`: yield each CleanResult, plus CleanProgress
+    events with *progress*.  *limiter* and cancellation work as in
+    `aiter_collect()`; other keywords (stats) go to `iter_clean()`."""
+    stop = CancelToken(cancel)
+    candidates = list(candidates)
+
+    def run(emit: Callable[[object], None], offer: Callable[[object], None]) -> None:
+        for res in iter_clean(candidates, workers=workers, cancel=stop,
+                              progress=offer if progress else None, **options):
+            emit(res)
+
+    return _stream(run, stop, limiter)
+
+
+async def aclean(
+    candidates: Iterable[Candidate],
+    *,
+    workers: int = 4,
+    cancel: CancelToken | None = None,
+    limiter: asyncio.Semaphore | None = None,
+    **options: Any,
+) -> int:
+    """Async `clean()` without the console output; returns bytes freed and
+    writes the sweep log like its sync twin."""
+    freed = 0
+    gen = aiter_clean(candidates, workers=workers, cancel=cancel, limiter=limiter,
+                      **options)
+    try:
+        async for res in gen:
+            freed += res.freed
+    finally:
+        await gen.aclose()
+    log_sweep(freed)
+    return freed
@@ -1,40 +1,376 @@
 #!/usr/bin/env python3
 """
 sweeper.core.cleaner – delete helpers + sweep log.
+
+Trees are listed top-down with scandir; files are unlinked in batches on a
+worker pool and directories removed bottom-up once their contents are gone.
+Every candidate yields a CleanResult with what was *actually* freed – a
+hard-linked file only frees its data with the last of its links.
+
+A candidate sized with an age cutoff or include / exclude / prune globs is
+not removed wholesale: only what its scan counted goes (files past the
+scan's cutoff that pass the filters, then the folders this leaves empty),
+so `freed` matches the reported size.  A SizeTree kept by the scan lets
+the sweep skip folders that counted nothing without listing them.  With
+*one_fs* folders on another filesystem than the candidate's root – mount
+points – are left alone, as the one-filesystem scan left them uncounted.
 """
 
 from __future__ import annotations
 
-import shutil
+import errno
+import os
+import stat as st_mod
+import threading
 import time
-from pathlib import Path
-from typing import Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator
 
 from .collector import fmt_sz
+from .inodes import linked
 from .rules import Candidate, LOCAL
+from .walker import CancelToken, PathFilter, _foreign, _rel
 
+if TYPE_CHECKING:
+    from .stats import SweepStats
+    from .throttle import Throttle
 
-def _delete_path(p: Path) -> None:
-    if not p.exists():
-        return
-    if p.is_dir():
-        shutil.rmtree(p, ignore_errors=True)
+BATCH = 256  # unlinks per pool task
+REUSE_TREE_NODES = 100_000  # SizeTree budget a scan keeps for a partial clean
+
+
+@dataclass
+class CleanResult:
+    candidate: Candidate
+    freed: int = 0       # bytes released by successful deletes
+    files: int = 0       # files removed
+    failed: list[tuple[str, str]] = field(default_factory=list)  # (path, reason)
+    elapsed: float = 0.0
+    throttled: float = 0.0  # seconds spent waiting on rate limits
+    cancelled: bool = False
+
+
+@dataclass
+class CleanProgress:
+    candidate: Candidate
+    files: int   # files removed so far in this candidate
+    bytes: int   # bytes freed so far in this candidate
+
+
+ProgressFn = Callable[[CleanProgress], None]
+
+
+def _is_link(st: os.stat_result) -> bool:
+    """Symlinks and Windows junctions are removed, never descended."""
+    if st_mod.S_ISLNK(st.st_mode):
+        return True
+    return bool(getattr(st, "st_file_attributes", 0) & 0x400)  # REPARSE_POINT
+
+
+def _link_dir(entry: os.DirEntry, st: os.stat_result) -> bool:
+    """A junction, or on Windows a directory symlink: removed with rmdir
+    (unlink refuses them), never entered.  *st* is the entry's lstat."""
+    if not _is_link(st):
+        return False
+    return st_mod.S_ISDIR(st.st_mode) or (os.name == "nt" and entry.is_dir())
+
+
+def _reason(err: OSError) -> str:
+    return err.strerror or err.__class__.__name__
+
+
+def _unlink(path: str) -> None:
+    try:
+        os.unlink(path)
+    except PermissionError:
+        os.chmod(path, st_mod.S_IWRITE)  # read-only attribute on Windows
+        os.unlink(path)
+
+
+class _Sweep:
+    """Book-keeping for one candidate; unlink batches run on the pool."""
+
+    def __init__(self, cand: Candidate, cancel: CancelToken,
+                 progress: ProgressFn | None, throttle: Throttle | None = None):
+        self.res = CleanResult(cand)
+        self.cancel = cancel
+        self.progress = progress
+        self.throttle = throttle
+        self.lock = threading.Lock()
+        self.links: dict[tuple[int, int], int] = {}  # (dev, ino) -> links left
+        self.kept = False  # a mount point was left, so its parents stay too
+
+    def freeable(self, path: str, st: os.stat_result) -> int:
+        """Bytes unlinking *path* gives back (listing thread only)."""
+        lst = linked(path, st)
+        if lst is None:
+            return st.st_size
+        key = (lst.st_dev, lst.st_ino)
+        left = self.links.get(key, lst.st_nlink) - 1
+        self.links[key] = left
+        return st.st_size if left <= 0 else 0
+
+    def throttled(self, secs: float) -> None:
+        if secs:
+            with self.lock:
+                self.res.throttled += secs
+
+    def unlink_batch(self, batch: list[tuple[str, int]]) -> None:
+        if self.cancel.cancelled:
+            return
+        freed = removed = 0
+        waited = 0.0
+        failed = []
+        throttle = self.throttle
+        for path, size in batch:
+            if throttle is not None:
+                waited += throttle.unlink(size, self.cancel)
+                if self.cancel.cancelled:
+                    break
+            try:
+                _unlink(path)
+            except FileNotFoundError:
+                continue
+            except OSError as err:
+                failed.append((path, _reason(err)))
+                continue
+            freed += size
+            removed += 1
+        with self.lock:
+            self.res.freed += freed
+            self.res.files += removed
+            self.res.failed.extend(failed)
+            self.res.throttled += waited
+            snap = CleanProgress(self.res.candidate, self.res.files, self.res.freed)
+        if self.progress is not None:
+            self.progress(snap)
+
+
+def _delete(cand: Candidate, pool: ThreadPoolExecutor, cancel: CancelToken,
+            progress: ProgressFn | None, throttle: Throttle | None = None,
+            one_fs: bool = False) -> CleanResult:
+    t0 = time.perf_counter()
+    sweep = _Sweep(cand, cancel, progress, throttle)
+    res = sweep.res
+    top = os.fspath(cand.path)
+    try:
+        st = os.lstat(top)
+    except FileNotFoundError:
+        return res
+    except OSError as err:
+        res.failed.append((top, _reason(err)))
+        return res
+
+    filt = PathFilter.for_rule(cand.rule)
+    partial = cand.cutoff is not None or filt is not None
+    if _is_link(st) or not st_mod.S_ISDIR(st.st_mode):
+        if st_mod.S_ISDIR(st.st_mode):  # directory junction / symlink on Windows
+            try:
+                os.rmdir(top)
+            except OSError as err:
+                res.failed.append((top, _reason(err)))
+        elif cand.cutoff is None or st.st_mtime < cand.cutoff:
+            sweep.unlink_batch([(top, sweep.freeable(top, st))])
+        res.elapsed = time.perf_counter() - t0
+        return res
+
+    dev = st.st_dev if one_fs else None
+    if partial:
+        _sweep_counted(top, cand, filt, pool, sweep, throttle, dev)
     else:
-        p.unlink(missing_ok=True)
+        _sweep_all(top, pool, sweep, throttle, dev)
+    res.cancelled = cancel.cancelled
+    res.elapsed = time.perf_counter() - t0
+    return res
 
 
-def clean(candidates: Iterable[Candidate], *, echo: bool = True) -> int:
-    freed = 0
-    for c in candidates:
-        freed += c.size
-        _delete_path(c.path)
-        if echo:
-            print("✓", fmt_sz(c.size).rjust(8), c.path)
+def _sweep_all(top: str, pool: ThreadPoolExecutor, sweep: _Sweep,
+               throttle: Throttle | None, dev: int | None = None) -> None:
+    res, cancel = sweep.res, sweep.cancel
+    # top-down listing, batched unlinks on the pool
+    dirs: list[tuple[str, int]] = [(top, 0)]  # root's own size is not reported
+    stack = [top]
+    pending: list[Future] = []
+    while stack:
+        if cancel.cancelled:
+            break
+        d = stack.pop()
+        batch: list[tuple[str, int]] = []
+        listed = 0
+        try:
+            with os.scandir(d) as it:
+                for entry in it:
+                    listed += 1
+                    try:
+                        est = entry.stat(follow_symlinks=False)
+                    except OSError as err:
+                        res.failed.append((entry.path, _reason(err)))
+                        continue
+                    if st_mod.S_ISDIR(est.st_mode) and dev is not None and _foreign(est, dev):
+                        sweep.kept = True  # mount point: neither entered nor removed
+                    elif _link_dir(entry, est):
+                        dirs.append((entry.path, 0))  # link: rmdir, target untouched
+                    elif st_mod.S_ISDIR(est.st_mode):
+                        dirs.append((entry.path, est.st_size))
+                        stack.append(entry.path)
+                    else:
+                        batch.append((entry.path, sweep.freeable(entry.path, est)))
+                        if len(batch) >= BATCH:
+                            pending.append(pool.submit(sweep.unlink_batch, batch))
+                            batch = []
+        except OSError as err:
+            res.failed.append((d, _reason(err)))
+        if batch:
+            pending.append(pool.submit(sweep.unlink_batch, batch))
+        if throttle is not None:
+            sweep.throttled(throttle.stats(listed, cancel))
+    for fut in pending:
+        fut.result()
+    _rmdirs(dirs, sweep, throttle)
 
-    if echo:
-        print("≈ Freed", fmt_sz(freed))
 
-    # log
+def _sweep_counted(top: str, cand: Candidate, filt: PathFilter | None,
+                   pool: ThreadPoolExecutor, sweep: _Sweep,
+                   throttle: Throttle | None, dev: int | None = None) -> None:
+    """Remove only what the scan counted, with the walker's own rules.
+
+    Entries are judged by their mtime against the scan's cutoff, so files
+    that aged since the report are left alone too.  Folders are removed
+    once empty (the root stays) and report their size only if the scan
+    counted them.  With a finished SizeTree a folder that counted nothing
+    is not entered, and – unless the tree was truncated – neither is one
+    that did not exist at scan time.  Junctions and folder links are
+    removed, never entered, as in a full sweep.
+    """
+    res, cancel, cutoff = sweep.res, sweep.cancel, cand.cutoff
+    uses_rel = filt is not None and filt.uses_rel
+    count_dirs = filt is None or filt.count_dirs
+    tree = cand.tree if cand.tree is not None and cand.tree.finished else None
+    complete = tree is not None and not tree.truncated
+    dirs: list[tuple[str, int]] = []
+    stack: list[tuple[str, str, int | None]] = [(top, "", 0 if tree is not None else None)]
+    pending: list[Future] = []
+    while stack:
+        if cancel.cancelled:
+            break
+        d, rel, node = stack.pop()
+        kids = {tree.name(k): k for k in tree.children(node)} if node is not None else None
+        batch: list[tuple[str, int]] = []
+        listed = 0
+        try:
+            with os.scandir(d) as it:
+                for entry in it:
+                    listed += 1
+                    try:
+                        lst = entry.stat(follow_symlinks=False)
+                    except OSError:
+                        continue  # not counted by the scan either
+                    sub_rel = _rel(rel, entry.name) if uses_rel else ""
+                    is_dir = st_mod.S_ISDIR(lst.st_mode)
+                    if is_dir and dev is not None and _foreign(lst, dev):
+                        continue  # another filesystem, not counted by the scan
+                    if _link_dir(entry, lst):
+                        if filt is None or not filt.prune_dir(entry.name, sub_rel):
+                            dirs.append((entry.path, 0))  # link: rmdir, target untouched
+                        continue
+                    try:
+                        st = entry.stat()  # as the walker saw it
+                    except OSError:
+                        continue
+                    old = cutoff is None or st.st_mtime < cutoff
+                    if is_dir:
+                        if filt is not None and filt.prune_dir(entry.name, sub_rel):
+                            continue
+                        kid = kids.get(entry.name) if kids is not None else None
+                        if kid is None and complete:
+                            continue  # created after the scan
+                        if kid is not None and not tree.size[kid]:
+                            continue  # counted nothing
+                        dirs.append((entry.path, st.st_size if count_dirs and old else 0))
+                        stack.append((entry.path, sub_rel, kid))
+                        continue
+                    if not old or (filt is not None and not filt.keep_file(entry.name, sub_rel)):
+                        continue
+                    # freed is what unlinking gives back: a symlink's own size
+                    batch.append((entry.path, sweep.freeable(entry.path, lst)))
+                    if len(batch) >= BATCH:
+                        pending.append(pool.submit(sweep.unlink_batch, batch))
+                        batch = []
+        except OSError as err:
+            res.failed.append((d, _reason(err)))
+        if batch:
+            pending.append(pool.submit(sweep.unlink_batch, batch))
+        if throttle is not None:
+            sweep.throttled(throttle.stats(listed, cancel))
+    for fut in pending:
+        fut.result()
+    _rmdirs(dirs, sweep, throttle, keep_full=True)
+
+
+def _rmdirs(dirs: list[tuple[str, int]], sweep: _Sweep, throttle: Throttle | None,
+            keep_full: bool = False) -> None:
+    """Remove *dirs* bottom-up (children were listed after their parents);
+    with *keep_full* a folder still holding entries is no failure."""
+    res, cancel = sweep.res, sweep.cancel
+    if cancel.cancelled:
+        return
+    for d, size in reversed(dirs):
+        if throttle is not None:
+            sweep.throttled(throttle.unlink(0, cancel))
+            if cancel.cancelled:
+                break
+        try:
+            os.rmdir(d)
+        except FileNotFoundError:
+            continue
+        except OSError as err:
+            if err.errno in (errno.ENOTEMPTY, errno.EEXIST) and (
+                    keep_full or sweep.kept or res.failed):
+                continue  # kept content / a failed child already explains this one
+            res.failed.append((d, _reason(err)))
+            continue
+        res.freed += size
+
+
+def iter_clean(
+    candidates: Iterable[Candidate],
+    *,
+    workers: int = 4,
+    cancel: CancelToken | None = None,
+    progress: ProgressFn | None = None,
+    stats: SweepStats | None = None,
+    throttle: Throttle | None = None,
+    one_fs: bool = False,
+) -> Iterator[CleanResult]:
+    """Delete each candidate and yield its CleanResult.
+
+    Unlinks are spread over *workers* threads in batches of BATCH files.
+    *cancel* is checked before every directory and batch, so a cancel takes
+    effect within one batch; *progress* (called from pool threads) gets the
+    running file / byte counts of the current candidate.  *stats* gets a
+    per-rule summary of every result.  A *throttle* paces the listing stat
+    calls, the removals and the bytes freed (shared by all threads).
+    *one_fs* leaves folders on other filesystems than each candidate's root
+    untouched; it should match the scan that found the candidates.
+    """
+    stop = CancelToken(cancel)
+    t0 = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            for c in candidates:
+                if stop.cancelled:
+                    return
+                res = _delete(c, pool, stop, progress, throttle, one_fs)
+                if stats is not None:
+                    stats.add_clean(res)
+                yield res
+    finally:
+        if stats is not None:
+            stats.clean_wall += time.perf_counter() - t0
+
+
+def log_sweep(freed: int) -> None:
     try:
         log_dir = LOCAL / "DiskSweeper" / "logs"
         log_dir.mkdir(parents=True, exist_ok=True)
@@ -43,4 +379,22 @@ def clean(candidates: Iterable[Candidate], *, echo: bool = True) -> int:
     except Exception:
         pass
 
+
+def clean(candidates: Iterable[Candidate], *, echo: bool = True, workers: int = 4,
+          stats: SweepStats | None = None, throttle: Throttle | None = None,
+          one_fs: bool = False) -> int:
+    freed = 0
+    for res in iter_clean(candidates, workers=workers, stats=stats, throttle=throttle,
+                          one_fs=one_fs):
+        freed += res.freed
+        if echo:
+            print("✓", fmt_sz(res.freed).rjust(8), res.candidate.path)
+            if res.failed:
+                print(" " * 11, f"{len(res.failed)} item(s) could not be removed, e.g.",
+                      f"{res.failed[0][0]} ({res.failed[0][1]})")
+
+    if echo:
+        print("≈ Freed", fmt_sz(freed))
+
+    log_sweep(freed)
     return freed
@@ -5,52 +5,46 @@ sweeper.core.collector
 
 • Walks the filesystem, respecting age & size thresholds
 • Discovers Edge / Chrome caches for every profile
-• Supplies `collect()` and `fmt_sz()` – the public API
+• Supplies `iter_collect()`, `collect()` and `fmt_sz()` – the public API
 """
 
 from __future__ import annotations
 
+import glob
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, replace
 from pathlib import Path
-from types import ModuleType
-from typing import Iterable, Iterator, List, Set
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, List, Set
 
 from .rules import (
     Rule,
     Candidate,
-    RULES,
     MB,
     GB,
-    NOW,
     LOCAL,
 )
+from .agehist import AgeHistogram
+from .estimate import Estimate, estimate_tree
+from .index import ScanIndex
+from .inodes import InodeSet
+from .sizetree import SizeTree
+from .topn import TopN
+from .walker import (
+    PARALLEL_WORKERS, CancelToken, OnDir, PathFilter, WalkJob, WalkStats, group_jobs,
+    walk_shared, walk_tree,
+)
+
+if TYPE_CHECKING:
+    from .stats import SweepStats
+    from .throttle import Throttle
 
 # ── Internal helpers ──────────────────────────────────────────────────────
 
 
 def _walk_size(p: Path, *, cutoff: float | None) -> int:
     """Return total size (bytes) under *p*, skipping files newer than *cutoff*."""
-    total = 0
-    if not p.exists():
-        return 0
-
-    try:
-        stat = p.stat()
-    except OSError:
-        return 0
-
-    # Single file
-    if p.is_file():
-        return stat.st_size if cutoff is None or stat.st_mtime < cutoff else 0
-
-    # Directory walk
-    for sub in p.rglob("*"):
-        try:
-            st = sub.stat()
-            if cutoff is None or st.st_mtime < cutoff:
-                total += st.st_size
-        except OSError:
-            pass
-    return total
+    return walk_tree(p, cutoff=cutoff).size
 
 
 # ── Browser cache discovery ───────────────────────────────────────────────
@@ -78,34 +72,332 @@ def chrome_caches() -> Iterable[Path]:
     yield from _iter_profile_caches(CHROME_BASE)
 
 
-# ── Patch the stubs created in rules.py so RULES already built stay valid ──
+# ── Public API -------------------------------------------------------------
+
 
-_rules_mod: ModuleType = __import__("sweeper.core.rules", fromlist=["dummy"])
-setattr(_rules_mod, "_edge_caches", edge_caches)
-setattr(_rules_mod, "_chrome_caches", chrome_caches)
+MAX_WORKERS = 32  # upper bound for the sizing pool (= open directory handles)
+PROGRESS_INTERVAL = 0.1  # seconds between progress callbacks per path
 
-for r in RULES:  # re-point the two rules that used the earlier stubs
-    if r.label == "Edge Cache":
-        r.path = edge_caches
-    elif r.label == "Chrome Cache":
-        r.path = chrome_caches
 
-# ── Public API -------------------------------------------------------------
+@dataclass
+class ScanProgress:
+    rule: Rule
+    path: Path
+    files: int   # files visited so far under *path*
+    bytes: int   # bytes counted so far under *path*
 
 
-def collect(rules: List[Rule], *, include: Set[str]) -> List[Candidate]:
-    """Return a list of Candidates whose rule.severity is in *include*."""
-    found: list[Candidate] = []
+ProgressFn = Callable[[ScanProgress], None]
+
+
+def _rule_paths(r: Rule) -> list[Path]:
+    """A rule's roots; wildcard paths ("PyCharm*") expand to every match."""
+    try:
+        if callable(r.path):
+            return list(r.path())
+    except OSError:
+        return []
+    if glob.has_magic(str(r.path)):
+        return [Path(p) for p in sorted(glob.glob(str(r.path)))]
+    return [r.path]
+
+
+def _on_dir(r: Rule, p: Path, progress: ProgressFn | None, throttle: Throttle | None = None,
+            cancel: CancelToken | None = None,
+            stats: SweepStats | None = None) -> OnDir | None:
+    """Per-directory hook: charges *throttle* for the directory's stat calls
+    and sends *progress* at most every PROGRESS_INTERVAL."""
+    if progress is None and throttle is None:
+        return None
+    last = 0.0
+    seen: WalkStats | None = None
+    charged = 0
+
+    def on_dir(st: WalkStats) -> None:
+        nonlocal last, seen, charged
+        if throttle is not None:
+            if st is not seen:  # a fresh walk of this root
+                seen, charged = st, 0
+            waited = throttle.stats(st.stat_calls - charged, cancel)
+            charged = st.stat_calls
+            if waited and stats is not None:
+                stats.add_throttle(r.label, waited)
+        if progress is None:
+            return
+        now = time.monotonic()
+        if now - last >= PROGRESS_INTERVAL:
+            last = now
+            progress(ScanProgress(r, p, st.files, st.size))
+
+    return on_dir
+
+
+def _report(job: WalkJob, elapsed: float, progress: ProgressFn | None,
+            stats: SweepStats | None) -> None:
+    r, p = job.ref
+    if stats is not None:
+        stats.add_walk(r.label, job.stats, elapsed)
+    if progress is not None and not job.stats.cancelled:
+        progress(ScanProgress(r, p, job.stats.files, job.stats.size))
+
+
+def _walk(group: list[WalkJob], index: ScanIndex | None, progress: ProgressFn | None,
+          cancel: CancelToken, stats: SweepStats | None, threads: int = 1) -> list[WalkJob]:
+    """Size one group of nested roots in a single shared pass; a huge lone
+    root may fan out over *threads*."""
+    t0 = time.perf_counter()
+    try:
+        walk_shared(group, index=index, cancel=cancel, threads=threads)
+    except Exception:  # one broken root must not sink the whole scan
+        for job in group:
+            job.stats = WalkStats(errors=1)
+    elapsed = (time.perf_counter() - t0) / len(group)  # one pass, split evenly
+    for job in group:
+        _report(job, elapsed, progress, stats)
+    return group
+
+
+def _estimate(group: list[WalkJob], progress: ProgressFn | None, cancel: CancelToken,
+              stats: SweepStats | None, out: dict[int, Estimate | None]) -> list[WalkJob]:
+    """Sampling stand-in for `_walk()`; each root is estimated on its own."""
+    for job in group:
+        r, p = job.ref
+        t0 = time.perf_counter()
+        try:
+            est, job.stats = estimate_tree(p, cutoff=job.cutoff, filters=job.filters,
+                                           min_size=r.min_size, cancel=cancel,
+                                           one_fs=job.one_fs)
+        except Exception:
+            est, job.stats = None, WalkStats(errors=1)
+        out[id(job)] = est
+        _report(job, time.perf_counter() - t0, progress, stats)
+    return group
+
+
+def iter_collect(
+    rules: Iterable[Rule],
+    *,
+    include: Set[str],
+    workers: int = 1,
+    index: ScanIndex | None = None,
+    progress: ProgressFn | None = None,
+    cancel: CancelToken | None = None,
+    ordered: bool = True,
+    stats: SweepStats | None = None,
+    tree_nodes: int = 0,
+    top_n: int = 0,
+    ages: bool = False,
+    keep_small: bool = False,
+    estimate: bool = False,
+    links: bool = False,
+    one_fs: bool = False,
+    throttle: Throttle | None = None,
+    clean_nodes: int = 0,
+) -> Iterator[Candidate]:
+    """Yield each Candidate as soon as its path has been sized.
+
+    Roots that nest inside (or repeat) another root are sized in the same
+    pass over the disk, each with its own cutoff and filters.  With
+    *workers* > 1 the independent walks run at once on a thread pool.  Each
+    walk keeps a single directory handle open, so the pool size also bounds
+    open handles.  Candidates come out in the serial order
+    unless *ordered* is False, in which case they come out as they finish.
+
+    *progress* receives ScanProgress updates (from worker threads when
+    *workers* > 1).  Cancelling *cancel* – or closing the generator – stops
+    the walks at the next directory; nothing partial is yielded.  *stats*
+    collects per-rule counters and timings.  With *tree_nodes* > 0 every
+    candidate carries a SizeTree of up to that many directories; with
+    *top_n* > 0 a TopN of its largest files and immediate sub-folders.
+    *ages* attaches an AgeHistogram, so `Candidate.bytes_older_than()` can
+    answer other min_age values; *keep_small* also yields the roots below
+    their rule's min_size (for snapshots that re-apply it later).
+
+    With *estimate* every root is sampled instead of walked (see
+    `estimate_tree()`); candidates then carry an Estimate and `refine()`
+    turns chosen ones into exact sizes.  Trees, top-N lists and histograms
+    need a full walk and are not kept in this mode.
+
+    *links* counts every hard-linked file once per candidate and fills
+    `Candidate.alloc` with allocated bytes; it needs full listings, so index
+    rows and *estimate* are not used with it.  *one_fs* keeps every walk on
+    its root's filesystem.  A *throttle* caps the stat calls per second of
+    all walks together (charged after each directory).  *clean_nodes* > 0
+    gives the candidates of rules with a min_age or filters – the ones
+    `clean()` deletes partially – a SizeTree of that many directories when
+    *tree_nodes* does not; trees keep a root off the parallel walker, so
+    other rules go without.
+    """
+    t0 = time.perf_counter()
+    try:
+        yield from _iter_jobs(rules, include, workers, index, progress, cancel,
+                              ordered, stats, tree_nodes, top_n, ages, keep_small,
+                              estimate and not links, links, one_fs, throttle, clean_nodes)
+    finally:
+        if stats is not None:
+            stats.scan_wall += time.perf_counter() - t0
+
+
+def _iter_jobs(rules, include, workers, index, progress, cancel, ordered,
+               stats, tree_nodes, top_n, ages, keep_small,
+               estimate, links, one_fs, throttle, clean_nodes) -> Iterator[Candidate]:
+    now = time.time()  # age cutoffs are relative to this scan
+    stop = CancelToken(cancel)
+    jobs: list[WalkJob] = []
     for r in rules:
         if r.severity not in include:
             continue
-        paths = r.path() if callable(r.path) else [r.path]
-        cutoff = NOW - r.min_age * 86_400 if r.min_age else None
-        for p in paths:
-            size = _walk_size(p, cutoff=cutoff)
-            if size >= r.min_size:
-                found.append(Candidate(r, p, size))
-    return found
+        cutoff = now - r.min_age * 86_400 if r.min_age else None
+        filters = PathFilter.for_rule(r)  # compiled once, shared by every root
+        nodes = tree_nodes or (clean_nodes if r.min_age or filters is not None else 0)
+        for p in _rule_paths(r):
+            tree = SizeTree(p, max_nodes=nodes) if nodes > 0 and not estimate else None
+            top = TopN(top_n) if top_n > 0 and not estimate else None
+            hist = AgeHistogram(now) if ages and not estimate else None
+            jobs.append(WalkJob(p, cutoff=cutoff, filters=filters, tree=tree, top=top,
+                                hist=hist, links=InodeSet() if links else None,
+                                one_fs=one_fs, ref=(r, p),
+                                on_dir=_on_dir(r, p, progress, throttle, stop, stats)))
+    estimates: dict[int, Estimate | None] = {}
+    groups = [[job] for job in jobs] if estimate else group_jobs(jobs)
+    workers = max(1, min(workers, MAX_WORKERS, len(groups)))
+    if estimate:
+
+        def run(g: list[WalkJob]) -> list[WalkJob]:
+            return _estimate(g, progress, stop, stats, estimates)
+    else:
+        # roots nested in (or equal to) another root are sized in its walk;
+        # the walk threads split what the pool leaves of PARALLEL_WORKERS
+        threads = max(1, PARALLEL_WORKERS // workers)
+
+        def run(g: list[WalkJob]) -> list[WalkJob]:
+            return _walk(g, index, progress, stop, stats, threads)
+
+    def result(job: WalkJob) -> Candidate | None:
+        r, p = job.ref
+        if job.stats.size < r.min_size:
+            if not keep_small:
+                return None
+        elif stats is not None:
+            stats.add_candidate(r.label)
+        if job.hist is not None:
+            job.hist.compact()  # here, not on the first min-age query (a UI thread)
+        return Candidate(r, p, job.stats.size, job.tree, job.top, job.hist,
+                         estimates.get(id(job)),
+                         job.stats.alloc if job.links is not None else None,
+                         job.cutoff)
+
+    if workers == 1:
+        done: set[int] = set()
+        nxt = 0
+        for group in groups:
+            run(group)
+            if any(job.stats.cancelled for job in group):
+                return
+            done.update(id(job) for job in group)
+            while nxt < len(jobs) and id(jobs[nxt]) in done:
+                cand = result(jobs[nxt])
+                if cand is not None:
+                    yield cand
+                nxt += 1
+        return
+
+    pool = ThreadPoolExecutor(max_workers=workers)
+    try:
+        futures = [pool.submit(run, g) for g in groups]
+        if ordered:
+            of_job = {id(job): fut for fut, g in zip(futures, groups) for job in g}
+
+            def in_order() -> Iterator[WalkJob]:
+                for job in jobs:
+                    of_job[id(job)].result()
+                    yield job
+
+            finished = in_order()
+        else:
+            finished = (job for fut in as_completed(futures) for job in fut.result())
+        for job in finished:
+            if job.stats.cancelled or stop.cancelled:
+                return
+            cand = result(job)
+            if cand is not None:
+                yield cand
+    finally:
+        stop.cancel()
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def collect(
+    rules: List[Rule],
+    *,
+    include: Set[str],
+    workers: int = 1,
+    index: ScanIndex | None = None,
+    stats: SweepStats | None = None,
+    tree_nodes: int = 0,
+    top_n: int = 0,
+    ages: bool = False,
+    keep_small: bool = False,
+    estimate: bool = False,
+    links: bool = False,
+    one_fs: bool = False,
+    throttle: Throttle | None = None,
+    clean_nodes: int = 0,
+) -> List[Candidate]:
+    """Return a list of Candidates whose rule.severity is in *include*.
+
+    Thin wrapper over `iter_collect()`; an *index* lets the walks skip
+    directories whose mtime has not changed, *stats* collects per-rule
+    instrumentation, *tree_nodes* > 0 keeps a drill-down SizeTree and
+    *top_n* > 0 the largest files / sub-folders per candidate; *ages*,
+    *keep_small*, *estimate*, *links*, *one_fs*, *throttle* and
+    *clean_nodes* are passed through as well.
+    """
+    return list(iter_collect(rules, include=include, workers=workers, index=index,
+                             stats=stats, tree_nodes=tree_nodes, top_n=top_n,
+                             ages=ages, keep_small=keep_small, estimate=estimate,
+                             links=links, one_fs=one_fs, throttle=throttle,
+                             clean_nodes=clean_nodes))
+
+
+def refine(
+    cands: Iterable[Candidate],
+    *,
+    workers: int = 1,
+    index: ScanIndex | None = None,
+    cancel: CancelToken | None = None,
+    stats: SweepStats | None = None,
+    one_fs: bool = False,
+    throttle: Throttle | None = None,
+    top_n: int = 0,
+) -> List[Candidate]:
+    """Exact walks of just *cands* (e.g. estimated rows the user picked).
+
+    Returns one fresh Candidate per input, in order and whatever its size –
+    callers re-apply min_size.  Raises RuntimeError if not every input was
+    walked (cancelled), so estimates are never mistaken for exact sizes.
+    *one_fs* should match the scan that produced the estimates.  *top_n* > 0
+    also collects each one's TopN – cheaper on demand than in every scan,
+    since top-N walks skip the index and the parallel walker.
+    """
+    cands = list(cands)
+    rules = [replace(c.rule, path=_literal(c.path)) for c in cands]
+    out = list(iter_collect(rules, include={c.rule.severity for c in cands},
+                            workers=workers, index=index, cancel=cancel, stats=stats,
+                            keep_small=True, one_fs=one_fs, throttle=throttle,
+                            top_n=top_n))
+    if len(out) != len(cands):
+        raise RuntimeError(f"refine walked {len(out)} of {len(cands)} candidates"
+                           + (" (cancelled)" if cancel is not None and cancel.cancelled
+                              else ""))
+    for old, new in zip(cands, out):
+        new.rule, new.path = old.rule, old.path
+    return out
+
+
+def _literal(path: Path) -> Path:
+    """A concrete root, protected from `_rule_paths()` wildcard expansion."""
+    return Path(glob.escape(str(path))) if glob.has_magic(str(path)) else path
 
 
 def fmt_sz(b: int) -> str:
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+sweeper.core.estimate
+~~~~~~~~~~~~~~~~~~~~~
+
+Sampling size estimate for trees too big to walk just to test `min_size`.
+
+The top levels are listed outright until FRONTIER directories are
+pending.  Each probe then picks one of those at random and descends
+through randomly chosen sub-directories, scaling the bytes met on the way
+by the product of the branching factors (Knuth's random-path estimator –
+unbiased for the subtree totals).  Probes are averaged, a normal
+confidence interval is kept and sampling stops once the interval lies
+clearly above or below `min_size`.  Listings are memoised, so small trees
+become fully known and are reported exact.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import random
+import stat as st_mod
+from dataclasses import dataclass
+from pathlib import Path
+
+from .walker import CancelToken, PathFilter, WalkStats, walk_tree, _foreign, _rel
+
+Z = 1.96            # ~95 % two-sided interval
+FRONTIER = 64       # directories listed outright before sampling starts
+MIN_PROBES = 32     # before the interval is trusted
+MAX_PROBES = 1024
+
+
+@dataclass
+class Estimate:
+    size: int           # point estimate (exact when `exact`)
+    low: int
+    high: int
+    probes: int
+    exact: bool = False  # every directory was listed – no sampling error
+
+    def decided(self, min_size: int) -> bool:
+        return self.exact or self.low >= min_size or self.high < min_size
+
+
+class _Lister:
+    """Memoised per-directory listing with the walker's counting rules."""
+
+    def __init__(self, cutoff: float | None, filt: PathFilter | None, stats: WalkStats,
+                 dev: int | None = None):
+        self.cutoff = cutoff
+        self.filt = filt
+        self.stats = stats
+        self.dev = dev  # root device in one-filesystem mode
+        self.memo: dict[str, tuple[int, list[tuple[str, str]]]] = {}
+        self.unlisted = 0  # directories seen but not listed yet
+
+    def __call__(self, d: str, rel: str) -> tuple[int, list[tuple[str, str]]]:
+        hit = self.memo.get(d)
+        if hit is not None:
+            return hit
+        cutoff, filt, stats, dev = self.cutoff, self.filt, self.stats, self.dev
+        uses_rel = filt is not None and filt.uses_rel
+        count_dirs = filt is None or filt.count_dirs
+        own = 0
+        kids: list[tuple[str, str]] = []
+        try:
+            with os.scandir(d) as it:
+                for entry in it:
+                    stats.stat_calls += 1
+                    try:
+                        st = entry.stat()
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                    except OSError:
+                        stats.errors += 1
+                        continue
+                    sub_rel = _rel(rel, entry.name) if uses_rel else ""
+                    if is_dir:
+                        if filt is not None and filt.prune_dir(entry.name, sub_rel):
+                            continue
+                        if dev is not None and _foreign(st, dev):
+                            continue
+                        kids.append((entry.path, sub_rel))
+                        if not count_dirs:
+                            continue
+                    else:
+                        stats.files += 1
+                        if filt is not None and not filt.keep_file(entry.name, sub_rel):
+                            continue
+                    if cutoff is None or st.st_mtime < cutoff:
+                        own += st.st_size
+        except OSError:
+            stats.errors += 1
+        stats.dirs += len(kids)
+        if self.memo:  # the root was never "seen" from a parent
+            self.unlisted -= 1
+        self.unlisted += len(kids)
+        self.memo[d] = (own, kids)
+        return own, kids
+
+
+def estimate_tree(
+    root: Path | str,
+    *,
+    cutoff: float | None = None,
+    filters: PathFilter | None = None,
+    min_size: int = 0,
+    max_probes: int = MAX_PROBES,
+    seed: int | None = None,
+    cancel: CancelToken | None = None,
+    one_fs: bool = False,
+) -> tuple[Estimate, WalkStats]:
+    """Estimate what `walk_tree(root, cutoff=..., filters=...)` would count.
+
+    Stops after MIN_PROBES once the interval no longer straddles *min_size*,
+    when the tree turns out to be fully listed, or after *max_probes*.
+    The returned stats only cover the directories actually listed.
+    """
+    top = os.fspath(root)
+    try:
+        st = os.stat(top)
+    except OSError:
+        st = None
+    if st is None or not st_mod.S_ISDIR(st.st_mode):  # missing / file root: exact
+        ws = walk_tree(top, cutoff=cutoff, filters=filters, cancel=cancel, one_fs=one_fs)
+        return Estimate(ws.size, ws.size, ws.size, 0, exact=True), ws
+
+    stats = WalkStats(stat_calls=1)
+    lister = _Lister(cutoff, filters, stats, st.st_dev if one_fs else None)
+    rng = random.Random(seed)
+
+    # list the top levels outright until there is a frontier worth sampling
+    known = 0
+    frontier = [(top, "")]
+    while frontier and len(frontier) < FRONTIER:
+        level, frontier = frontier, []
+        for d, rel in level:
+            own, kids = lister(d, rel)
+            known += own
+            frontier.extend(kids)
+    if not frontier:
+        stats.size = known
+        return Estimate(known, known, known, 0, exact=True), stats
+
+    n, mean, m2 = 0, 0.0, 0.0
+    while n < max_probes:
+        if cancel is not None and cancel.cancelled:
+            stats.cancelled = True
+            break
+        d, rel = rng.choice(frontier)
+        x, weight = 0.0, float(len(frontier))
+        while True:
+            own, kids = lister(d, rel)
+            x += weight * own
+            if not kids:
+                break
+            weight *= len(kids)
+            d, rel = rng.choice(kids)
+        n += 1
+        delta = x - mean
+        mean += delta / n
+        m2 += delta * (x - mean)
+
+        if not lister.unlisted:  # whole tree listed: add it up exactly
+            size = sum(own for own, _ in lister.memo.values())
+            stats.size = size
+            return Estimate(size, size, size, n, exact=True), stats
+        if n >= MIN_PROBES:
+            est = _interval(known, mean, m2, n)
+            if est.decided(min_size):
+                break
+    est = _interval(known, mean, m2, n)
+    stats.size = est.size
+    return est, stats
+
+
+def _interval(known: int, mean: float, m2: float, n: int) -> Estimate:
+    se = math.sqrt(m2 / (n - 1) / n) if n > 1 else mean
+    return Estimate(known + round(mean), known + max(0, math.floor(mean - Z * se)),
+                    known + math.ceil(mean + Z * se), n)
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+sweeper.core.index
+~~~~~~~~~~~~~~~~~~
+
+Persistent scan index (SQLite) used by the walker to skip unchanged trees.
+
+One row per directory holds the directory's mtime, its direct (non-dir)
+entries as sorted mtime + cumulative size arrays and the names of its
+sub-directories.  While the directory mtime is unchanged the walker takes
+the row instead of listing the directory – entries cannot have been added,
+removed or renamed – and only stats the children to decide where to
+descend.  Keeping the sorted mtimes (rather than a single subtotal) makes a
+row valid for any age cutoff, so the ever-moving `now - min_age` never
+invalidates it.
+
+In-place rewrites of existing files do not touch the directory mtime; use
+`--no-cache` when exact numbers matter.
+
+Storing a directory again drops the rows (same tag) of sub-directories it
+no longer lists and of everything below them, so deleted and renamed
+folders do not linger; a rule root removed as a whole keeps its rows until
+`--rebuild-index`.
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .rules import LOCAL
+
+DEFAULT_INDEX = LOCAL / "DiskSweeper" / "index.sqlite3"
+SCHEMA_VERSION = 1
+_FLUSH_EVERY = 2_000  # pending rows per transaction
+
+
+@dataclass
+class IndexedDir:
+    files: int = 0
+    errors: int = 0
+    mtimes: array = field(default_factory=lambda: array("d"))  # ascending
+    sizes: array = field(default_factory=lambda: array("q"))   # cumulative
+    children: list[str] = field(default_factory=list)
+
+    @classmethod
+    def build(cls, entries: list[tuple[float, int]], children: list[str],
+              errors: int = 0, files: int | None = None) -> "IndexedDir":
+        """*entries* are the (mtime, size) pairs that count; *files* is how
+        many non-dir entries were seen (defaults to len(entries))."""
+        entries.sort()
+        row = cls(files=len(entries) if files is None else files, errors=errors,
+                  children=children)
+        running = 0
+        for mtime, size in entries:
+            running += size
+            row.mtimes.append(mtime)
+            row.sizes.append(running)
+        return row
+
+    def total(self, cutoff: float | None) -> int:
+        """Bytes of direct entries older than *cutoff* (all if None)."""
+        n = len(self.mtimes) if cutoff is None else bisect_left(self.mtimes, cutoff)
+        return self.sizes[n - 1] if n else 0
+
+
+class ScanIndex:
+    """Thread-safe handle on the on-disk index.
+
+    Rows are keyed by (path, tag); the tag lets callers keep separate rows
+    for walks that see a directory differently.  Writes are batched – call
+    `close()` (or use the handle as a context manager) to commit them.
+    """
+
+    def __init__(self, path: Path | str | None = None):
+        path = DEFAULT_INDEX if path is None else path
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        if self._db.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            self._db.execute("DROP TABLE IF EXISTS dirs")
+            self._db.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS dirs ("
+            " path TEXT NOT NULL, tag TEXT NOT NULL, mtime_ns INTEGER NOT NULL,"
+            " files INTEGER NOT NULL, errors INTEGER NOT NULL,"
+            " mtimes BLOB NOT NULL, sizes BLOB NOT NULL, children TEXT NOT NULL,"
+            " PRIMARY KEY (path, tag)) WITHOUT ROWID"
+        )
+        self._db.commit()
+
+    # lookups / updates ------------------------------------------------------
+    def lookup(self, path: str, tag: str, mtime_ns: int) -> IndexedDir | None:
+        """Return the row for *path* if it was stored at *mtime_ns*."""
+        with self._lock:
+            hit = self._db.execute(
+                "SELECT files, errors, mtimes, sizes, children FROM dirs"
+                " WHERE path = ? AND tag = ? AND mtime_ns = ?",
+                (path, tag, mtime_ns),
+            ).fetchone()
+        if hit is None:
+            return None
+        files, errors, mtimes, sizes, children = hit
+        row = IndexedDir(files=files, errors=errors,
+                         children=children.split("\0") if children else [])
+        row.mtimes.frombytes(mtimes)
+        row.sizes.frombytes(sizes)
+        return row
+
+    def store(self, path: str, tag: str, mtime_ns: int, row: IndexedDir) -> None:
+        """Write *path*'s row, dropping those of sub-directories now gone."""
+        with self._lock:
+            old = self._db.execute(
+                "SELECT children FROM dirs WHERE path = ? AND tag = ?", (path, tag),
+            ).fetchone()
+            if old is not None and old[0]:
+                for name in set(old[0].split("\0")).difference(row.children):
+                    self._drop(os.path.join(path, name), tag)
+            self._db.execute(
+                "INSERT OR REPLACE INTO dirs VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (path, tag, mtime_ns, row.files, row.errors,
+                 row.mtimes.tobytes(), row.sizes.tobytes(), "\0".join(row.children)),
+            )
+            self._pending += 1
+            if self._pending >= _FLUSH_EVERY:
+                self._db.commit()
+                self._pending = 0
+
+    def _drop(self, path: str, tag: str) -> None:
+        """Delete *path*'s row and every row below it (lock held)."""
+        below = path + os.sep
+        self._db.execute(
+            "DELETE FROM dirs WHERE tag = ? AND (path = ? OR (path >= ? AND path < ?))",
+            (tag, path, below, below[:-1] + chr(ord(os.sep) + 1)),
+        )
+
+    def __len__(self) -> int:
+        """Rows held, pending ones included."""
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM dirs").fetchone()[0]
+
+    def clear(self) -> None:
+        """Forget every row (`--rebuild-index`)."""
+        with self._lock:
+            self._db.execute("DELETE FROM dirs")
+            self._db.commit()
+            self._pending = 0
+
+    # lifetime -----------------------------------------------------------------
+    def flush(self) -> None:
+        with self._lock:
+            self._db.commit()
+            self._pending = 0
+
+    def close(self) -> None:
+        self.flush()
+        self._db.close()
+
+    def __enter__(self) -> "ScanIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def open_index(path: Path | str | None = None) -> ScanIndex | None:
+    """Open the scan index, or return None if it cannot be used."""
+    try:
+        return ScanIndex(path)
+    except (OSError, sqlite3.Error):
+        return None
+
+
+__all__ = ["DEFAULT_INDEX", "IndexedDir", "ScanIndex", "open_index"]
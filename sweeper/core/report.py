@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+sweeper.core.report
+~~~~~~~~~~~~~~~~~~~
+
+Machine-readable fleet report (`disk-sweeper report --report FILE`), the
+live `--format ndjson` output and the streaming merge behind
+`disk-sweeper aggregate`.
+
+A report is NDJSON, one compact record a line, each carrying the format
+version `v` and its `type`:
+
+    {"v": 1, "type": "candidate", "host": …, "when": …, "rule": …,
+     "severity": …, "path": …, "size": …, "scan_s": …}
+    {"v": 1, "type": "scan", "host": …, "when": …, "elapsed": …,
+     "candidates": …, "size": …}
+
+one "candidate" record per candidate, then one "scan" record closing the
+run.  The live output (`RecordStream`) interleaves "progress" records
+while walking and, for clean / deep, adds one "clean" record per deleted
+candidate and a closing "sweep" record; readers skip types they do not
+know.  Records stand alone, so reports can be concatenated, gzipped
+(`.gz`) or streamed.  `Aggregate` folds any number of them in one pass
+with memory bounded by the number of rules: sizes go into fixed log-scale
+buckets (percentiles within ~4.5 %) and only the worst hosts are kept.
+"""
+
+from __future__ import annotations
+
+import gzip
+import heapq
+import io
+import json
+import math
+import socket
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Iterable
+
+from .collector import ScanProgress, fmt_sz
+from .rules import Candidate
+from .stats import SweepStats
+
+if TYPE_CHECKING:
+    from .cleaner import CleanResult
+
+REPORT_VERSION = 1
+STEPS = 8          # log buckets per doubling: bounds 2^(1/8) ≈ 9 % apart
+WORST_HOSTS = 10
+PERCENTILES = (50, 90, 99)
+
+
+# ── writing ─────────────────────────────────────────────────────────────────
+def candidate_record(c: Candidate, host: str, when: float,
+                     stats: SweepStats | None = None) -> dict:
+    """The "candidate" record of *c*; `scan_s` is the rule's mean walk time
+    per path when *stats* has it."""
+    r = c.rule
+    rs = stats.rules.get(r.label) if stats is not None else None
+    rec = {"v": REPORT_VERSION, "type": "candidate", "host": host, "when": round(when, 3),
+           "rule": r.label, "severity": r.severity, "path": str(c.path), "size": c.size,
+           "scan_s": round(rs.scan_time / rs.paths, 4) if rs is not None and rs.paths else None}
+    if c.alloc is not None:
+        rec["alloc"] = c.alloc
+    if c.estimate is not None and not c.estimate.exact:
+        rec["estimated"] = True
+    return rec
+
+
+def scan_record(cands: list[Candidate], host: str, when: float, elapsed: float) -> dict:
+    return {"v": REPORT_VERSION, "type": "scan", "host": host, "when": round(when, 3),
+            "elapsed": round(elapsed, 3), "candidates": len(cands),
+            "size": sum(c.size for c in cands)}
+
+
+class RecordStream:
+    """Writes records to *fh* a line at a time (flushed unless *flush* is
+    False); thread-safe, so progress may arrive from walker threads."""
+
+    def __init__(self, fh: IO[str], *, host: str | None = None, when: float | None = None,
+                 stats: SweepStats | None = None, flush: bool = True):
+        self.fh = fh
+        self.flush = flush
+        self.host = socket.gethostname() if host is None else host
+        self.when = time.time() if when is None else when
+        self.stats = stats
+        self._lock = threading.Lock()
+
+    def write(self, rec: dict) -> None:
+        line = json.dumps(rec, separators=(",", ":")) + "\n"
+        with self._lock:
+            self.fh.write(line)
+            if self.flush:
+                self.fh.flush()
+
+    def candidate(self, c: Candidate) -> None:
+        self.write(candidate_record(c, self.host, self.when, self.stats))
+
+    def progress(self, p: ScanProgress) -> None:
+        self.write({"v": REPORT_VERSION, "type": "progress", "host": self.host,
+                    "rule": p.rule.label, "path": str(p.path), "files": p.files,
+                    "size": p.bytes})
+
+    def scan(self, cands: list[Candidate], elapsed: float) -> None:
+        self.write(scan_record(cands, self.host, self.when, elapsed))
+
+    def clean(self, res: CleanResult) -> None:
+        c = res.candidate
+        self.write({"v": REPORT_VERSION, "type": "clean", "host": self.host,
+                    "rule": c.rule.label, "path": str(c.path), "freed": res.freed,
+                    "files": res.files, "failed": len(res.failed),
+                    "elapsed": round(res.elapsed, 3), "cancelled": res.cancelled})
+
+    def sweep(self, results: list[CleanResult], elapsed: float) -> None:
+        self.write({"v": REPORT_VERSION, "type": "sweep", "host": self.host,
+                    "when": round(self.when, 3), "elapsed": round(elapsed, 3),
+                    "candidates": len(results), "freed": sum(r.freed for r in results),
+                    "failed": sum(len(r.failed) for r in results)})
+
+
+def write_report(cands: Iterable[Candidate], path: Path | str, *, host: str | None = None,
+                 when: float | None = None, elapsed: float = 0.0,
+                 stats: SweepStats | None = None) -> None:
+    """Write *cands* (as reported, min_size applied) as one host's report."""
+    cands = list(cands)
+    with _open(path, "w") as fh:
+        out = RecordStream(fh, host=host, when=when, stats=stats, flush=False)
+        for c in cands:
+            out.candidate(c)
+        out.scan(cands, elapsed)
+
+
+def _open(path: Path | str, mode: str) -> IO[str]:
+    if str(path).endswith(".gz"):
+        return io.TextIOWrapper(gzip.open(path, mode + "b"), encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+# ── reading / merging ───────────────────────────────────────────────────────
+class LogHistogram:
+    """Counts of non-negative integers in log-scale buckets (fixed size)."""
+
+    def __init__(self):
+        self.counts = array("q", bytes(8 * (64 * STEPS + 2)))
+        self.n = 0
+        self.low: int | None = None
+        self.high = 0
+
+    @staticmethod
+    def _bucket(value: int) -> int:
+        return 0 if value < 1 else 1 + int(math.log2(value) * STEPS)
+
+    def add(self, value: int) -> None:
+        self.counts[min(self._bucket(value), len(self.counts) - 1)] += 1
+        self.n += 1
+        self.low = value if self.low is None else min(self.low, value)
+        self.high = max(self.high, value)
+
+    def percentile(self, p: float) -> int:
+        """Value at percentile *p* (0 – 100): the middle of its bucket,
+        clamped to the smallest / largest value seen."""
+        if not self.n:
+            return 0
+        rank = max(1, math.ceil(self.n * p / 100))
+        seen = 0
+        for b, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                break
+        mid = 0 if b == 0 else round(2 ** ((b - 0.5) / STEPS))
+        return min(max(mid, self.low or 0), self.high)
+
+
+class RuleTotals:
+    """Fleet-wide figures of one rule."""
+
+    def __init__(self, label: str):
+        self.label = label
+        self.candidates = 0
+        self.size = 0
+        self.scan_s = 0.0
+        self.sizes = LogHistogram()
+
+    def to_dict(self) -> dict:
+        return {"rule": self.label, "candidates": self.candidates, "size": self.size,
+                "max": self.sizes.high, "scan_s": round(self.scan_s, 3),
+                **{f"p{p}": self.sizes.percentile(p) for p in PERCENTILES}}
+
+
+class Aggregate:
+    """Streaming merge of report records; feed with `add()` / `add_file()`."""
+
+    def __init__(self, worst: int = WORST_HOSTS):
+        self.worst = worst
+        self.rules: dict[str, RuleTotals] = {}
+        self.hosts = 0
+        self.size = 0
+        self.host_sizes = LogHistogram()
+        self.skipped = 0  # lines of another version, or unreadable
+        self._worst: list[tuple[int, str, float]] = []  # min-heap (size, host, when)
+
+    def add(self, rec: dict) -> None:
+        if rec.get("v") != REPORT_VERSION:
+            self.skipped += 1
+            return
+        kind = rec.get("type")  # other types (progress, …) carry no totals
+        if kind == "candidate":
+            label, size, scan_s = rec["rule"], int(rec["size"]), rec.get("scan_s") or 0.0
+            rt = self.rules.get(label)
+            if rt is None:
+                rt = self.rules[label] = RuleTotals(label)
+            rt.candidates += 1
+            rt.size += size
+            rt.scan_s += scan_s
+            rt.sizes.add(size)
+        elif kind == "scan":
+            item = (int(rec["size"]), str(rec["host"]), float(rec["when"]))
+            self.hosts += 1
+            self.size += item[0]
+            self.host_sizes.add(item[0])
+            if len(self._worst) < self.worst:
+                heapq.heappush(self._worst, item)
+            elif item > self._worst[0]:
+                heapq.heapreplace(self._worst, item)
+
+    def add_file(self, path: Path | str) -> None:
+        """Fold one report in, line by line."""
+        try:
+            with _open(path, "r") as fh:
+                for line in fh:
+                    if not line.strip():
+                        continue
+                    try:
+                        rec = json.loads(line)
+                        self.add(rec)
+                    except (ValueError, KeyError, TypeError, AttributeError):
+                        self.skipped += 1
+        except (OSError, EOFError, UnicodeDecodeError):
+            self.skipped += 1
+
+    def worst_hosts(self) -> list[tuple[int, str, float]]:
+        """(potential bytes, host, scan time), biggest first."""
+        return sorted(self._worst, reverse=True)
+
+    def to_dict(self) -> dict:
+        return {"v": REPORT_VERSION, "hosts": self.hosts, "size": self.size,
+                "skipped": self.skipped,
+                "host_size": {f"p{p}": self.host_sizes.percentile(p) for p in PERCENTILES},
+                "rules": [rt.to_dict() for rt in self._ordered()],
+                "worst_hosts": [{"host": h, "size": s, "when": w}
+                                for s, h, w in self.worst_hosts()]}
+
+    def _ordered(self) -> list[RuleTotals]:
+        return sorted(self.rules.values(), key=lambda rt: -rt.size)
+
+    def format_table(self) -> str:
+        head = (f"{'Rule':<22}{'found':>8}{'total':>11}"
+                + "".join(f"{f'p{p}':>10}" for p in PERCENTILES) + f"{'max':>10}")
+        lines = [f"{self.hosts:,} hosts | Potential space: {fmt_sz(self.size)}"
+                 f" | per host p50 {fmt_sz(self.host_sizes.percentile(50))},"
+                 f" p90 {fmt_sz(self.host_sizes.percentile(90))}", head, "—" * len(head)]
+        for rt in self._ordered():
+            lines.append(f"{rt.label[:21]:<22}{rt.candidates:>8,}{fmt_sz(rt.size):>11}"
+                         + "".join(f"{fmt_sz(rt.sizes.percentile(p)):>10}"
+                                   for p in PERCENTILES)
+                         + f"{fmt_sz(rt.sizes.high):>10}")
+        lines.append("—" * len(head))
+        if self._worst:
+            lines.append("Worst hosts:")
+            for size, host, when in self.worst_hosts():
+                stamp = time.strftime("%Y-%m-%d %H:%M", time.localtime(when))
+                lines.append(f"{fmt_sz(size):>11}  {host:<32} {stamp}")
+        if self.skipped:
+            lines.append(f"({self.skipped:,} unreadable or foreign records skipped)")
+        return "\n".join(lines)
+
+
+def aggregate(paths: Iterable[Path | str], worst: int = WORST_HOSTS) -> Aggregate:
+    agg = Aggregate(worst)
+    for p in paths:
+        agg.add_file(p)
+    return agg
+
@@ -3,23 +3,33 @@
 sweeper.core.rules
 ~~~~~~~~~~~~~~~~~~
 
-Dataclasses + RULES loader.
+Dataclasses + `load_rules()` / `load_settings()`.
 If data/default_rules.yaml exists, read rules from YAML,
-otherwise fall back to the built-in list.
+otherwise fall back to the built-in list.  Nothing is parsed at import.
+The YAML is either a plain rule list or a mapping with `rules:` and an
+optional `settings:` block (throttling, priority).
 """
 
 from __future__ import annotations
 
-import time
-import yaml
-from dataclasses import dataclass
+import hashlib
+import json
+import os
+import re
+import sys
+from dataclasses import dataclass, field, replace
 from pathlib import Path
-from typing import Callable, Iterable
+from typing import TYPE_CHECKING, Callable, Iterable
+
+if TYPE_CHECKING:
+    from .agehist import AgeHistogram
+    from .estimate import Estimate
+    from .sizetree import SizeTree
+    from .topn import TopN
 
 # ── Shared constants ────────────────────────────────────────────────────────
 MB = 1024 ** 2
 GB = 1024 ** 3
-NOW = time.time()
 
 LOCAL = Path.home() / "AppData" / "Local"
 SYSTEM_ROOT = Path.home().anchor + "Windows"  # usually C:\Windows
@@ -33,22 +43,56 @@ class Rule:
     min_age: int = 0               # days
     severity: str = "safe"         # safe | moderate | aggressive
     reason: str = ""
+    include: list[str] = field(default_factory=list)  # file globs that count
+    exclude: list[str] = field(default_factory=list)  # file globs that don't
+    prune: list[str] = field(default_factory=list)    # dir globs never entered
 
 @dataclass
 class Candidate:
     rule: Rule
     path: Path
     size: int
+    tree: SizeTree | None = field(default=None, repr=False, compare=False)  # drill-down
+    top: TopN | None = field(default=None, repr=False, compare=False)  # largest items
+    hist: AgeHistogram | None = field(default=None, repr=False, compare=False)
+    estimate: Estimate | None = field(default=None, repr=False, compare=False)  # sampled
+    alloc: int | None = field(default=None, compare=False)  # allocated bytes (links mode)
+    cutoff: float | None = field(default=None, compare=False)  # mtime bound `size` used
+
+    def bytes_older_than(self, days: float) -> int:
+        """What `size` would be with min_age = *days* – no rescan needed."""
+        if self.hist is None:
+            raise ValueError(f"{self.path}: scanned without an age histogram")
+        return self.hist.older_than(days)
+
+    def at_min_age(self, days: float) -> Candidate:
+        """Copy sized – and, for `clean()`, cut off – as if min_age were *days*.
+
+        A younger cutoff counts files the scan's tree left out, so the tree
+        is dropped then.
+        """
+        size = self.bytes_older_than(days)
+        tree = self.tree if days >= self.rule.min_age else None
+        return replace(self, size=size, tree=tree, cutoff=self.hist.now - days * 86_400)
 
 SEVERITY_ORDER = {"safe": 0, "moderate": 1, "aggressive": 2}
 
+_SIZE_UNITS = {"": 1, "K": 1024, "M": MB, "G": GB}
+
+
+def parse_size(value: int | float | str) -> int:
+    """Bytes from 1048576, "500M", "2 GB", "1.5G" (binary units)."""
+    if isinstance(value, (int, float)):
+        return int(value)
+    m = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMG]?)B?\s*", value, re.IGNORECASE)
+    if m is None:
+        raise ValueError(f"not a size: {value!r} (e.g. 500M, 2G)")
+    return int(float(m.group(1)) * _SIZE_UNITS[m.group(2).upper()])
+
 # ── Default hard-coded list (used only if YAML is absent) ───────────────────
 EDGE_BASE = LOCAL / "Microsoft" / "Edge" / "User Data"
 CHROME_BASE = LOCAL / "Google" / "Chrome" / "User Data"
 
-def _edge_caches() -> Iterable[Path]: ...
-def _chrome_caches() -> Iterable[Path]: ...
-
 SYSTEM_TEMP   = Path(SYSTEM_ROOT) / "Temp"
 USER_TEMP     = LOCAL / "Temp"
 PREFETCH      = Path(SYSTEM_ROOT) / "Prefetch"
@@ -64,9 +108,13 @@ _BUILTIN_RULES: list[Rule] = [
     # (same list you already had – omitted for brevity)
 ]
 
-# ── Try loading YAML override ───────────────────────────────────────────────
-_yaml_path = Path(__file__).parent.parent.parent / "data" / "default_rules.yaml"
-RULES: list[Rule]
+# ── YAML loader (lazy, cached) ─────────────────────────────────────────────
+DEFAULT_RULES_PATH = Path(__file__).parent.parent.parent / "data" / "default_rules.yaml"
+RULES_CACHE_DIR = LOCAL / "DiskSweeper" / "cache"
+_CACHE_VERSION = 1
+
+_loaded: dict[str, tuple[str, list[Rule], dict]] = {}  # path -> (stamp, rules, settings)
+
 
 def _expand(path_str: str) -> Path:
     """Expand placeholders in YAML paths."""
@@ -76,28 +124,123 @@ def _expand(path_str: str) -> Path:
         .replace("{SYSTEM_ROOT}", str(SYSTEM_ROOT))
     ).expanduser()
 
-try:
-    if _yaml_path.exists():
-        with _yaml_path.open(encoding="utf-8") as fh:
-            raw = yaml.safe_load(fh)
-        RULES = []
-        for item in raw:
-            p = item["path"]
-            if isinstance(p, str):
-                if p == "edge_caches":
-                    path_val = _edge_caches
-                elif p == "chrome_caches":
-                    path_val = _chrome_caches
-                else:
-                    path_val = _expand(p)
-            else:
-                path_val = p
-            RULES.append(Rule(path=path_val, **{k: v for k, v in item.items() if k != "path"}))
-    else:
-        RULES = _BUILTIN_RULES
-except Exception as err:
-    print("⚠️  Failed to load YAML rules – falling back to built-in list:", err)
-    RULES = _BUILTIN_RULES
-
-__all__ = ["MB", "GB", "NOW", "LOCAL", "SYSTEM_ROOT",
-           "Rule", "Candidate", "SEVERITY_ORDER", "RULES"]
+
+def _provider(name: str) -> Callable[[], Iterable[Path]]:
+    """Late-bound path generator living in sweeper.core.collector."""
+    def paths() -> Iterable[Path]:
+        from . import collector
+        return getattr(collector, name)()
+    paths.__name__ = name
+    return paths
+
+
+_edge_caches = _provider("edge_caches")
+_chrome_caches = _provider("chrome_caches")
+_PROVIDERS = {"edge_caches": _edge_caches, "chrome_caches": _chrome_caches}
+
+
+def _build(raw: list[dict]) -> list[Rule]:
+    rules = []
+    for item in raw:
+        p = item["path"]
+        if isinstance(p, str):
+            path_val = _PROVIDERS[p] if p in _PROVIDERS else _expand(p)
+        else:
+            path_val = p
+        rules.append(Rule(path=path_val, **{k: v for k, v in item.items() if k != "path"}))
+    return rules
+
+
+def _split(doc: list | dict | None) -> tuple[list[dict], dict]:
+    """(rule list, settings) of either YAML layout."""
+    if isinstance(doc, dict):
+        return doc.get("rules") or [], doc.get("settings") or {}
+    return doc or [], {}
+
+
+def _parse_yaml(path: Path) -> list | dict:
+    import yaml  # only on a cold start
+
+    with path.open(encoding="utf-8") as fh:
+        return yaml.safe_load(fh)
+
+
+def _cached_raw(path: Path, stamp: str) -> list | dict:
+    """Return the raw YAML document, from the precompiled JSON cache if fresh."""
+    tag = hashlib.sha1(str(path).encode("utf-8")).hexdigest()[:12]
+    cache = RULES_CACHE_DIR / f"rules-{tag}-{stamp}.json"
+    try:
+        with cache.open(encoding="utf-8") as fh:
+            doc = json.load(fh)
+        if doc.get("version") == _CACHE_VERSION:
+            return doc["rules"]
+    except (OSError, ValueError):
+        pass
+
+    raw = _parse_yaml(path)
+    try:
+        RULES_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = cache.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"version": _CACHE_VERSION, "rules": raw}), encoding="utf-8")
+        os.replace(tmp, cache)
+        for stale in RULES_CACHE_DIR.glob(f"rules-{tag}-*.json"):
+            if stale != cache:
+                stale.unlink(missing_ok=True)
+    except (OSError, TypeError, ValueError):
+        pass  # cache is an optimisation only
+    return raw
+
+
+def _load(path: Path | str | None, use_cache: bool) -> tuple[list[Rule], dict]:
+    """(rules, settings) of *path*; see `load_rules()`."""
+    path = Path(path).resolve() if path is not None else DEFAULT_RULES_PATH
+    try:
+        st = path.stat()
+    except OSError:
+        return _BUILTIN_RULES, {}
+    stamp = hashlib.sha1(f"{st.st_mtime_ns}:{st.st_size}".encode()).hexdigest()[:12]
+
+    key = str(path)
+    hit = _loaded.get(key)
+    if use_cache and hit is not None and hit[0] == stamp:
+        return hit[1], hit[2]
+    try:
+        raw, settings = _split(_cached_raw(path, stamp) if use_cache else _parse_yaml(path))
+        rules = _build(raw)
+    except Exception as err:
+        # stderr keeps machine-readable stdout clean; the fallback is
+        # remembered like a good load, so the warning comes once per change
+        print("⚠️  Failed to load YAML rules – falling back to built-in list:", err,
+              file=sys.stderr)
+        rules, settings = _BUILTIN_RULES, {}
+    _loaded[key] = (stamp, rules, settings)
+    return rules, settings
+
+
+def load_rules(path: Path | str | None = None, *, use_cache: bool = True) -> list[Rule]:
+    """Load the rule list from *path* (default: data/default_rules.yaml).
+
+    The parsed YAML is cached as JSON under LOCAL/DiskSweeper/cache, keyed by
+    the file's path, mtime and size, so warm starts never import PyYAML.
+    Repeated calls return the same list until the file changes.  Falls back
+    to the built-in list if the YAML is missing or broken.
+    """
+    return _load(path, use_cache)[0]
+
+
+def load_settings(path: Path | str | None = None, *, use_cache: bool = True) -> dict:
+    """The YAML's `settings:` mapping (empty for a plain rule list), cached
+    alongside the rules."""
+    return _load(path, use_cache)[1]
+
+
+def __getattr__(name: str):
+    # `rules.RULES` stays available, but parsing happens on first use only
+    if name == "RULES":
+        return load_rules()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ["MB", "GB", "LOCAL", "SYSTEM_ROOT",
+           "Rule", "Candidate", "SEVERITY_ORDER", "RULES", "load_rules",
+           "load_settings", "parse_size"]
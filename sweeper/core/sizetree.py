@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+sweeper.core.sizetree
+~~~~~~~~~~~~~~~~~~~~~
+
+Compact per-directory size tree kept by a walk for drill-down views.
+
+Nodes live in flat arrays – parent index, name offset, size, file count,
+first child + child count – with all names packed into one bytearray, so
+there is no Path or object per directory.  A node costs NODE_BYTES plus
+its UTF-8 name; with the default budget of DEFAULT_MAX_NODES directories
+a tree stays under ~60 MB even for multi-million-file caches (files are
+only counted, never stored).  Past the budget, deeper folders are folded
+into their deepest stored parent and `truncated` is set.
+"""
+
+from __future__ import annotations
+
+import heapq
+import os
+from array import array
+from pathlib import Path
+from typing import Iterator
+
+NODE_BYTES = 36  # parent i4 + name end q8 + size q8 + files q8 + first kid i4 + kids i4
+DEFAULT_MAX_NODES = 1_000_000
+
+
+class SizeTree:
+    """Directory sizes below one root; node 0 is the root itself.
+
+    The walk adds every directory's children in one go, so a node's children
+    are a contiguous run of indices.  Sizes are per-directory until
+    `finish()` folds them into cumulative totals (done by the walkers).
+    """
+
+    def __init__(self, root: Path | str, *, max_nodes: int = DEFAULT_MAX_NODES):
+        self.root = os.fspath(root)
+        self.max_nodes = max(1, max_nodes)
+        self.truncated = False
+        self.finished = False
+        self.parent = array("i", [-1])
+        self.name_end = array("q", [0])
+        self.size = array("q", [0])    # bytes counted by the walk (cutoff + filters)
+        self.files = array("q", [0])   # non-directory entries seen
+        self.kid0 = array("i", [0])
+        self.nkids = array("i", [0])
+        self._names = bytearray()
+
+    def __len__(self) -> int:
+        return len(self.parent)
+
+    # building ---------------------------------------------------------------
+    def add(self, parent: int, name: str) -> int:
+        """Add *name* below *parent*; over budget the parent is returned."""
+        n = len(self.parent)
+        if n >= self.max_nodes:
+            self.truncated = True
+            return parent
+        if not self.nkids[parent]:
+            self.kid0[parent] = n
+        self.nkids[parent] += 1
+        self._names += name.encode("utf-8", "surrogateescape")
+        self.parent.append(parent)
+        self.name_end.append(len(self._names))
+        self.size.append(0)
+        self.files.append(0)
+        self.kid0.append(0)
+        self.nkids.append(0)
+        return n
+
+    def finish(self) -> SizeTree:
+        """Turn per-directory sizes into cumulative ones (idempotent)."""
+        if not self.finished:
+            parent, size, files = self.parent, self.size, self.files
+            for i in range(len(parent) - 1, 0, -1):  # children follow parents
+                p = parent[i]
+                size[p] += size[i]
+                files[p] += files[i]
+            self.finished = True
+        return self
+
+    # queries ----------------------------------------------------------------
+    def name(self, node: int) -> str:
+        start = self.name_end[node - 1] if node else 0
+        return self._names[start:self.name_end[node]].decode("utf-8", "surrogateescape")
+
+    def path(self, node: int) -> str:
+        parts = []
+        while node > 0:
+            parts.append(self.name(node))
+            node = self.parent[node]
+        return os.path.join(self.root, *reversed(parts))
+
+    def children(self, node: int = 0, limit: int | None = None) -> list[int]:
+        """Child nodes, biggest first; at most *limit* of them."""
+        first = self.kid0[node]
+        kids = range(first, first + self.nkids[node])
+        if limit is not None and limit < len(kids):
+            return heapq.nlargest(limit, kids, key=self.size.__getitem__)
+        return sorted(kids, key=self.size.__getitem__, reverse=True)
+
+    def walk(self, depth: int, limit: int | None = 10) -> Iterator[tuple[int, int]]:
+        """(level, node) pairs down to *depth*, biggest children first."""
+        stack = [(1, k) for k in reversed(self.children(0, limit))]
+        while stack:
+            level, node = stack.pop()
+            yield level, node
+            if level < depth:
+                stack.extend((level + 1, k) for k in reversed(self.children(node, limit)))
+
+    def nbytes(self) -> int:
+        return len(self) * NODE_BYTES + len(self._names)
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+sweeper.core.stats
+~~~~~~~~~~~~~~~~~~
+
+Per-rule instrumentation for scans and sweeps (`--stats`, `--stats-json`).
+Pass a SweepStats to `collect()` / `clean()` and it is filled as they run.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from .collector import fmt_sz
+
+if TYPE_CHECKING:
+    from .cleaner import CleanResult
+    from .walker import WalkStats
+
+
+@dataclass
+class RuleStats:
+    label: str
+    paths: int = 0
+    candidates: int = 0
+    scan_time: float = 0.0    # wall seconds, summed over the rule's paths
+    dirs: int = 0
+    files: int = 0
+    stat_calls: int = 0
+    errors: int = 0           # OSErrors swallowed
+    cached: int = 0           # directories answered from the scan index
+    matched: int = 0          # bytes older than the cutoff
+    skipped_age: int = 0      # bytes seen but too young for min_age
+    alloc: int = 0            # allocated bytes of `matched` (links mode)
+    linked: int = 0           # bytes of repeat hard links, counted once
+    throttled: float = 0.0    # seconds waiting on rate limits (scan + clean)
+    clean_time: float = 0.0
+    freed: int = 0
+    removed: int = 0
+    failed: int = 0
+
+
+class SweepStats:
+    """Thread-safe collection of RuleStats, keyed by rule label."""
+
+    def __init__(self):
+        self.rules: dict[str, RuleStats] = {}
+        self.scan_wall = 0.0    # elapsed time of the whole scan
+        self.clean_wall = 0.0
+        self._lock = threading.Lock()
+
+    def rule(self, label: str) -> RuleStats:
+        with self._lock:
+            return self.rules.setdefault(label, RuleStats(label))
+
+    def add_walk(self, label: str, st: WalkStats, elapsed: float) -> None:
+        rs = self.rule(label)
+        with self._lock:
+            rs.paths += 1
+            rs.scan_time += elapsed
+            rs.dirs += st.dirs
+            rs.files += st.files
+            rs.stat_calls += st.stat_calls
+            rs.errors += st.errors
+            rs.cached += st.cached
+            rs.matched += st.size
+            rs.skipped_age += st.skipped
+            rs.alloc += st.alloc
+            rs.linked += st.linked
+
+    def add_throttle(self, label: str, waited: float) -> None:
+        rs = self.rule(label)
+        with self._lock:
+            rs.throttled += waited
+
+    def add_candidate(self, label: str) -> None:
+        rs = self.rule(label)
+        with self._lock:
+            rs.candidates += 1
+
+    def add_clean(self, res: CleanResult) -> None:
+        rs = self.rule(res.candidate.rule.label)
+        with self._lock:
+            rs.clean_time += res.elapsed
+            rs.throttled += res.throttled
+            rs.freed += res.freed
+            rs.removed += res.files
+            rs.failed += len(res.failed)
+
+    # output -----------------------------------------------------------------
+    def to_dict(self) -> dict:
+        return {
+            "scan_wall": round(self.scan_wall, 6),
+            "clean_wall": round(self.clean_wall, 6),
+            "rules": [asdict(rs) for rs in self.rules.values()],
+        }
+
+    def write_json(self, path: Path | str) -> None:
+        Path(path).write_text(json.dumps(self.to_dict(), indent=2), encoding="utf-8")
+
+    def format_table(self) -> str:
+        """Rules sorted by scan time, slowest first."""
+        rows = sorted(self.rules.values(), key=lambda r: -r.scan_time)
+        cleaned = any(r.clean_time for r in rows)
+        throttled = sum(r.throttled for r in rows)
+        head = (f"{'Rule':<22}{'scan s':>8}{'dirs':>9}{'files':>10}{'stats':>10}"
+                f"{'errs':>6}{'matched':>10}{'too new':>10}")
+        if throttled:
+            head += f"{'thrott s':>9}"
+        if cleaned:
+            head += f"{'clean s':>9}{'freed':>10}{'failed':>7}"
+        lines = [head, "—" * len(head)]
+        for r in rows:
+            line = (f"{r.label[:21]:<22}{r.scan_time:>8.2f}{r.dirs:>9,}{r.files:>10,}"
+                    f"{r.stat_calls:>10,}{r.errors:>6,}{fmt_sz(r.matched):>10}"
+                    f"{fmt_sz(r.skipped_age):>10}")
+            if throttled:
+                line += f"{r.throttled:>9.2f}"
+            if cleaned:
+                line += f"{r.clean_time:>9.2f}{fmt_sz(r.freed):>10}{r.failed:>7,}"
+            lines.append(line)
+        lines.append("—" * len(head))
+        total = f"Scan wall time {self.scan_wall:.2f} s"
+        if cleaned:
+            total += f" | clean wall time {self.clean_wall:.2f} s"
+        if throttled:
+            total += f" | throttled {throttled:.2f} s (summed over threads)"
+        lines.append(total)
+        return "\n".join(lines)
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+sweeper.core.throttle
+~~~~~~~~~~~~~~~~~~~~~
+
+Rate limits for scans and deletes, and a low-priority switch, so a sweep
+on a busy machine leaves IOPS to the real workload.
+
+One Throttle is shared by every worker thread of a `collect()` / `clean()`
+call; each limit is a token bucket that lets callers run into debt and
+then sleep it off, so the long-run rate holds however the work is split.
+Scans are charged per directory for the stat calls it cost, deletes per
+file (and per removed folder).  Sleeps end early on cancel.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Mapping
+
+from .rules import parse_size
+
+if TYPE_CHECKING:
+    from .walker import CancelToken
+
+
+class TokenBucket:
+    """*rate* tokens a second, up to *burst* saved while idle; thread-safe."""
+
+    def __init__(self, rate: float, burst: float | None = None):
+        self.rate = float(rate)
+        self.burst = max(1.0, self.rate / 10) if burst is None else float(burst)  # ~100 ms
+        self.waited = 0.0  # seconds callers spent asleep
+        self._tokens = self.burst
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self, n: float, cancel: CancelToken | None = None) -> float:
+        """Spend *n* tokens; sleeps off any debt and returns the seconds slept."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate) - n
+            self._last = now
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait <= 0:
+            return 0.0
+        t0 = time.monotonic()
+        if cancel is not None:
+            cancel.wait(wait)
+        else:
+            time.sleep(wait)
+        slept = time.monotonic() - t0
+        with self._lock:
+            self.waited += slept
+        return slept
+
+
+@dataclass
+class Limits:
+    """Throttle settings, from the rules YAML `settings:` block and / or CLI."""
+
+    stat_rate: float | None = None    # stat calls / s, all scan threads together
+    unlink_rate: float | None = None  # files + folders removed / s
+    delete_rate: int | None = None    # bytes / s of files removed
+    low_priority: bool = False        # lower CPU + I/O priority at start
+
+    @classmethod
+    def from_settings(cls, raw: Mapping | None) -> Limits:
+        """Limits of a `settings:` mapping; ValueError names a bad entry."""
+        raw = raw or {}
+        rate = raw.get("delete_rate")
+        try:
+            delete_rate = parse_size(rate) if rate is not None else None
+        except (TypeError, ValueError):
+            raise ValueError(f"settings.delete_rate: not a size: {rate!r} (e.g. 50M)") from None
+        if delete_rate is not None and delete_rate <= 0:
+            raise ValueError(f"settings.delete_rate: must be > 0, not {rate!r}")
+        return cls(stat_rate=_rate(raw, "stat_rate"), unlink_rate=_rate(raw, "unlink_rate"),
+                   delete_rate=delete_rate,
+                   low_priority=bool(raw.get("low_priority", False)))
+
+    def throttle(self) -> Throttle | None:
+        """A Throttle for these limits, or None when nothing is limited."""
+        if not (self.stat_rate or self.unlink_rate or self.delete_rate):
+            return None
+        return Throttle(self)
+
+
+def _rate(raw: Mapping, name: str) -> float | None:
+    value = raw.get(name)
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not value > 0:
+        raise ValueError(f"settings.{name}: must be a number > 0, not {value!r}")
+    return float(value)
+
+
+class Throttle:
+    """The buckets of one set of Limits, shared by all threads of a call."""
+
+    def __init__(self, limits: Limits):
+        self.limits = limits
+        self._stat = TokenBucket(limits.stat_rate) if limits.stat_rate else None
+        self._unlink = TokenBucket(limits.unlink_rate) if limits.unlink_rate else None
+        self._bytes = TokenBucket(limits.delete_rate) if limits.delete_rate else None
+
+    def stats(self, n: int, cancel: CancelToken | None = None) -> float:
+        """Charge *n* stat calls; returns the seconds slept."""
+        if self._stat is None or n <= 0:
+            return 0.0
+        return self._stat.take(n, cancel)
+
+    def unlink(self, size: int = 0, cancel: CancelToken | None = None) -> float:
+        """Charge one removal freeing *size* bytes; returns the seconds slept."""
+        waited = 0.0
+        if self._unlink is not None:
+            waited += self._unlink.take(1, cancel)
+        if self._bytes is not None and size > 0:
+            waited += self._bytes.take(size, cancel)
+        return waited
+
+    @property
+    def scan_waited(self) -> float:
+        return self._stat.waited if self._stat is not None else 0.0
+
+    @property
+    def clean_waited(self) -> float:
+        return sum(b.waited for b in (self._unlink, self._bytes) if b is not None)
+
+
+def lower_priority() -> bool:
+    """Move this process to background CPU and I/O priority; False if the
+    platform refused.
+
+    Windows gets PROCESS_MODE_BACKGROUND_BEGIN (CPU, I/O and memory
+    priority at once).  Elsewhere the process is reniced to 19; Linux
+    derives the I/O priority of such a process from its nice value, which
+    puts it at best-effort level 7.
+    """
+    if sys.platform == "win32":
+        import ctypes
+
+        kernel32 = ctypes.windll.kernel32
+        PROCESS_MODE_BACKGROUND_BEGIN = 0x00100000
+        return bool(kernel32.SetPriorityClass(kernel32.GetCurrentProcess(),
+                                              PROCESS_MODE_BACKGROUND_BEGIN))
+    try:
+        os.nice(max(0, 19 - os.nice(0)))
+    except OSError:
+        return False
+    return True
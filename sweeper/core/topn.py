@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+sweeper.core.topn
+~~~~~~~~~~~~~~~~~
+
+The N largest files and N largest immediate sub-folders of one root,
+tracked during the walk with bounded min-heaps – O(N) memory whatever the
+size of the tree.
+
+Folder totals rely on the walkers' LIFO stack: once the walk enters an
+immediate sub-folder it finishes that whole subtree before the next one,
+so only the folder currently being walked needs a running total.
+"""
+
+from __future__ import annotations
+
+import heapq
+
+
+class TopN:
+    """Bounded "largest N" lists; sizes are the bytes the walk counted."""
+
+    def __init__(self, n: int):
+        self.n = max(1, n)
+        self.floor = 0  # a file must be bigger than this to get in
+        self._files: list[tuple[int, str]] = []
+        self._dirs: list[tuple[int, str]] = []
+        self._cur: tuple[str, int] | None = None  # (path, its own entry bytes)
+        self._cur_size = 0
+
+    def file(self, size: int, path: str) -> None:
+        if len(self._files) < self.n:
+            heapq.heappush(self._files, (size, path))
+        else:
+            heapq.heappushpop(self._files, (size, path))
+        if len(self._files) == self.n:
+            self.floor = self._files[0][0]
+
+    def visit(self, top: tuple[str, int] | None) -> None:
+        """A directory of the immediate sub-folder *top* is being walked."""
+        if top is not self._cur:
+            self._flush()
+            self._cur = top
+            self._cur_size = top[1] if top is not None else 0
+
+    def add(self, size: int) -> None:
+        """Bytes counted in the directory last passed to `visit()`."""
+        if self._cur is not None:
+            self._cur_size += size
+
+    def finish(self) -> TopN:
+        self._flush()
+        self._cur = None
+        return self
+
+    def _flush(self) -> None:
+        if self._cur is None:
+            return
+        item = (self._cur_size, self._cur[0])
+        if len(self._dirs) < self.n:
+            heapq.heappush(self._dirs, item)
+        else:
+            heapq.heappushpop(self._dirs, item)
+
+    @property
+    def files(self) -> list[tuple[int, str]]:
+        """(size, path), biggest first."""
+        return sorted(self._files, reverse=True)
+
+    @property
+    def dirs(self) -> list[tuple[int, str]]:
+        """(size, path) of immediate sub-folders, biggest first."""
+        return sorted(self._dirs, reverse=True)
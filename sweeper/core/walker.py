@@ -0,0 +1,1039 @@
+#!/usr/bin/env python3
+"""
+sweeper.core.walker
+~~~~~~~~~~~~~~~~~~~
+
+scandir-driven tree walker behind `collect()`:
+• explicit stack – no recursion, one directory handle open at a time
+• reuses the DirEntry type / stat data instead of building Path objects
+• never descends into symlinked directories
+• optional ScanIndex: unchanged directories are taken from the index
+• per-directory progress hook + cooperative CancelToken
+• per-rule include / exclude / prune globs applied during the same walk
+• `walk_shared()`: nested / repeated roots share one pass over the disk
+• optional SizeTree of per-directory sizes for drill-down views
+• optional TopN: largest files / immediate sub-folders in bounded heaps
+• optional AgeHistogram: counted bytes by age, for any later min_age
+• optional InodeSet: hard-linked files count once, allocated bytes on the side
+• optional one-filesystem mode: mount points below the root are not entered
+• big trees fan out over work-stealing threads past PARALLEL_THRESHOLD entries
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import hashlib
+import os
+import re
+import stat as st_mod
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Iterable, Pattern
+
+from .agehist import AgeHistogram
+from .inodes import InodeSet, allocated, linked
+from .sizetree import SizeTree
+from .topn import TopN
+
+if TYPE_CHECKING:
+    from .index import ScanIndex
+    from .rules import Rule
+
+
+class CancelToken:
+    """Cooperative cancel flag shared by a caller and running walks.
+
+    A token created with a *parent* also reports cancelled once the parent
+    is, so internal shutdowns never have to touch the caller's token.
+    """
+
+    def __init__(self, parent: CancelToken | None = None):
+        self._event = threading.Event()
+        self._parent = parent
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set() or (self._parent is not None and self._parent.cancelled)
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Sleep until `cancel()` or *timeout*; returns `cancelled` (a parent's
+        cancel is only noticed once the wait ends)."""
+        self._event.wait(timeout)
+        return self.cancelled
+
+
+def _compile(patterns: Iterable[str]) -> tuple[Pattern | None, Pattern | None]:
+    """(name regex, relative-path regex) for a list of globs."""
+    flags = re.IGNORECASE if os.name == "nt" else 0
+    by_name, by_rel = [], []
+    for pat in patterns:
+        pat = pat.replace("\\", "/").strip("/")
+        (by_rel if "/" in pat else by_name).append(fnmatch.translate(pat))
+    return tuple(re.compile("|".join(p), flags) if p else None  # type: ignore[return-value]
+                 for p in (by_name, by_rel))
+
+
+class PathFilter:
+    """A rule's include / exclude / prune globs, compiled once per scan.
+
+    Globs without a slash match the entry name, others the path relative to
+    the walk root ("Cache_Data/index").  *include* / *exclude* decide which
+    files count; *prune* names directories that are never descended (nor
+    counted).  With an include list, directory entries themselves no longer
+    add to the total – only matching files do.
+    """
+
+    def __init__(self, include: Iterable[str] = (), exclude: Iterable[str] = (),
+                 prune: Iterable[str] = ()):
+        include, exclude, prune = list(include), list(exclude), list(prune)
+        self._inc = _compile(include) if include else None
+        self._exc = _compile(exclude)
+        self._prune = _compile(prune)
+        self.count_dirs = not include
+        self.uses_rel = any("/" in p.replace("\\", "/").strip("/")
+                            for p in include + exclude + prune)
+        sig = "\0".join(["i", *include, "e", *exclude, "p", *prune])
+        self.tag = "f" + hashlib.sha1(sig.encode("utf-8")).hexdigest()[:12]
+
+    @classmethod
+    def for_rule(cls, rule: Rule) -> PathFilter | None:
+        if not (rule.include or rule.exclude or rule.prune):
+            return None
+        return cls(rule.include, rule.exclude, rule.prune)
+
+    @staticmethod
+    def _hit(rx: tuple[Pattern | None, Pattern | None], name: str, rel: str) -> bool:
+        by_name, by_rel = rx
+        return bool((by_name and by_name.match(name)) or (by_rel and by_rel.match(rel)))
+
+    def keep_file(self, name: str, rel: str) -> bool:
+        if self._inc is not None and not self._hit(self._inc, name, rel):
+            return False
+        return not self._hit(self._exc, name, rel)
+
+    def prune_dir(self, name: str, rel: str) -> bool:
+        return self._hit(self._prune, name, rel)
+
+
+@dataclass
+class WalkStats:
+    size: int = 0      # bytes of entries older than the cutoff
+    files: int = 0     # non-directory entries (symlinks included)
+    dirs: int = 0      # sub-directories below the root
+    errors: int = 0    # OSErrors swallowed while listing / stat-ing
+    cached: int = 0    # directories answered from the index
+    stat_calls: int = 0
+    skipped: int = 0   # bytes seen but not older than the cutoff
+    alloc: int = 0     # allocated bytes of what `size` counts (links mode only)
+    linked: int = 0    # bytes of repeat hard links, not counted again
+    cancelled: bool = False  # walk stopped early – totals are partial
+
+
+OnDir = Callable[[WalkStats], None]
+
+PARALLEL_THRESHOLD = 50_000  # entries a walk sees before it fans out
+PARALLEL_WORKERS = min(8, os.cpu_count() or 1)
+ONE_FS_TAG = "/1fs"  # index rows of one_fs walks lack other filesystems' folders
+
+_REPARSE_POINT = 0x400  # FILE_ATTRIBUTE_REPARSE_POINT
+
+
+def _foreign(st: os.stat_result, dev: int) -> bool:
+    """A directory on another filesystem than *dev*.  Windows listings carry
+    no device number; mount points there show up as reparse points."""
+    if st.st_dev and dev and st.st_dev != dev:
+        return True
+    return bool(getattr(st, "st_file_attributes", 0) & _REPARSE_POINT)
+
+
+def walk_tree(
+    root: Path | str,
+    *,
+    cutoff: float | None = None,
+    filters: PathFilter | None = None,
+    index: ScanIndex | None = None,
+    tag: str = "",
+    on_dir: OnDir | None = None,
+    cancel: CancelToken | None = None,
+    tree: SizeTree | None = None,
+    top: TopN | None = None,
+    hist: AgeHistogram | None = None,
+    links: InodeSet | None = None,
+    one_fs: bool = False,
+    threads: int = PARALLEL_WORKERS,
+    parallel_after: int | None = None,
+) -> WalkStats:
+    """Walk *root* and total every entry below it.
+
+    Entries whose mtime is not older than *cutoff* are counted but do not
+    add to `size`; *filters* decide which files count and which directories
+    are pruned.  A missing root yields empty stats; a file root is sized on
+    its own.  With an *index*, directories whose mtime is unchanged are not
+    listed again and fresh listings are written back under *tag* (plus the
+    filter's own tag and, with *one_fs*, ONE_FS_TAG).  *on_dir* runs after every directory with the
+    running stats; *cancel* is checked before each directory.  A *tree* is
+    filled with the counted bytes of every sub-directory and finished; *top*
+    collects the largest files and immediate sub-folders (its walks list
+    every directory, though fresh listings still refresh the index); *hist*
+    gets every counted entry by age, whatever the cutoff.
+
+    *links* switches on hardlink-aware accounting: a file with several links
+    counts once (repeats go to `linked`), `alloc` gets the allocated bytes
+    of everything counted, and index rows – which hold neither – are not
+    used.  *one_fs* keeps the walk off directories on other filesystems.
+
+    Once a walk without *top* or *links* has seen *parallel_after* entries
+    (default PARALLEL_THRESHOLD) the rest of the tree is split over *threads*
+    work-stealing threads; totals – and the *tree* – stay exact.  *on_dir*
+    then runs on those threads, one call at a time.
+    """
+    stats = WalkStats(stat_calls=1)
+    path = os.fspath(root)
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return stats
+    except OSError:
+        stats.errors += 1
+        return stats
+
+    if not st_mod.S_ISDIR(st.st_mode):
+        stats.files = 1
+        if cutoff is None or st.st_mtime < cutoff:
+            stats.size = st.st_size
+            if links is not None:
+                stats.alloc = allocated(st)
+        else:
+            stats.skipped = st.st_size
+        if tree is not None:
+            tree.size[0], tree.files[0] = stats.size, 1
+            tree.finish()
+        if hist is not None:
+            hist.add(st.st_mtime, st.st_size)
+        return stats
+
+    dev = st.st_dev if one_fs else None
+    par = None  # (threads, entries before fanning out)
+    if threads > 1 and top is None and links is None:
+        par = (threads, PARALLEL_THRESHOLD if parallel_after is None else parallel_after)
+    if index is None:
+        _walk_plain(path, cutoff, filters, stats, on_dir, cancel, tree, top, hist,
+                    links, dev, par)
+    else:
+        if filters is not None:
+            tag += filters.tag
+        if one_fs:
+            tag += ONE_FS_TAG
+        _walk_indexed(os.path.abspath(path), st, cutoff, filters, index, tag, stats,
+                      on_dir, cancel, tree, top, hist, links, dev, par)
+    if tree is not None:
+        tree.finish()
+    if top is not None:
+        top.finish()
+    return stats
+
+
+def _rel(rel: str, name: str) -> str:
+    return f"{rel}/{name}" if rel else name
+
+
+def _walk_plain(root: str, cutoff: float | None, filt: PathFilter | None,
+                stats: WalkStats, on_dir: OnDir | None, cancel: CancelToken | None,
+                tree: SizeTree | None, top: TopN | None, hist: AgeHistogram | None,
+                links: InodeSet | None, dev: int | None,
+                par: tuple[int, int] | None = None) -> None:
+    uses_rel = filt is not None and filt.uses_rel
+    count_dirs = filt is None or filt.count_dirs
+    stack = [(root, "", 0, None)]
+    while stack:
+        if cancel is not None and cancel.cancelled:
+            stats.cancelled = True
+            return
+        if par is not None and stats.stat_calls >= par[1]:
+            _walk_parallel([(f[0], None, f[1], f[2]) for f in stack], cutoff, filt, None,
+                           "", dev, stats, hist, tree, on_dir, cancel, par[0])
+            return
+        d, rel, node, topk = stack.pop()
+        if top is not None:
+            top.visit(topk)
+        try:
+            with os.scandir(d) as it:
+                for entry in it:
+                    stats.stat_calls += 1
+                    try:
+                        st = entry.stat()
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                    except OSError:
+                        stats.errors += 1
+                        continue
+                    sub_rel = _rel(rel, entry.name) if uses_rel else ""
+                    if is_dir:
+                        if filt is not None and filt.prune_dir(entry.name, sub_rel):
+                            continue
+                        if dev is not None and _foreign(st, dev):
+                            continue
+                        stats.dirs += 1
+                        at = tree.add(node, entry.name) if tree is not None else node
+                        counted = 0
+                        if count_dirs:
+                            if hist is not None:
+                                hist.add(st.st_mtime, st.st_size)
+                            if cutoff is None or st.st_mtime < cutoff:
+                                counted = st.st_size
+                                stats.size += counted
+                                if links is not None:
+                                    stats.alloc += allocated(st)
+                                if tree is not None:
+                                    tree.size[at] += counted
+                            else:
+                                stats.skipped += st.st_size
+                        stack.append((entry.path, sub_rel, at,
+                                      _sub_top(top, topk, entry.path, counted)))
+                        continue
+                    stats.files += 1
+                    if tree is not None:
+                        tree.files[node] += 1
+                    if filt is not None and not filt.keep_file(entry.name, sub_rel):
+                        continue
+                    if links is not None:
+                        lst = linked(entry.path, st)
+                        if lst is not None and not links.add(lst.st_dev, lst.st_ino):
+                            stats.linked += st.st_size
+                            continue
+                    if hist is not None:
+                        hist.add(st.st_mtime, st.st_size)
+                    if cutoff is None or st.st_mtime < cutoff:
+                        stats.size += st.st_size
+                        if links is not None:
+                            stats.alloc += allocated(st)
+                        if tree is not None:
+                            tree.size[node] += st.st_size
+                        if top is not None:
+                            top.add(st.st_size)
+                            if st.st_size > top.floor:
+                                top.file(st.st_size, entry.path)
+                    else:
+                        stats.skipped += st.st_size
+        except OSError:
+            stats.errors += 1
+        if on_dir is not None:
+            on_dir(stats)
+
+
+def _sub_top(top: TopN | None, topk: tuple[str, int] | None, path: str,
+             counted: int) -> tuple[str, int] | None:
+    """Top-N marker for a sub-directory: immediate ones start a new total."""
+    if top is None:
+        return None
+    if topk is None:
+        return (path, counted)
+    top.add(counted)
+    return topk
+
+
+def _walk_indexed(root: str, root_st: os.stat_result, cutoff: float | None,
+                  filt: PathFilter | None, index: ScanIndex, tag: str,
+                  stats: WalkStats, on_dir: OnDir | None, cancel: CancelToken | None,
+                  tree: SizeTree | None, top: TopN | None, hist: AgeHistogram | None,
+                  links: InodeSet | None, dev: int | None,
+                  par: tuple[int, int] | None = None) -> None:
+    from .index import IndexedDir
+
+    uses_rel = filt is not None and filt.uses_rel
+    count_dirs = filt is None or filt.count_dirs
+    stack = [(root, root_st, "", 0, None)]
+    while stack:
+        if cancel is not None and cancel.cancelled:
+            stats.cancelled = True
+            return
+        if par is not None and stats.stat_calls >= par[1]:
+            _walk_parallel([f[:4] for f in stack], cutoff, filt, index, tag, dev, stats,
+                           hist, tree, on_dir, cancel, par[0])
+            return
+        d, dst, rel, node, topk = stack.pop()
+        # rows carry no file names or inodes, so top-N / links walks always list
+        row = (index.lookup(d, tag, dst.st_mtime_ns)
+               if top is None and links is None else None)
+        if row is not None:
+            stats.cached += 1
+            stats.files += row.files
+            stats.errors += row.errors
+            matched = row.total(cutoff)
+            stats.size += matched
+            stats.skipped += row.total(None) - matched
+            if tree is not None:
+                tree.size[node] += matched
+                tree.files[node] += row.files
+            if hist is not None:
+                hist.add_row(row)
+            for name in row.children:  # pruned ones were never stored
+                sub = os.path.join(d, name)
+                stats.stat_calls += 1
+                try:
+                    st = os.stat(sub, follow_symlinks=False)
+                except OSError:
+                    stats.errors += 1
+                    continue
+                if dev is not None and _foreign(st, dev):
+                    continue
+                at = tree.add(node, name) if tree is not None else node
+                if count_dirs:
+                    if hist is not None:
+                        hist.add(st.st_mtime, st.st_size)
+                    if cutoff is None or st.st_mtime < cutoff:
+                        stats.size += st.st_size
+                        if tree is not None:
+                            tree.size[at] += st.st_size
+                    else:
+                        stats.skipped += st.st_size
+                stats.dirs += 1
+                stack.append((sub, st, _rel(rel, name) if uses_rel else "", at, None))
+            if on_dir is not None:
+                on_dir(stats)
+            continue
+
+        if top is not None:
+            top.visit(topk)
+        entries: list[tuple[float, int]] = []
+        children: list[str] = []
+        seen = errors = 0
+        try:
+            with os.scandir(d) as it:
+                for entry in it:
+                    stats.stat_calls += 1
+                    try:
+                        st = entry.stat()
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                    except OSError:
+                        errors += 1
+                        continue
+                    sub_rel = _rel(rel, entry.name) if uses_rel else ""
+                    if is_dir:
+                        if filt is not None and filt.prune_dir(entry.name, sub_rel):
+                            continue
+                        if dev is not None and _foreign(st, dev):
+                            continue
+                        stats.dirs += 1
+                        children.append(entry.name)
+                        at = tree.add(node, entry.name) if tree is not None else node
+                        counted = 0
+                        if count_dirs:
+                            if hist is not None:
+                                hist.add(st.st_mtime, st.st_size)
+                            if cutoff is None or st.st_mtime < cutoff:
+                                counted = st.st_size
+                                stats.size += counted
+                                if links is not None:
+                                    stats.alloc += allocated(st)
+                                if tree is not None:
+                                    tree.size[at] += counted
+                            else:
+                                stats.skipped += st.st_size
+                        stack.append((entry.path, st, sub_rel, at,
+                                      _sub_top(top, topk, entry.path, counted)))
+                        continue
+                    stats.files += 1
+                    seen += 1
+                    if filt is not None and not filt.keep_file(entry.name, sub_rel):
+                        continue
+                    entries.append((st.st_mtime, st.st_size))
+                    if links is not None:
+                        lst = linked(entry.path, st)
+                        if lst is not None and not links.add(lst.st_dev, lst.st_ino):
+                            stats.linked += st.st_size
+                            continue
+                    if hist is not None:
+                        hist.add(st.st_mtime, st.st_size)
+                    if cutoff is None or st.st_mtime < cutoff:
+                        stats.size += st.st_size
+                        if links is not None:
+                            stats.alloc += allocated(st)
+                        if tree is not None:
+                            tree.size[node] += st.st_size
+                        if top is not None:
+                            top.add(st.st_size)
+                            if st.st_size > top.floor:
+                                top.file(st.st_size, entry.path)
+                    else:
+                        stats.skipped += st.st_size
+        except OSError:
+            stats.errors += errors + 1
+        else:  # only complete listings go into the index
+            stats.errors += errors
+            index.store(d, tag, dst.st_mtime_ns,
+                        IndexedDir.build(entries, children, errors, files=seen))
+        if tree is not None:
+            tree.files[node] += seen
+        if on_dir is not None:
+            on_dir(stats)
+
+
+# ── parallel walks ──────────────────────────────────────────────────────────
+_Frame = tuple  # (path, stat or None, rel, SizeTree node)
+
+
+class _Steal:
+    """Work-stealing deques: each thread pushes and pops its own at the
+    right (depth first, warm directory cache); idle threads steal from the
+    left of the others – the shallowest, usually biggest, pending subtree."""
+
+    def __init__(self, threads: int, frames: list[_Frame], cancel: CancelToken):
+        self.queues: list[deque[_Frame]] = [deque() for _ in range(threads)]
+        for i, frame in enumerate(frames):
+            self.queues[i % threads].append(frame)
+        self.cancel = cancel
+        self.outstanding = len(frames)  # queued + being visited
+        self._idle = 0
+        self._cond = threading.Condition()
+
+    def get(self, i: int) -> _Frame | None:
+        """Next directory for thread *i*; None once the walk is over."""
+        n = len(self.queues)
+        while not self.cancel.cancelled:
+            try:
+                return self.queues[i].pop()
+            except IndexError:
+                pass
+            for k in range(1, n):
+                try:
+                    return self.queues[(i + k) % n].popleft()
+                except IndexError:
+                    continue
+            with self._cond:
+                if not self.outstanding:
+                    return None
+                self._idle += 1
+                self._cond.wait(0.005)  # a push may slip past the notify
+                self._idle -= 1
+        return None
+
+    def done(self, i: int, subs: list[_Frame]) -> None:
+        """Thread *i* finished one directory and found *subs*."""
+        self.queues[i].extend(subs)
+        with self._cond:
+            self.outstanding += len(subs) - 1
+            if not self.outstanding:
+                self._cond.notify_all()
+            elif subs and self._idle:
+                self._cond.notify(len(subs))
+
+    def stop(self) -> None:
+        self.cancel.cancel()
+        with self._cond:
+            self._cond.notify_all()
+
+
+def _add(into: WalkStats, part: WalkStats) -> None:
+    into.size += part.size
+    into.files += part.files
+    into.dirs += part.dirs
+    into.errors += part.errors
+    into.cached += part.cached
+    into.stat_calls += part.stat_calls
+    into.skipped += part.skipped
+
+
+def _walk_parallel(frames: list[_Frame], cutoff: float | None, filt: PathFilter | None,
+                   index: ScanIndex | None, tag: str, dev: int | None,
+                   stats: WalkStats, hist: AgeHistogram | None, tree: SizeTree | None,
+                   on_dir: OnDir | None, cancel: CancelToken | None, threads: int) -> None:
+    """Finish a walk from its pending *frames* on *threads* threads.
+
+    Each directory is counted into its own WalkStats and merged under one
+    lock (which also serialises *on_dir*); histograms are per thread and
+    merged at the end, so totals match a serial walk exactly.  A *tree*
+    gets each directory's sub-folders under the same lock, in one run as
+    the serial walks add them, before those are queued.
+    """
+    stop = CancelToken(cancel)
+    steal = _Steal(threads, frames, stop)
+    lock = threading.Lock()
+    hists = [AgeHistogram(hist.now, hist.days) if hist is not None else None
+             for _ in range(threads)]
+    failed: list[BaseException] = []
+
+    def work(i: int) -> None:
+        try:
+            while True:
+                frame = steal.get(i)
+                if frame is None:
+                    return
+                part = WalkStats()
+                subs, kids, own, files = _visit_par(frame, cutoff, filt, index, tag, dev,
+                                                    part, hists[i])
+                with lock:
+                    _add(stats, part)
+                    if tree is not None:
+                        node = frame[3]
+                        tree.size[node] += own
+                        tree.files[node] += files
+                        for k, (name, counted) in enumerate(kids):
+                            at = tree.add(node, name)
+                            tree.size[at] += counted
+                            subs[k] = (*subs[k][:3], at)
+                    if on_dir is not None:
+                        on_dir(stats)
+                steal.done(i, subs)
+        except BaseException as exc:  # re-raised on the calling thread
+            failed.append(exc)
+            steal.stop()
+
+    pool = [threading.Thread(target=work, args=(i,), name=f"sweeper-walk-{i}", daemon=True)
+            for i in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    if failed:
+        raise failed[0]
+    if hist is not None:
+        for h in hists:
+            hist.merge(h)  # type: ignore[arg-type]
+    if stop.cancelled:
+        stats.cancelled = True
+
+
+def _visit_par(frame: _Frame, cutoff: float | None, filt: PathFilter | None,
+               index: ScanIndex | None, tag: str, dev: int | None, stats: WalkStats,
+               hist: AgeHistogram | None) -> tuple[list[_Frame], list[tuple[str, int]], int, int]:
+    """One directory of `_walk_parallel()`: its sub-directory frames (node
+    still unset), their (name, counted bytes), the bytes its files counted
+    and its file count – what a SizeTree needs.
+
+    The plain (*index* None) and indexed walks in one body, minus the
+    top / links bookkeeping those walks never fan out with.
+    """
+    from .index import IndexedDir
+
+    d, dst, rel, node = frame
+    uses_rel = filt is not None and filt.uses_rel
+    count_dirs = filt is None or filt.count_dirs
+    subs: list[_Frame] = []
+    kids: list[tuple[str, int]] = []
+    row = index.lookup(d, tag, dst.st_mtime_ns) if index is not None else None
+    if row is not None:
+        stats.cached += 1
+        stats.files += row.files
+        stats.errors += row.errors
+        matched = row.total(cutoff)
+        stats.size += matched
+        stats.skipped += row.total(None) - matched
+        if hist is not None:
+            hist.add_row(row)
+        for name in row.children:
+            sub = os.path.join(d, name)
+            stats.stat_calls += 1
+            try:
+                st = os.stat(sub, follow_symlinks=False)
+            except OSError:
+                stats.errors += 1
+                continue
+            if dev is not None and _foreign(st, dev):
+                continue
+            counted = 0
+            if count_dirs:
+                if hist is not None:
+                    hist.add(st.st_mtime, st.st_size)
+                if cutoff is None or st.st_mtime < cutoff:
+                    counted = st.st_size
+                    stats.size += counted
+                else:
+                    stats.skipped += st.st_size
+            stats.dirs += 1
+            subs.append((sub, st, _rel(rel, name) if uses_rel else "", node))
+            kids.append((name, counted))
+        return subs, kids, matched, row.files
+
+    entries: list[tuple[float, int]] = []
+    children: list[str] = []
+    seen = errors = own = 0
+    try:
+        with os.scandir(d) as it:
+            for entry in it:
+                stats.stat_calls += 1
+                try:
+                    st = entry.stat()
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    errors += 1
+                    continue
+                sub_rel = _rel(rel, entry.name) if uses_rel else ""
+                if is_dir:
+                    if filt is not None and filt.prune_dir(entry.name, sub_rel):
+                        continue
+                    if dev is not None and _foreign(st, dev):
+                        continue
+                    stats.dirs += 1
+                    children.append(entry.name)
+                    subs.append((entry.path, st, sub_rel, node))
+                    kids.append((entry.name, 0))
+                    if not count_dirs:
+                        continue
+                else:
+                    stats.files += 1
+                    seen += 1
+                    if filt is not None and not filt.keep_file(entry.name, sub_rel):
+                        continue
+                    entries.append((st.st_mtime, st.st_size))
+                if hist is not None:
+                    hist.add(st.st_mtime, st.st_size)
+                if cutoff is None or st.st_mtime < cutoff:
+                    stats.size += st.st_size
+                    if is_dir:
+                        kids[-1] = (entry.name, st.st_size)
+                    else:
+                        own += st.st_size
+                else:
+                    stats.skipped += st.st_size
+    except OSError:
+        stats.errors += errors + 1
+    else:
+        stats.errors += errors
+        if index is not None:
+            index.store(d, tag, dst.st_mtime_ns,
+                        IndexedDir.build(entries, children, errors, files=seen))
+    return subs, kids, own, seen
+
+
+# ── shared walks ────────────────────────────────────────────────────────────
+@dataclass
+class WalkJob:
+    """One root to size inside a shared walk; results land in `stats`."""
+
+    root: Path | str
+    cutoff: float | None = None
+    filters: PathFilter | None = None
+    tag: str = ""
+    on_dir: OnDir | None = None
+    ref: object = None  # caller's handle, e.g. (rule, path)
+    tree: SizeTree | None = None
+    top: TopN | None = None
+    hist: AgeHistogram | None = None
+    links: InodeSet | None = None
+    one_fs: bool = False
+    stats: WalkStats = field(default_factory=WalkStats)
+
+    def __post_init__(self):
+        self.path = os.path.abspath(os.fspath(self.root))
+        self.key = (self.tag + (self.filters.tag if self.filters is not None else "")
+                    + (ONE_FS_TAG if self.one_fs else ""))
+        self.reached = False
+        self.dev: int | None = None  # root's device, once reached with one_fs
+
+
+class _Node:
+    """Prefix-tree node: one path component, the jobs rooted exactly here."""
+
+    __slots__ = ("kids", "jobs")
+
+    def __init__(self):
+        self.kids: dict[str, _Node] = {}
+        self.jobs: list[WalkJob] = []
+
+
+def _trie(jobs: Iterable[WalkJob]) -> _Node:
+    top = _Node()
+    for job in jobs:
+        node = top
+        for part in os.path.normcase(job.path).split(os.sep):
+            if part:
+                node = node.kids.setdefault(part, _Node())
+        node.jobs.append(job)
+    return top
+
+
+def _outermost(node: _Node) -> Iterable[_Node]:
+    if node.jobs:
+        yield node
+        return
+    for kid in node.kids.values():
+        yield from _outermost(kid)
+
+
+def group_jobs(jobs: list[WalkJob]) -> list[list[WalkJob]]:
+    """Split *jobs* into groups that one `walk_shared()` pass can serve.
+
+    Every group holds one outermost root plus all roots equal to or nested
+    below it; groups come out in the order of their first job.
+    """
+    order = {id(j): i for i, j in enumerate(jobs)}
+    groups = []
+    for node in _outermost(_trie(jobs)):
+        group: list[WalkJob] = []
+        stack = [node]
+        while stack:
+            n = stack.pop()
+            group.extend(n.jobs)
+            stack.extend(n.kids.values())
+        groups.append(sorted(group, key=lambda j: order[id(j)]))
+    return sorted(groups, key=lambda g: order[id(g[0])])
+
+
+def walk_shared(jobs: list[WalkJob], *, index: ScanIndex | None = None,
+                cancel: CancelToken | None = None,
+                threads: int = PARALLEL_WORKERS) -> list[WalkJob]:
+    """Size every job's root while reading each physical directory once.
+
+    Each directory is listed a single time and credited to every job whose
+    root contains it, with that job's own cutoff, filters and index tag, so
+    `job.stats` ends up exactly what `walk_tree()` would report for it.
+    Roots the shared pass cannot reach (below a symlink, a pruned or
+    unreadable folder) are walked on their own afterwards, as are lone
+    roots with nothing nested, so big ones can fan out over *threads*.
+    """
+    top = _trie(jobs)
+    for job in jobs:
+        job.stats = WalkStats(stat_calls=1)
+        job.reached = False
+        if job.tree is not None:  # start over on every walk
+            job.tree = SizeTree(job.path, max_nodes=job.tree.max_nodes)
+        if job.top is not None:
+            job.top = TopN(job.top.n)
+        if job.hist is not None:
+            job.hist = AgeHistogram(job.hist.now, job.hist.days)
+        if job.links is not None:
+            job.links = InodeSet(job.links.max_items)
+    for node in _outermost(top):
+        if threads > 1 and len(node.jobs) == 1 and not node.kids:
+            continue  # nothing to share: walk_tree() below
+        _walk_group(node, index, cancel)
+        if cancel is not None and cancel.cancelled:
+            break
+    for job in jobs:
+        if not job.reached:
+            job.stats = walk_tree(job.root, cutoff=job.cutoff, filters=job.filters,
+                                  index=index, tag=job.tag, on_dir=job.on_dir,
+                                  cancel=cancel, tree=job.tree, top=job.top,
+                                  hist=job.hist, links=job.links, one_fs=job.one_fs,
+                                  threads=threads)
+            continue
+        if job.tree is not None:
+            job.tree.finish()
+        if job.top is not None:
+            job.top.finish()
+    return jobs
+
+
+def _walk_group(node: _Node, index: ScanIndex | None,
+                cancel: CancelToken | None) -> None:
+    jobs = node.jobs
+    for job in jobs:
+        job.reached = True
+    top = jobs[0].path
+    try:
+        st = os.stat(top)
+    except FileNotFoundError:
+        return
+    except OSError:
+        for job in jobs:
+            job.stats.errors += 1
+        return
+    for job in jobs:
+        job.dev = st.st_dev if job.one_fs else None
+    if not st_mod.S_ISDIR(st.st_mode):
+        for job in jobs:
+            job.stats.files = 1
+            if job.cutoff is None or st.st_mtime < job.cutoff:
+                job.stats.size = st.st_size
+                if job.links is not None:
+                    job.stats.alloc = allocated(st)
+            else:
+                job.stats.skipped = st.st_size
+            if job.tree is not None:
+                job.tree.size[0], job.tree.files[0] = job.stats.size, 1
+            if job.hist is not None:
+                job.hist.add(st.st_mtime, st.st_size)
+        return
+
+    stack = [(top, st, node, [(job, "", 0, None) for job in jobs])]
+    while stack:
+        if cancel is not None and cancel.cancelled:
+            for job in _all_jobs(node):
+                job.stats.cancelled = True
+            return
+        _visit_shared(*stack.pop(), index, stack)
+
+
+def _all_jobs(node: _Node) -> Iterable[WalkJob]:
+    stack = [node]
+    while stack:
+        n = stack.pop()
+        yield from n.jobs
+        stack.extend(n.kids.values())
+
+
+_Listed = tuple[str, str, "os.stat_result | None", bool]  # name, path, stat, is_dir
+
+
+def _visit_shared(d: str, dst: os.stat_result, node: _Node | None,
+                  active: list[tuple[WalkJob, str, int, tuple | None]],
+                  index: ScanIndex | None,
+                  stack: list) -> None:
+    from .index import IndexedDir
+
+    rows = [index.lookup(d, job.key, dst.st_mtime_ns)
+            if index is not None and job.top is None and job.links is None else None
+            for job, _, _, _ in active]
+    listing: list[_Listed] | None = None
+    broken = False
+    if any(row is None for row in rows):
+        listing = []
+        try:
+            with os.scandir(d) as it:
+                for entry in it:
+                    try:
+                        listing.append((entry.name, entry.path, entry.stat(),
+                                        entry.is_dir(follow_symlinks=False)))
+                    except OSError:
+                        listing.append((entry.name, entry.path, None, False))
+        except OSError:
+            broken = True
+
+    # name -> (path, stat, [(job, rel, tree node, top-N marker)]) per sub-directory
+    kids: dict[str, tuple[str, os.stat_result, list[tuple]]] = {}
+    child_st: dict[str, os.stat_result | None] = {}
+
+    def enter(name: str, path: str, st: os.stat_result, job: WalkJob, rel: str,
+              at: int, topk: tuple | None = None) -> None:
+        kids.setdefault(name, (path, st, []))[2].append((job, rel, at, topk))
+
+    stored: set[str] = set()
+    for (job, rel, node_at, topk), row in zip(active, rows):
+        s, filt, cutoff, tree, top = job.stats, job.filters, job.cutoff, job.tree, job.top
+        hist, links, dev = job.hist, job.links, job.dev
+        uses_rel = filt is not None and filt.uses_rel
+        count_dirs = filt is None or filt.count_dirs
+        if row is not None:
+            s.cached += 1
+            s.files += row.files
+            s.errors += row.errors
+            matched = row.total(cutoff)
+            s.size += matched
+            s.skipped += row.total(None) - matched
+            if tree is not None:
+                tree.size[node_at] += matched
+                tree.files[node_at] += row.files
+            if hist is not None:
+                hist.add_row(row)
+            for name in row.children:
+                path = os.path.join(d, name)
+                s.stat_calls += 1
+                if name not in child_st:
+                    try:
+                        child_st[name] = os.stat(path, follow_symlinks=False)
+                    except OSError:
+                        child_st[name] = None
+                st = child_st[name]
+                if st is None:
+                    s.errors += 1
+                    continue
+                if dev is not None and _foreign(st, dev):
+                    continue
+                at = tree.add(node_at, name) if tree is not None else node_at
+                if count_dirs:
+                    if hist is not None:
+                        hist.add(st.st_mtime, st.st_size)
+                    if cutoff is None or st.st_mtime < cutoff:
+                        s.size += st.st_size
+                        if tree is not None:
+                            tree.size[at] += st.st_size
+                    else:
+                        s.skipped += st.st_size
+                s.dirs += 1
+                enter(name, path, st, job, _rel(rel, name) if uses_rel else "", at)
+            continue
+
+        if top is not None:
+            top.visit(topk)
+        entries: list[tuple[float, int]] = []
+        children: list[str] = []
+        seen = errors = 0
+        for name, path, st, is_dir in listing:
+            s.stat_calls += 1
+            if st is None:
+                errors += 1
+                continue
+            sub_rel = _rel(rel, name) if uses_rel else ""
+            if is_dir:
+                if filt is not None and filt.prune_dir(name, sub_rel):
+                    continue
+                if dev is not None and _foreign(st, dev):
+                    continue
+                s.dirs += 1
+                children.append(name)
+                at = tree.add(node_at, name) if tree is not None else node_at
+                counted = 0
+                if count_dirs:
+                    if hist is not None:
+                        hist.add(st.st_mtime, st.st_size)
+                    if cutoff is None or st.st_mtime < cutoff:
+                        counted = st.st_size
+                        s.size += counted
+                        if links is not None:
+                            s.alloc += allocated(st)
+                        if tree is not None:
+                            tree.size[at] += counted
+                    else:
+                        s.skipped += st.st_size
+                enter(name, path, st, job, sub_rel, at, _sub_top(top, topk, path, counted))
+                continue
+            s.files += 1
+            seen += 1
+            if filt is not None and not filt.keep_file(name, sub_rel):
+                continue
+            entries.append((st.st_mtime, st.st_size))
+            if links is not None:
+                lst = linked(path, st)
+                if lst is not None and not links.add(lst.st_dev, lst.st_ino):
+                    s.linked += st.st_size
+                    continue
+            if hist is not None:
+                hist.add(st.st_mtime, st.st_size)
+            if cutoff is None or st.st_mtime < cutoff:
+                s.size += st.st_size
+                if links is not None:
+                    s.alloc += allocated(st)
+                if tree is not None:
+                    tree.size[node_at] += st.st_size
+                if top is not None:
+                    top.add(st.st_size)
+                    if st.st_size > top.floor:
+                        top.file(st.st_size, path)
+            else:
+                s.skipped += st.st_size
+        if tree is not None:
+            tree.files[node_at] += seen
+        if broken:
+            s.errors += errors + 1
+        else:
+            s.errors += errors
+            if index is not None and job.key not in stored:
+                stored.add(job.key)
+                index.store(d, job.key, dst.st_mtime_ns,
+                            IndexedDir.build(entries, children, errors, files=seen))
+
+    # nested roots start here; their own entry stat was the parent's listing
+    if node is not None and node.kids:
+        found = {os.path.normcase(name): (name, path, st)
+                 for name, path, st, is_dir in listing or () if is_dir}
+        for name in kids:
+            found.setdefault(os.path.normcase(name), (name, kids[name][0], kids[name][1]))
+        for part, kid in node.kids.items():
+            if kid.jobs and part in found:
+                name, path, st = found[part]
+                for job in kid.jobs:
+                    job.reached = True
+                    job.dev = st.st_dev if job.one_fs else None
+                    enter(name, path, st, job, "", 0)
+
+    for job, _, _, _ in active:
+        if job.on_dir is not None:
+            job.on_dir(job.stats)
+    for name, (path, st, sub) in kids.items():
+        sub_node = node.kids.get(os.path.normcase(name)) if node is not None else None
+        stack.append((path, st, sub_node, sub))
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+sweeper.core.watch
+~~~~~~~~~~~~~~~~~~
+
+Long-running watcher behind `disk-sweeper watch`: keeps every rule's
+sizes warm so reports never wait for a cold scan.
+
+• one refresh per interval through the ordinary `iter_collect()`, backed
+  by an in-memory ScanIndex – after the first pass only directories whose
+  mtime changed are listed again
+• the index is dropped every REBUILD_INTERVAL (an hour), so what its rows
+  cannot see – files rewritten in place, which leave the directory mtime
+  alone – is stale for at most that long
+• the latest result lives in memory and is written to the last-scan
+  snapshot (`disk-sweeper report --cached`) after every refresh
+• optional localhost port answering each connection with the same JSON
+  document (`disk-sweeper report --port N`, `query()`)
+• optional auto-clean: a rule whose candidate reaches its configured size
+  is deleted at once and rescanned
+"""
+
+from __future__ import annotations
+
+import json
+import socket
+import socketserver
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Iterable, Mapping
+
+from .agehist import LAST_SCAN, save_snapshot, snapshot_dict, snapshot_from_dict
+from .cleaner import CleanResult, iter_clean, log_sweep
+from .collector import iter_collect
+from .index import ScanIndex
+from .rules import SEVERITY_ORDER, Candidate, Rule, load_rules
+from .stats import SweepStats
+from .throttle import Throttle
+from .walker import CancelToken
+
+DEFAULT_INTERVAL = 300.0  # seconds between refreshes
+REBUILD_INTERVAL = 3600.0  # seconds between full re-walks (index dropped)
+HOST = "127.0.0.1"
+
+RulesFn = Callable[[], Iterable[Rule]]
+
+
+class Watcher:
+    """Periodic, incremental re-scans of *rules* kept in memory.
+
+    *rules* is a list or a loader called before every refresh (the default
+    re-reads the YAML, so edits apply on the next pass).  *auto_clean* maps
+    rule labels to a size in bytes; *snapshot* is where each refresh is
+    written (None: memory only); a *throttle* paces scans and auto-cleans,
+    and *one_fs* keeps both on each root's filesystem.  The first refresh
+    after every *rebuild* seconds clears the index and walks everything
+    (None: never).
+    """
+
+    def __init__(self, rules: Iterable[Rule] | RulesFn = load_rules, *,
+                 include: set[str] | None = None, interval: float = DEFAULT_INTERVAL,
+                 workers: int = 1, index: ScanIndex | None = None,
+                 snapshot: Path | str | None = LAST_SCAN,
+                 auto_clean: Mapping[str, int] | None = None,
+                 throttle: Throttle | None = None, one_fs: bool = False,
+                 rebuild: float | None = REBUILD_INTERVAL):
+        self._rules = rules if callable(rules) else list(rules)
+        self.include = set(SEVERITY_ORDER) if include is None else include
+        self.interval = interval
+        self.workers = workers
+        self.index = ScanIndex(":memory:") if index is None else index
+        self.snapshot = snapshot
+        self.auto_clean = dict(auto_clean or {})
+        self.throttle = throttle
+        self.one_fs = one_fs
+        self.rebuild = rebuild
+        self._built: float | None = None  # when the index was last started afresh
+        self.cancel = CancelToken()
+        self.candidates: list[Candidate] = []
+        self.when: float | None = None       # start of the last complete refresh
+        self.refreshes = 0
+        self.cleaned: list[CleanResult] = []  # auto-clean results of the last refresh
+        self.stats = SweepStats()             # counters of the last refresh
+        self._lock = threading.Lock()
+        self._server: socketserver.TCPServer | None = None
+
+    # scanning ---------------------------------------------------------------
+    def _scan(self, stats: SweepStats) -> list[Candidate] | None:
+        rules = self._rules() if callable(self._rules) else self._rules
+        cands = list(iter_collect(rules, include=self.include, workers=self.workers,
+                                  index=self.index, cancel=self.cancel, stats=stats,
+                                  ages=True, keep_small=True, throttle=self.throttle,
+                                  one_fs=self.one_fs))
+        return None if self.cancel.cancelled else cands
+
+    def refresh(self) -> list[Candidate]:
+        """Re-scan (incrementally), auto-clean, publish; returns the result."""
+        t0 = time.time()
+        if self._built is None:
+            self._built = t0
+        elif self.rebuild is not None and t0 - self._built >= self.rebuild:
+            self.index.clear()
+            self._built = t0
+        stats = SweepStats()
+        cands = self._scan(stats)
+        if cands is None:
+            return self.candidates
+        due = [c for c in cands
+               if c.rule.label in self.auto_clean and c.size >= self.auto_clean[c.rule.label]]
+        cleaned: list[CleanResult] = []
+        if due:
+            cleaned = list(iter_clean(due, cancel=self.cancel, stats=stats,
+                                      throttle=self.throttle, one_fs=self.one_fs))
+            log_sweep(sum(res.freed for res in cleaned))
+            cands = self._scan(SweepStats())  # only the swept trees are listed again
+            if cands is None:
+                return self.candidates
+        with self._lock:
+            self.candidates, self.when = cands, t0
+            self.cleaned, self.stats = cleaned, stats
+            self.refreshes += 1
+        self.index.flush()
+        if self.snapshot is not None:
+            try:
+                save_snapshot(cands, self.snapshot, when=t0)
+            except OSError:
+                pass
+        return cands
+
+    def report(self) -> dict:
+        """The current state as a snapshot document."""
+        with self._lock:
+            if self.when is None:  # no complete refresh yet
+                return {"when": None}
+            return snapshot_dict(self.candidates, self.when)
+
+    def run(self, on_refresh: Callable[[Watcher], None] | None = None) -> None:
+        """Refresh every `interval` seconds until `stop()`."""
+        while not self.cancel.cancelled:
+            self.refresh()
+            if on_refresh is not None and not self.cancel.cancelled:
+                on_refresh(self)
+            self.cancel.wait(self.interval)
+
+    # query port ---------------------------------------------------------------
+    def serve(self, port: int = 0, host: str = HOST) -> int:
+        """Answer report queries on *host*:*port* from a background thread;
+        returns the bound port (pick one with port 0)."""
+        watcher = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self) -> None:
+                self.request.sendall(json.dumps(watcher.report()).encode("utf-8"))
+
+        server = socketserver.ThreadingTCPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="sweeper-watch",
+                         daemon=True).start()
+        self._server = server
+        return server.server_address[1]
+
+    # lifetime -----------------------------------------------------------------
+    def stop(self) -> None:
+        """Stop `run()` (and any refresh in progress) from any thread."""
+        self.cancel.cancel()
+
+    def close(self) -> None:
+        self.stop()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        self.index.close()
+
+
+def query(port: int, host: str = HOST,
+          timeout: float = 5.0) -> tuple[float, list[Candidate]] | None:
+    """(scan time, candidates) from a running watcher, or None if there is
+    none on *port* or it has not finished its first refresh."""
+    chunks = []
+    try:
+        with socket.create_connection((host, port), timeout=timeout) as conn:
+            while True:
+                chunk = conn.recv(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+        raw = json.loads(b"".join(chunks))
+    except (OSError, ValueError):
+        return None
+    if raw.get("when") is None:
+        return None
+    return snapshot_from_dict(raw)
@@ -3,39 +3,120 @@
 Disk Sweeper Pro – GUI main window
 * Icons + full menu bar
 * Dark/Light toggle, rule reload, log-folder opener, CSV export
+* Scans and sweeps run on worker threads – the UI stays live and abortable
+* Per-row folder breakdown from the scan's SizeTree
+* Min-age slider re-sizes rows live from each candidate's age histogram
+* Quick estimate scans (sampled sizes, marked ≈) + exact refine of picked rows
+* Optional hard-link-aware scans (allocated size in the tooltip), one filesystem
+* Table model sized for 500k rows: cached text, stable check marks, filter box
 """
 
 from __future__ import annotations
+import csv
 import ctypes
-from importlib import reload
 from pathlib import Path
 
-from PySide6.QtCore import Qt, QModelIndex, Slot, QUrl
+from PySide6.QtCore import Qt, QModelIndex, QSortFilterProxyModel, QTimer, Slot, QUrl
 from PySide6.QtGui import QIcon, QKeySequence, QDesktopServices
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QTableView, QAbstractItemView, QPushButton, QLabel, QMessageBox,
-    QProgressDialog, QFileDialog
+    QProgressDialog, QProgressBar, QFileDialog, QSplitter, QTreeWidget,
+    QTreeWidgetItem, QCheckBox, QSlider, QLineEdit, QHeaderView
 )
 
 import sweeper.gui.resources_rc  # compiled RCC icons
 from .widgets import SeverityBadge, SizeAlignDelegate
-from ..core.collector import collect, fmt_sz
-from ..core.cleaner import clean
-from ..core import rules as rules_mod  # for reload
-from ..core.rules import Candidate, SEVERITY_ORDER, LOCAL
+from .workers import CleanWorker, RefineWorker, ScanWorker, start_worker
+from ..core.collector import fmt_sz
+from ..core.index import open_index
+from ..core.rules import Candidate, SEVERITY_ORDER, LOCAL, load_rules, load_settings
+from ..core.throttle import Limits
+from ..core.sizetree import SizeTree
 
 from PySide6.QtCore import QAbstractTableModel
 
 
 # ── Table model -------------------------------------------------------------
 class CandidateModel(QAbstractTableModel):
+    """Scanned roots as table rows, built to stay smooth at 500k rows.
+
+    Per-row sizes are cached (display / filter strings on first use), so
+    paints never call `fmt_sz`.  Check marks are keyed by candidate
+    identity and survive sorting, min-age changes and refines, and
+    `selected_bytes` is kept current instead of re-summed per click.
+    """
     HEADERS = ["✔", "Label", "Size", "Severity", "Reason"]
 
     def __init__(self, rows: list[Candidate]):
         super().__init__()
-        self._rows = rows
-        self._checked = [False] * len(rows)
+        self._all = list(rows)      # every scanned root, min_size not applied
+        self._min_age: int | None = None
+        self._checked: set[int] = set()  # id() of checked candidates
+        self.selected_bytes = 0
+        self._sort: tuple[int, Qt.SortOrder] | None = None  # None: sort_default
+        self._fill()
+
+    def _fill(self):
+        """Rebuild the shown rows and their caches from `_all`."""
+        self._rows: list[Candidate] = []
+        self._size: list[int] = []
+        for c in self._all:
+            size = self.size_of(c)
+            if size >= c.rule.min_size:
+                self._rows.append(c)
+                self._size.append(size)
+        self._text: list[tuple[str, str, str, str] | None] = [None] * len(self._rows)
+        self._hay: list[str | None] = [None] * len(self._rows)
+        checked = self._checked
+        self.selected_bytes = sum(s for c, s in zip(self._rows, self._size)
+                                  if id(c) in checked)
+
+    def size_of(self, cand: Candidate) -> int:
+        """Size under the min-age override, if one is set."""
+        if self._min_age is None or cand.hist is None:
+            return cand.size
+        return cand.bytes_older_than(self._min_age)
+
+    def set_min_age(self, days: int | None):
+        """Re-size every row from its age histogram – no rescan.
+
+        One layout change: rows keep their order, check marks and selection,
+        rows that cross their rule's min_size come or go, and the active
+        sort is applied again.
+        """
+        if days == self._min_age:
+            return
+        self._min_age = days
+        sized = {id(c): self.size_of(c) for c in self._all}
+        self.layoutAboutToBeChanged.emit()
+        old_rows, old_hay = self._rows, self._hay
+        shown = {id(c) for c in old_rows}
+        rows, sizes, hay, where = [], [], [], {}
+        for r, c in enumerate(old_rows):  # survivors, in their current order
+            size = sized[id(c)]
+            if size >= c.rule.min_size:
+                where[r] = len(rows)
+                rows.append(c)
+                sizes.append(size)
+                hay.append(old_hay[r])
+        for c in self._all:  # newcomers, in scan order
+            size = sized[id(c)]
+            if id(c) not in shown and size >= c.rule.min_size:
+                rows.append(c)
+                sizes.append(size)
+                hay.append(None)
+        self._rows, self._size, self._hay = rows, sizes, hay
+        self._text = [None] * len(rows)  # the size column changed
+        checked = self._checked
+        self.selected_bytes = sum(s for c, s in zip(rows, sizes) if id(c) in checked)
+        old = self.persistentIndexList()
+        if old:
+            self.changePersistentIndexList(
+                old, [self.index(where[i.row()], i.column()) if i.row() in where
+                      else QModelIndex() for i in old])
+        self.layoutChanged.emit()
+        self.resort()
 
     # Qt basics
     def rowCount(self, *_): return len(self._rows)
@@ -50,47 +131,250 @@ class CandidateModel(QAbstractTableModel):
 
     def data(self, idx: QModelIndex, role):
         r, c = idx.row(), idx.column()
-        cand = self._rows[r]
+        if role == Qt.DisplayRole:
+            if c == 0:
+                return None
+            text = self._text[r]
+            if text is None:
+                text = self._text[r] = self._display(r)
+            return text[c - 1]
         if c == 0 and role == Qt.CheckStateRole:
-            return Qt.Checked if self._checked[r] else Qt.Unchecked
-        if role != Qt.DisplayRole:
-            return None
-        return (cand.rule.label,
-                fmt_sz(cand.size),
-                cand.rule.severity,
-                cand.rule.reason)[c - 1]
+            return Qt.Checked if id(self._rows[r]) in self._checked else Qt.Unchecked
+        if c == 2 and role == Qt.ToolTipRole:
+            cand = self._rows[r]
+            est = cand.estimate
+            if est is not None and not est.exact:
+                return (f"Estimated from {est.probes} probes: "
+                        f"{fmt_sz(est.low)} – {fmt_sz(est.high)}")
+            if cand.alloc is not None:
+                return f"{fmt_sz(cand.alloc)} allocated on disk"
+        return None
+
+    def _display(self, r: int) -> tuple[str, str, str, str]:
+        cand = self._rows[r]
+        est = cand.estimate
+        rough = "≈ " if est is not None and not est.exact else ""
+        return (cand.rule.label, rough + fmt_sz(self._size[r]), cand.rule.severity,
+                cand.rule.reason)
+
+    def haystack(self, r: int) -> str:
+        """Lower-case text the filter box matches against."""
+        hay = self._hay[r]
+        if hay is None:
+            c = self._rows[r]
+            hay = self._hay[r] = "\t".join(
+                (c.rule.label, c.rule.severity, c.rule.reason, str(c.path))).lower()
+        return hay
 
     def setData(self, idx: QModelIndex, value, role):
         if idx.column() == 0 and role == Qt.CheckStateRole:
-            self._checked[idx.row()] = (value == Qt.Checked)
+            self._set_checked(idx.row(), value == Qt.Checked)
             self.dataChanged.emit(idx, idx)
             return True
         return False
 
-    # sorting
-    def sort(self, column, order):
-        rev = order == Qt.DescendingOrder
-        def key(c: Candidate):
-            return (c.rule.label, c.size,
-                    SEVERITY_ORDER[c.rule.severity], c.rule.reason)[column-1] if column else 0
-        self.beginResetModel()
-        self._rows.sort(key=key, reverse=rev)
-        self._checked = [False]*len(self._rows)
-        self.endResetModel()
-
-    # helpers
-    def toggle_all(self, state: bool):
-        self._checked = [state]*len(self._checked)
-        self.dataChanged.emit(self.index(0,0), self.index(len(self._rows)-1,0))
-    def invert(self):
-        self._checked = [not x for x in self._checked]
-        self.dataChanged.emit(self.index(0,0), self.index(len(self._rows)-1,0))
-    def selected(self): return [c for c,ck in zip(self._rows,self._checked) if ck]
+    def _set_checked(self, r: int, on: bool):
+        key = id(self._rows[r])
+        if on == (key in self._checked):
+            return
+        if on:
+            self._checked.add(key)
+            self.selected_bytes += self._size[r]
+        else:
+            self._checked.discard(key)
+            self.selected_bytes -= self._size[r]
+
+    # sorting – a permutation of cached keys; layout change, not a reset
+    def sort(self, column, order=Qt.AscendingOrder):
+        rows, checked = self._rows, self._checked
+        if column == 0:
+            keys = [id(c) in checked for c in rows]
+        elif column == 2:
+            keys = self._size
+        elif column == 3:
+            keys = [SEVERITY_ORDER[c.rule.severity] for c in rows]
+        else:
+            attr = "label" if column == 1 else "reason"
+            keys = [getattr(c.rule, attr).lower() for c in rows]
+        self._sort = (column, order)
+        self._reorder(sorted(range(len(rows)), key=keys.__getitem__,
+                             reverse=order == Qt.DescendingOrder))
+
+    def resort(self):
+        """Apply the last sort again (after sizes changed)."""
+        if self._sort is None:
+            self.sort_default()
+        else:
+            self.sort(*self._sort)
+
+    def sort_default(self):
+        """Severity first, then biggest first."""
+        self._sort = None
+        sev = [SEVERITY_ORDER[c.rule.severity] for c in self._rows]
+        by_size = sorted(range(len(sev)), key=self._size.__getitem__, reverse=True)
+        self._reorder(sorted(by_size, key=sev.__getitem__))  # stable: size order kept
+
+    def _reorder(self, perm: list[int]):
+        self.layoutAboutToBeChanged.emit()
+        self._rows = [self._rows[i] for i in perm]
+        self._size = [self._size[i] for i in perm]
+        self._text = [self._text[i] for i in perm]
+        self._hay = [self._hay[i] for i in perm]
+        old = self.persistentIndexList()  # selection / current row follow along
+        if old:
+            need = {i.row() for i in old}
+            where = {o: n for n, o in enumerate(perm) if o in need}
+            self.changePersistentIndexList(
+                old, [self.index(where[i.row()], i.column()) for i in old])
+        self.layoutChanged.emit()
+
+    def append(self, cand: Candidate):
+        self.extend([cand])
+
+    def extend(self, cands: list[Candidate]):
+        """Add scan results in one insert (one signal per batch, not per row)."""
+        new = []
+        for c in cands:
+            self._all.append(c)
+            size = self.size_of(c)
+            if size >= c.rule.min_size:
+                new.append((c, size))
+        if not new:
+            return
+        n = len(self._rows)
+        self.beginInsertRows(QModelIndex(), n, n + len(new) - 1)
+        for c, size in new:
+            self._rows.append(c)
+            self._size.append(size)
+        self._text.extend([None] * len(new))
+        self._hay.extend([None] * len(new))
+        self.endInsertRows()
+
+    def replace(self, old: Candidate, new: Candidate):
+        """Swap a row's candidate (after a refine); rows below min_size go."""
+        self._all = [new if c is old else c for c in self._all]
+        r = next((i for i, c in enumerate(self._rows) if c is old), None)
+        if r is None:
+            return
+        was_checked = id(old) in self._checked
+        self._set_checked(r, False)
+        size = self.size_of(new)
+        if size >= new.rule.min_size:
+            self._rows[r], self._size[r] = new, size
+            self._text[r] = self._hay[r] = None
+            self._set_checked(r, was_checked)
+            self.dataChanged.emit(self.index(r, 0), self.index(r, self.columnCount() - 1))
+        else:
+            self.beginRemoveRows(QModelIndex(), r, r)
+            for cache in (self._rows, self._size, self._text, self._hay):
+                del cache[r]
+            self.endRemoveRows()
+
+    # helpers – *rows* limits a bulk change to some rows (e.g. the filtered ones)
+    def toggle(self, row: int):
+        self._set_checked(row, id(self._rows[row]) not in self._checked)
+        idx = self.index(row, 0)
+        self.dataChanged.emit(idx, idx)
+
+    def toggle_all(self, state: bool, rows: list[int] | None = None):
+        if rows is None:
+            ids = {id(c) for c in self._rows}
+            if state:
+                self._checked |= ids
+                self.selected_bytes = sum(self._size)
+            else:
+                self._checked -= ids
+                self.selected_bytes = 0
+        else:
+            for r in rows:
+                self._set_checked(r, state)
+        self._all_changed()
+
+    def invert(self, rows: list[int] | None = None):
+        if rows is None:
+            ids = {id(c) for c in self._rows}
+            self._checked = (self._checked - ids) | (ids - self._checked)
+            self.selected_bytes = sum(self._size) - self.selected_bytes
+        else:
+            checked = self._checked
+            for r in rows:
+                self._set_checked(r, id(self._rows[r]) not in checked)
+        self._all_changed()
+
+    def _all_changed(self):
+        self.dataChanged.emit(self.index(0, 0), self.index(len(self._rows) - 1, 0),
+                              [Qt.CheckStateRole])
+
+    def selected(self):
+        checked = self._checked
+        return [c for c in self._rows if id(c) in checked]
+    def candidate(self, row: int) -> Candidate: return self._rows[row]
+
+
+class CandidateFilter(QSortFilterProxyModel):
+    """Text filter over label / severity / reason / path.  Sorting goes to
+    the source model, which sorts cached keys in one pass instead of the
+    proxy's per-pair `data()` comparisons."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._needle = ""
+
+    def set_text(self, text: str):
+        self._needle = text.strip().lower()
+        self.invalidateFilter()
+
+    def active(self) -> bool:
+        return bool(self._needle)
+
+    def filterAcceptsRow(self, row, parent):
+        return not self._needle or self._needle in self.sourceModel().haystack(row)
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.sourceModel().sort(column, order)
+
+
+# ── Breakdown pane -----------------------------------------------------------
+class BreakdownView(QTreeWidget):
+    """Sub-folders of one candidate, biggest first; levels load on expand."""
+    NODE = Qt.UserRole
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setHeaderLabels(["Folder", "Size", "Files"])
+        self.setColumnWidth(0, 320)
+        self.itemExpanded.connect(self._expand)
+        self._tree: SizeTree | None = None
+
+    def show_tree(self, tree: SizeTree | None):
+        self.clear()
+        self._tree = tree
+        if tree is None:
+            return
+        self._fill(self.invisibleRootItem(), 0)
+
+    def _fill(self, parent: QTreeWidgetItem, node: int):
+        t = self._tree
+        for kid in t.children(node, limit=200):
+            item = QTreeWidgetItem([t.name(kid), fmt_sz(t.size[kid]), f"{t.files[kid]:,}"])
+            item.setData(0, self.NODE, kid)
+            item.setTextAlignment(1, Qt.AlignRight | Qt.AlignVCenter)
+            item.setTextAlignment(2, Qt.AlignRight | Qt.AlignVCenter)
+            if t.nkids[kid]:
+                item.setChildIndicatorPolicy(QTreeWidgetItem.ShowIndicator)
+            parent.addChild(item)
+
+    @Slot(QTreeWidgetItem)
+    def _expand(self, item: QTreeWidgetItem):
+        if self._tree is not None and not item.childCount():
+            self._fill(item, item.data(0, self.NODE))
 
 
 # ── Main window -------------------------------------------------------------
 class MainWindow(QMainWindow):
     VERSION = "0.4.3"
+    TREE_NODES = 200_000  # folders kept per candidate for the breakdown (≈10 MB)
+    TOP_N = 10            # largest files / sub-folders listed in the export (on request)
 
     def __init__(self):
         super().__init__()
@@ -98,11 +382,31 @@ class MainWindow(QMainWindow):
         self.setWindowIcon(QIcon(":/icons/logo"))
         QApplication.setStyle("Fusion")
 
-        # model & table
-        self._rebuild_model()
+        # model & table (filled by the background scan)
+        self.index = open_index()  # reused by every (re)scan
+        self.model = CandidateModel([])
+        self.proxy = CandidateFilter(self)
+        self.proxy.setSourceModel(self.model)
+        self._found: list[Candidate] = []  # scan results not yet in the model
+        self._found_timer = QTimer(self)
+        self._found_timer.setSingleShot(True)
+        self._found_timer.setInterval(100)
+        self._found_timer.timeout.connect(self._flush_found)
+        self._age_timer = QTimer(self)  # re-size once a slider drag settles
+        self._age_timer.setSingleShot(True)
+        self._age_timer.setInterval(150)
+        self._age_timer.timeout.connect(self._apply_age)
+        self._scan_worker: ScanWorker | None = None
+        self._scan_thread = None
+        self._clean_worker: CleanWorker | None = None
+        self._clean_thread = None
+        self._refine_worker: RefineWorker | None = None
+        self._refine_thread = None
+        self._after_refine = None  # run once a refine finishes uncancelled
 
         self.table = QTableView()
-        self.table.setModel(self.model)
+        self.table.setModel(self.proxy)
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)  # no per-row sizing
         self.table.setAlternatingRowColors(True)
         self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
@@ -112,28 +416,60 @@ class MainWindow(QMainWindow):
         self.table.setItemDelegateForColumn(2, SizeAlignDelegate(self.table))
         self.table.setItemDelegateForColumn(3, SeverityBadge(self.table))
         self.table.clicked.connect(self._row_toggle)
+        self.table.selectionModel().currentRowChanged.connect(self._show_breakdown)
+        self.breakdown = BreakdownView()
 
         # bottom bar
         self.lbl = QLabel(self._space())
         btn_sel = QPushButton("Select All")
-        btn_sel.clicked.connect(lambda: (self.model.toggle_all(True), self._update()))
+        btn_sel.clicked.connect(
+            lambda: (self.model.toggle_all(True, self._shown_rows()), self._update()))
         btn_inv = QPushButton("Invert")
-        btn_inv.clicked.connect(lambda: (self.model.invert(), self._update()))
-        btn_clean = QPushButton("  CLEAN")
+        btn_inv.clicked.connect(
+            lambda: (self.model.invert(self._shown_rows()), self._update()))
+        self.filter_box = QLineEdit()
+        self.filter_box.setPlaceholderText("Filter…")
+        self.filter_box.setClearButtonEnabled(True)
+        self.filter_box.setMaximumWidth(220)
+        self.filter_box.textChanged.connect(self.proxy.set_text)
+        self.btn_refine = QPushButton("Refine")
+        self.btn_refine.setToolTip("Walk the selected estimated rows exactly")
+        self.btn_refine.clicked.connect(self._refine)
+        self.btn_clean = btn_clean = QPushButton("  CLEAN")
         btn_clean.setIcon(QIcon(":/icons/broom"))
         btn_clean.clicked.connect(self._clean)
 
+        self.age_chk = QCheckBox("Older than")
+        self.age_chk.setToolTip("Override every rule's min_age – no rescan needed")
+        self.age_slider = QSlider(Qt.Horizontal)
+        self.age_slider.setRange(0, 365)
+        self.age_slider.setMaximumWidth(180)
+        self.age_slider.setEnabled(False)
+        self.age_lbl = QLabel("0 days")
+        self.age_chk.toggled.connect(self._age_changed)
+        self.age_slider.valueChanged.connect(self._age_changed)
+
         bar = QHBoxLayout()
         bar.addWidget(self.lbl)
         bar.addStretch(1)
+        bar.addWidget(self.filter_box)
+        bar.addWidget(self.age_chk)
+        bar.addWidget(self.age_slider)
+        bar.addWidget(self.age_lbl)
         bar.addWidget(btn_sel)
         bar.addWidget(btn_inv)
+        bar.addWidget(self.btn_refine)
         bar.addWidget(btn_clean)
 
         # central widget
         central = QWidget(self)
         lay = QVBoxLayout(central)
-        lay.addWidget(self.table)
+        split = QSplitter(Qt.Vertical)
+        split.addWidget(self.table)
+        split.addWidget(self.breakdown)
+        split.setStretchFactor(0, 3)
+        split.setStretchFactor(1, 1)
+        lay.addWidget(split)
         lay.addLayout(bar)
         self.setCentralWidget(central)
 
@@ -144,8 +480,21 @@ class MainWindow(QMainWindow):
         except ImportError:
             self.dark = False
 
+        # status bar – scan progress + cancel
+        self.scan_lbl = QLabel()
+        self.scan_bar = QProgressBar()
+        self.scan_bar.setRange(0, 0)  # busy indicator
+        self.scan_bar.setMaximumWidth(160)
+        self.btn_stop = QPushButton("Cancel")
+        self.btn_stop.clicked.connect(self._cancel_scan)
+        sb = self.statusBar()
+        sb.addWidget(self.scan_lbl, 1)
+        sb.addPermanentWidget(self.scan_bar)
+        sb.addPermanentWidget(self.btn_stop)
+
         # menus
         self._build_menus()
+        self._start_scan()
 
     # ----- menu bar --------------------------------------------------------
     def _build_menus(self):
@@ -170,6 +519,17 @@ class MainWindow(QMainWindow):
         tools = mbar.addMenu("&Tools")
         act_logs = tools.addAction("Open &Log Folder")
         act_logs.triggered.connect(self._open_logs)
+        self.act_estimate = tools.addAction("Quick &Estimate Scan")
+        self.act_estimate.setCheckable(True)
+        self.act_estimate.setToolTip("Sample big trees instead of walking them")
+        self.act_estimate.toggled.connect(self._start_scan)
+        self.act_links = tools.addAction("Count Hard &Links Once")
+        self.act_links.setCheckable(True)
+        self.act_links.setToolTip("Dedupe hard-linked files and show allocated size")
+        self.act_links.toggled.connect(self._start_scan)
+        self.act_one_fs = tools.addAction("Stay on One &Filesystem")
+        self.act_one_fs.setCheckable(True)
+        self.act_one_fs.toggled.connect(self._start_scan)
         act_csv = tools.addAction("&Export Report…")
         act_csv.triggered.connect(self._export_csv)
 
@@ -181,18 +541,125 @@ class MainWindow(QMainWindow):
         helpm.addAction("&About…", self._about)
 
     # ----- slots / helpers -------------------------------------------------
-    def _rebuild_model(self):
-        rows = collect(rules_mod.RULES, include=set(rules_mod.SEVERITY_ORDER))
-        rows.sort(key=lambda c: (rules_mod.SEVERITY_ORDER[c.rule.severity], -c.size))
-        self.model = CandidateModel(rows)
+    def _start_scan(self):
+        self._stop_scan()
+        self._stop_refine()  # its rows are about to go, and so is its Cancel
+        self._found_timer.stop()
+        self._found = []
+        self.model = CandidateModel([])
+        self.proxy.setSourceModel(self.model)
+        self.breakdown.show_tree(None)
+        self._update()
+        self.model.set_min_age(self._min_age())
+        worker = ScanWorker(load_rules(), set(SEVERITY_ORDER), self.index,
+                            tree_nodes=self.TREE_NODES,
+                            estimate=self._option("act_estimate"),
+                            links=self._option("act_links"),
+                            one_fs=self._option("act_one_fs"),
+                            throttle=self._throttle())
+        worker.found.connect(self._on_found)
+        worker.progress.connect(self._on_progress)
+        worker.finished.connect(self._on_scan_done)
+        self._scan_worker = worker
+        self._scan_thread = start_worker(worker, self)
+        self.scan_lbl.setText("Scanning…")
+        self._set_scanning(True)
+
+    def _option(self, name: str) -> bool:
+        """State of a checkable Tools action (False before the menu exists)."""
+        act = getattr(self, name, None)
+        return act is not None and act.isChecked()
+
+    def _throttle(self):
+        """The YAML's I/O limits; bad settings are reported and ignored."""
+        try:
+            return Limits.from_settings(load_settings()).throttle()
+        except ValueError as err:
+            QMessageBox.warning(self, "Disk Sweeper", f"I/O limits ignored – {err}")
+            return None
+
+    def _stop_scan(self):
+        """Cancel a running scan and wait for its thread to exit."""
+        if self._scan_worker is None:
+            return
+        self._scan_worker.cancel.cancel()
+        self._scan_thread.wait()
+        self._scan_worker = self._scan_thread = None
+        self._set_scanning(False)
+
+    def _stop_refine(self):
+        """Cancel a running refine, wait for it and hand Cancel back to scans;
+        its late signals are dropped as no longer from `_refine_worker`."""
+        if self._refine_worker is None:
+            return
+        self._refine_worker.cancel.cancel()
+        self._refine_thread.wait()
+        self._refine_worker = self._refine_thread = None
+        self._after_refine = None
+        self.btn_stop.clicked.disconnect()
+        self.btn_stop.clicked.connect(self._cancel_scan)
+        self._set_scanning(False)
+
+    def _set_scanning(self, on: bool):
+        self.scan_bar.setVisible(on)
+        self.btn_stop.setVisible(on)
+        self.btn_clean.setEnabled(not on)
+        self.btn_refine.setEnabled(not on)
+
+    @Slot(object)
+    def _on_found(self, cand: Candidate):
+        if self.sender() is self._scan_worker:  # drop rows of a stopped scan
+            self._found.append(cand)
+            if not self._found_timer.isActive():
+                self._found_timer.start()
+
+    @Slot()
+    def _flush_found(self):
+        """Insert the results of the last ~100 ms in one batch."""
+        if self._found:
+            self.model.extend(self._found)
+            self._found = []
+
+    @Slot(object)
+    def _on_progress(self, p):
+        if self.sender() is self._scan_worker:
+            self.scan_lbl.setText(
+                f"Scanning {p.rule.label}: {p.files:,} files, {fmt_sz(p.bytes)}")
+
+    @Slot(bool)
+    def _on_scan_done(self, cancelled: bool):
+        if self.sender() is not self._scan_worker:
+            return
+        self._scan_worker = self._scan_thread = None
+        self._found_timer.stop()
+        self._flush_found()
+        self._set_scanning(False)
+        self.model.sort_default()
+        n = self.model.rowCount()
+        self.scan_lbl.setText(f"Scan cancelled – {n} candidate(s) so far" if cancelled
+                              else f"Scan complete – {n} candidate(s)")
+
+    @Slot()
+    def _cancel_scan(self):
+        if self._scan_worker is not None:
+            self._scan_worker.cancel.cancel()
+            self.scan_lbl.setText("Cancelling…")
+
+    def closeEvent(self, ev):
+        self._stop_scan()
+        self._stop_refine()
+        if self._clean_worker is not None:  # finish the current batch, then stop
+            self._clean_worker.cancel.cancel()
+            self._clean_thread.wait()
+        if self.index is not None:
+            self.index.close()
+            self.index = None
+        super().closeEvent(ev)
 
     @Slot()
     def _reload_rules(self):
         try:
-            reload(rules_mod)
-            self._rebuild_model()
-            self.table.setModel(self.model)
-            self._update()
+            self._start_scan()  # load_rules() picks up YAML edits by mtime
             QMessageBox.information(self, "Rules reloaded", "Rule list reloaded from YAML / source.")
         except Exception as exc:
             QMessageBox.critical(self, "Error reloading rules", str(exc))
@@ -221,27 +688,123 @@ class MainWindow(QMainWindow):
             self, "Export report", "sweep_report.csv", "CSV files (*.csv)")
         if not path:
             return
+        bare = [c for c in self.model._rows if c.top is None]
+        busy = self._scan_worker is not None or self._refine_worker is not None
+        if bare and not busy and QMessageBox.question(
+                self, "Export report",
+                f"Also list the {self.TOP_N} largest files and folders of each row?\n"
+                f"{len(bare):,} row(s) will be walked again.",
+                QMessageBox.Yes | QMessageBox.No) == QMessageBox.Yes:
+            self._start_refine(bare, then=lambda: self._write_csv(path), top_n=self.TOP_N)
+            return
+        self._write_csv(path)
+
+    def _write_csv(self, path: str):
         try:
-            with open(path, "w", encoding="utf-8") as fh:
-                fh.write("Label,Size,Severity,Path\n")
+            with open(path, "w", encoding="utf-8", newline="") as fh:
+                out = csv.writer(fh)  # quotes commas / quotes in labels and paths
+                out.writerow(["Label", "Size", "Severity", "Path", "Kind"])
                 for c in self.model._rows:
-                    fh.write(f"{c.rule.label},{c.size},{c.rule.severity},\"{c.path}\"\n")
+                    out.writerow([c.rule.label, self.model.size_of(c), c.rule.severity,
+                                  str(c.path), "candidate"])
+                    if c.top is None:
+                        continue
+                    for kind, items in (("folder", c.top.dirs), ("file", c.top.files)):
+                        for size, p in items:
+                            out.writerow([c.rule.label, size, c.rule.severity, str(p), kind])
             QMessageBox.information(self, "Export complete", "CSV saved.")
         except Exception as exc:
             QMessageBox.critical(self, "Error", str(exc))
 
-    def _space(self): return f"Potential space: {fmt_sz(sum(c.size for c in self.model.selected()))}"
+    def _space(self): return f"Potential space: {fmt_sz(self.model.selected_bytes)}"
     def _update(self): self.lbl.setText(self._space())
 
+    def _min_age(self) -> int | None:
+        return self.age_slider.value() if self.age_chk.isChecked() else None
+
+    def _age_changed(self, *_):  # toggled(bool) / valueChanged(int)
+        self.age_slider.setEnabled(self.age_chk.isChecked())
+        self.age_lbl.setText(f"{self.age_slider.value()} days")
+        self._age_timer.start()
+
+    def _apply_age(self):
+        self._age_timer.stop()
+        self.model.set_min_age(self._min_age())  # keeps the user's sort
+        self._update()
+
+    def _shown_rows(self) -> list[int] | None:
+        """Model rows that pass the filter box; None when it is empty."""
+        if not self.proxy.active():
+            return None
+        px = self.proxy
+        return [px.mapToSource(px.index(r, 0)).row() for r in range(px.rowCount())]
+
+    @Slot(QModelIndex, QModelIndex)
+    def _show_breakdown(self, cur: QModelIndex, _prev: QModelIndex):
+        src = self.proxy.mapToSource(cur)
+        self.breakdown.show_tree(self.model.candidate(src.row()).tree if src.isValid() else None)
+
     @Slot(QModelIndex)
     def _row_toggle(self, idx: QModelIndex):
-        chk = self.model.index(idx.row(), 0)
-        cur = self.model.data(chk, Qt.CheckStateRole)
-        self.model.setData(chk, Qt.Unchecked if cur == Qt.Checked else Qt.Checked, Qt.CheckStateRole)
+        self.model.toggle(self.proxy.mapToSource(idx).row())
         self._update()
 
+    def _rough(self) -> list[Candidate]:
+        return [c for c in self.model.selected()
+                if c.estimate is not None and not c.estimate.exact]
+
+    @Slot()
+    def _refine(self):
+        rough = self._rough()
+        if not rough:
+            QMessageBox.information(self, "Disk Sweeper", "No estimated rows selected.")
+            return
+        self._start_refine(rough)
+
+    def _start_refine(self, rough: list[Candidate], then=None, top_n: int = 0):
+        """Walk *rough* exactly; with *top_n* only their largest items are
+        kept (sizes stay as shown).  *then* runs if nothing was cancelled."""
+        self._after_refine = then
+        worker = RefineWorker(rough, self.index, one_fs=self._option("act_one_fs"),
+                              top_n=top_n)
+        worker.refined.connect(self._on_detailed if top_n else self._on_refined)
+        worker.finished.connect(self._on_refine_done)
+        self._refine_worker = worker
+        self._refine_thread = start_worker(worker, self)
+        self.scan_lbl.setText(f"{'Walking' if top_n else 'Refining'} {len(rough)} row(s)…")
+        self._set_scanning(True)
+        self.btn_stop.clicked.disconnect()
+        self.btn_stop.clicked.connect(worker.cancel.cancel)
+
+    @Slot(object, object)
+    def _on_refined(self, old: Candidate, new: Candidate):
+        if self.sender() is self._refine_worker:
+            self.model.replace(old, new)
+            self._update()
+
+    @Slot(object, object)
+    def _on_detailed(self, old: Candidate, new: Candidate):
+        if self.sender() is self._refine_worker:
+            old.top = new.top
+
+    @Slot(bool)
+    def _on_refine_done(self, cancelled: bool):
+        if self.sender() is not self._refine_worker:
+            return
+        self._refine_worker = self._refine_thread = None
+        self.btn_stop.clicked.disconnect()
+        self.btn_stop.clicked.connect(self._cancel_scan)
+        self._set_scanning(False)
+        self.model.resort()
+        self.scan_lbl.setText("Refine cancelled" if cancelled else "Refine complete")
+        then, self._after_refine = self._after_refine, None
+        if then is not None and not cancelled:
+            then()
+
     @Slot()
     def _clean(self):
+        if self._age_timer.isActive():  # rows must match the slider
+            self._apply_age()
         sel = self.model.selected()
         if not sel:
             QMessageBox.information(self, "Disk Sweeper", "Nothing selected.")
@@ -253,18 +816,55 @@ class MainWindow(QMainWindow):
             self, "Confirm delete", f"Delete {len(sel)} item(s)?",
             QMessageBox.Yes | QMessageBox.No) != QMessageBox.Yes:
             return
+        if self._rough():  # delete by exact sizes, as the CLI does
+            self._start_refine(self._rough(),
+                               then=lambda: self._start_clean(self.model.selected()))
+            return
+        self._start_clean(sel)
 
-        dlg = QProgressDialog("Cleaning…", "Abort", 0, len(sel), self)
+    def _start_clean(self, sel: list[Candidate]):
+        if not sel:  # every refined row fell below its min_size
+            return
+        age = self._min_age()
+        if age is not None:  # delete what the override counted, not the rule's min_age
+            sel = [c.at_min_age(age) if c.hist is not None else c for c in sel]
+        self._clean_total = max(1, sum(c.size for c in sel))
+        self._clean_results = []
+        dlg = self._clean_dlg = QProgressDialog("Cleaning…", "Abort", 0, 1000, self)
         dlg.setWindowModality(Qt.ApplicationModal)
+        dlg.setAutoClose(False)
+        dlg.setAutoReset(False)
+        worker = CleanWorker(sel, throttle=self._throttle(),
+                             one_fs=self._option("act_one_fs"))
+        worker.progress.connect(self._on_clean_progress)
+        worker.result.connect(self._on_clean_result)
+        worker.finished.connect(self._on_clean_done)
+        dlg.canceled.connect(worker.cancel.cancel)
+        self._clean_worker = worker
+        self._clean_thread = start_worker(worker, self)
         dlg.show()
-        for i, cand in enumerate(sel, 1):
-            clean([cand], echo=True)
-            dlg.setValue(i)
-            QApplication.processEvents()
-            if dlg.wasCanceled():
-                break
-        dlg.close()
-        QMessageBox.information(self, "Disk Sweeper", "Cleanup done.")
+
+    @Slot(int, object)
+    def _on_clean_progress(self, files: int, freed: int):
+        self._clean_dlg.setLabelText(f"Cleaning… {files:,} files, {fmt_sz(freed)} freed")
+        self._clean_dlg.setValue(min(999, freed * 1000 // self._clean_total))
+
+    @Slot(object)
+    def _on_clean_result(self, res):
+        self._clean_results.append(res)
+
+    @Slot(bool)
+    def _on_clean_done(self, aborted: bool):
+        self._clean_worker = self._clean_thread = None
+        self._clean_dlg.close()
+        freed = sum(r.freed for r in self._clean_results)
+        files = sum(r.files for r in self._clean_results)
+        failed = sum(len(r.failed) for r in self._clean_results)
+        msg = (f"Cleanup {'aborted' if aborted else 'done'}.\n"
+               f"Freed {fmt_sz(freed)} ({files:,} files).")
+        if failed:
+            msg += f"\n{failed:,} item(s) could not be removed."
+        QMessageBox.information(self, "Disk Sweeper", msg)
         self.close()
 
     def _about(self):
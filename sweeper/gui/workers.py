@@ -0,0 +1,135 @@
+"""
+Background workers for the GUI – everything that touches the disk runs
+here so the event loop never blocks.  Results come back through queued
+signals; `CancelToken`s stop the underlying walks cooperatively.
+"""
+
+from __future__ import annotations
+from typing import Iterable
+
+from PySide6.QtCore import QObject, QThread, Qt, Signal, Slot
+
+from ..core.cleaner import iter_clean, log_sweep
+from ..core.collector import iter_collect, refine
+from ..core.index import ScanIndex
+from ..core.rules import Candidate, Rule
+from ..core.throttle import Throttle
+from ..core.walker import CancelToken
+
+
+class ScanWorker(QObject):
+    """Runs `iter_collect()` and streams candidates back to the UI thread."""
+    found = Signal(object)       # Candidate
+    progress = Signal(object)    # ScanProgress
+    finished = Signal(bool)      # True if the scan was cancelled
+
+    def __init__(self, rules: Iterable[Rule], include: set[str],
+                 index: ScanIndex | None = None, workers: int = 4, tree_nodes: int = 0,
+                 top_n: int = 0, estimate: bool = False, links: bool = False,
+                 one_fs: bool = False, throttle: Throttle | None = None):
+        super().__init__()
+        self._rules = list(rules)
+        self._include = include
+        self._index = index
+        self._workers = workers
+        self._tree_nodes = tree_nodes
+        self._top_n = top_n
+        self._estimate = estimate
+        self._links = links
+        self._one_fs = one_fs
+        self._throttle = throttle
+        self.cancel = CancelToken()
+
+    @Slot()
+    def run(self):
+        try:
+            for cand in iter_collect(
+                    self._rules, include=self._include, workers=self._workers,
+                    index=self._index, progress=self.progress.emit,
+                    cancel=self.cancel, ordered=False, tree_nodes=self._tree_nodes,
+                    top_n=self._top_n, ages=True, keep_small=True,
+                    estimate=self._estimate, links=self._links, one_fs=self._one_fs,
+                    throttle=self._throttle):
+                self.found.emit(cand)
+        finally:
+            if self._index is not None:
+                self._index.flush()
+            self.finished.emit(self.cancel.cancelled)
+
+
+class RefineWorker(QObject):
+    """Exact walks of the estimated rows the user picked (or, with *top_n*,
+    of rows whose largest items are wanted)."""
+    refined = Signal(object, object)  # estimated Candidate, exact Candidate
+    finished = Signal(bool)           # True if cancelled
+
+    def __init__(self, candidates: Iterable[Candidate], index: ScanIndex | None = None,
+                 workers: int = 4, one_fs: bool = False, top_n: int = 0):
+        super().__init__()
+        self._cands = list(candidates)
+        self._index = index
+        self._workers = workers
+        self._one_fs = one_fs
+        self._top_n = top_n
+        self.cancel = CancelToken()
+
+    @Slot()
+    def run(self):
+        try:
+            exact = refine(self._cands, workers=self._workers, index=self._index,
+                           cancel=self.cancel, one_fs=self._one_fs, top_n=self._top_n)
+            for old, new in zip(self._cands, exact):
+                self.refined.emit(old, new)
+        except RuntimeError:
+            if not self.cancel.cancelled:
+                raise
+        finally:
+            self.finished.emit(self.cancel.cancelled)
+
+
+class CleanWorker(QObject):
+    """Runs `iter_clean()`; progress is reported in files and bytes."""
+    progress = Signal(int, object)   # files removed, bytes freed (whole run)
+    result = Signal(object)          # CleanResult, once per candidate
+    finished = Signal(bool)          # True if the sweep was aborted
+
+    def __init__(self, candidates: Iterable[Candidate], workers: int = 4,
+                 throttle: Throttle | None = None, one_fs: bool = False):
+        super().__init__()
+        self._cands = list(candidates)
+        self._workers = workers
+        self._throttle = throttle
+        self._one_fs = one_fs
+        self._files = 0    # totals of the candidates already finished
+        self._bytes = 0
+        self.cancel = CancelToken()
+
+    def _on_progress(self, p):  # pool threads
+        self.progress.emit(self._files + p.files, self._bytes + p.bytes)
+
+    @Slot()
+    def run(self):
+        try:
+            for res in iter_clean(self._cands, workers=self._workers,
+                                  cancel=self.cancel, progress=self._on_progress,
+                                  throttle=self._throttle, one_fs=self._one_fs):
+                self._files += res.files
+                self._bytes += res.freed
+                self.progress.emit(self._files, self._bytes)
+                self.result.emit(res)
+        finally:
+            log_sweep(self._bytes)
+            self.finished.emit(self.cancel.cancelled)
+
+
+def start_worker(worker: QObject, parent: QObject) -> QThread:
+    """Move *worker* to a fresh QThread, wire clean-up and start it."""
+    thread = QThread(parent)
+    worker.moveToThread(thread)
+    thread.started.connect(worker.run)
+    # direct: the UI thread may be blocked in thread.wait() when this fires
+    worker.finished.connect(thread.quit, Qt.DirectConnection)
+    thread.finished.connect(worker.deleteLater)
+    thread.finished.connect(thread.deleteLater)
+    thread.start()
+    return thread
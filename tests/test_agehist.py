@@ -0,0 +1,49 @@
+import os
+import time
+from pathlib import Path
+
+from sweeper.core.agehist import DAY, AgeHistogram, load_snapshot, save_snapshot
+from sweeper.core.collector import collect
+from sweeper.core.index import ScanIndex
+from sweeper.core.rules import Rule
+from sweeper.core.walker import walk_tree
+
+
+def _aged_tree(root: Path, now: float) -> None:
+    (root / "sub").mkdir()
+    for i, days in enumerate([0.5, 3, 3.2, 10, 45, 400, 5000]):
+        p = root / ("sub" if i % 2 else "") / f"f{i}"
+        p.write_bytes(b"x" * (100 * (i + 1)))
+        os.utime(p, (now - days * DAY, now - days * DAY))
+
+
+def test_histogram_matches_cutoff_walks(tmp_path: Path):
+    now = time.time()
+    _aged_tree(tmp_path, now)
+    with ScanIndex(":memory:") as index:
+        for idx in (None, index, index):  # plain, cold index, cached rows
+            hist = AgeHistogram(now)
+            walk_tree(tmp_path, index=idx, hist=hist)
+            for days in (0, 1, 3, 4, 30, 365, 4000):
+                cutoff = now - days * DAY if days else None
+                assert hist.older_than(days) == walk_tree(tmp_path, cutoff=cutoff).size, days
+
+
+def test_candidate_what_if_and_snapshot(tmp_path: Path):
+    root = tmp_path / "tree"
+    root.mkdir()
+    now = time.time()
+    _aged_tree(root, now)
+    rule = Rule("aged", root, min_size=1, min_age=30, exclude=["*.tmp"], prune=["cache"])
+    cand, = collect([rule], include={"safe"}, ages=True)
+    assert cand.size == cand.bytes_older_than(30)
+    assert len(cand.hist.buckets) <= 8  # sparse: one per distinct day (+ folders)
+    assert cand.bytes_older_than(0) > cand.bytes_older_than(3) > cand.size
+
+    snap = tmp_path / "last.json"
+    save_snapshot([cand], snap)
+    when, (again,) = load_snapshot(snap)
+    assert abs(when - now) < 60 and again.rule == rule
+    assert again.size == cand.size and again.bytes_older_than(3) == cand.bytes_older_than(3)
+    later = again.hist.shifted(again.hist.now + 7 * DAY)  # a week on, 3.2-day file is 10 days old
+    assert later.older_than(10) == cand.bytes_older_than(3)
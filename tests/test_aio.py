@@ -0,0 +1,60 @@
+import asyncio
+import threading
+from pathlib import Path
+
+from sweeper.core.aio import aclean, acollect, aiter_collect
+from sweeper.core.collector import ScanProgress, collect
+from sweeper.core.rules import Candidate, Rule
+from sweeper.core.walker import CancelToken
+
+
+def _rules(tmp_path: Path, n: int = 4) -> list[Rule]:
+    rules = []
+    for i in range(n):
+        root = tmp_path / f"r{i}"
+        for j in range(20):
+            d = root / f"d{j}"
+            d.mkdir(parents=True)
+            (d / "f.bin").write_bytes(b"x" * (100 * (i + 1)))
+        rules.append(Rule(f"r{i}", root, min_size=1))
+    return rules
+
+
+def test_acollect_matches_collect_and_streams_progress(tmp_path: Path):
+    rules = _rules(tmp_path)
+    sync = collect(rules, include={"safe"})
+
+    async def main():
+        found = await acollect(rules, include={"safe"}, workers=2)
+        events = [e async for e in aiter_collect(rules, include={"safe"}, progress=True,
+                                                 limiter=asyncio.Semaphore(1))]
+        return found, events
+
+    found, events = asyncio.run(main())
+    assert [(c.path, c.size) for c in found] == [(c.path, c.size) for c in sync]
+    cands = [e for e in events if isinstance(e, Candidate)]
+    assert [c.size for c in cands] == [c.size for c in sync]
+    assert any(isinstance(e, ScanProgress) for e in events)
+
+
+def test_leaving_early_cancels_the_scan(tmp_path: Path):
+    rules = _rules(tmp_path, n=6)
+    cancel = CancelToken()
+
+    async def main():
+        gen = aiter_collect(rules, include={"safe"}, cancel=cancel)
+        async for _ in gen:
+            break
+        await gen.aclose()
+        return [t for t in threading.enumerate() if t.name == "sweeper-aio"]
+
+    assert asyncio.run(main()) == []  # engine thread joined on close
+    assert not cancel.cancelled  # the caller's own token is left alone
+
+
+def test_aclean_frees(tmp_path: Path):
+    rules = _rules(tmp_path, n=2)
+    cands = collect(rules, include={"safe"})
+    freed = asyncio.run(aclean(cands, workers=2))
+    assert freed >= 20 * 100 + 20 * 200  # the files, plus folder entries
+    assert not any(r.path.exists() for r in rules)
@@ -0,0 +1,20 @@
+from pathlib import Path
+
+from benchmarks.bench import compare
+from benchmarks.synth import build
+from sweeper.core.walker import walk_tree
+
+
+def test_synth_tree_is_deterministic(tmp_path: Path):
+    a = build(tmp_path / "a", 400, seed=7)
+    b = build(tmp_path / "b", 400, seed=7)
+    assert a.files == b.files == 400 and a.bytes == b.bytes
+    assert sum(a.areas.values()) == 400
+    assert walk_tree(a.root).files == 400
+    assert any(p.name == "Cache_Data" for p in a.edge_base.rglob("*"))
+
+
+def test_compare_flags_regressions(capsys):
+    base = {"results": {"walk": {"best": 1.0}, "clean": {"best": 1.0}}}
+    now = {"results": {"walk": {"best": 1.5}, "clean": {"best": 1.05}}}
+    assert compare(now, base, 0.15) == ["walk"]
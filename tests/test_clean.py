@@ -1,5 +1,9 @@
+import os
 from pathlib import Path
-from sweeper.core.cleaner import clean
+
+import pytest
+from sweeper.core import cleaner
+from sweeper.core.cleaner import clean, iter_clean
 from sweeper.core.rules import Candidate, Rule
 
 def test_clean(tmp_path: Path):
@@ -9,3 +13,152 @@ def test_clean(tmp_path: Path):
     cand = Candidate(Rule("tmp", p), p, size)
     freed = clean([cand], echo=False)
     assert freed == size and not p.exists()
+
+
+def test_clean_tree_reports_actual_bytes(tmp_path: Path, monkeypatch):
+    root = tmp_path / "cache"
+    for i in range(3):
+        d = root / f"d{i}" / "deep"
+        d.mkdir(parents=True)
+        for j in range(300):
+            (d / f"f{j}").write_bytes(b"x" * 10)
+    (root / "d1" / "deep" / "locked").write_bytes(b"l" * 99)
+
+    real = cleaner._unlink
+    def flaky(path):
+        if path.endswith("locked"):
+            raise PermissionError(13, "Access is denied")
+        real(path)
+    monkeypatch.setattr(cleaner, "_unlink", flaky)
+
+    cand = Candidate(Rule("cache", root), root, 0)
+    (res,) = iter_clean([cand], workers=3)
+    assert res.files == 900
+    assert res.freed >= 9000
+    reasons = dict(res.failed)
+    assert reasons[str(root / "d1" / "deep" / "locked")] == "Access is denied"
+    assert (root / "d1" / "deep" / "locked").exists()
+    assert not (root / "d0").exists()
+
+
+def test_clean_counts_hard_links_when_last_goes(tmp_path: Path):
+    root = tmp_path / "cache"
+    root.mkdir()
+    blob = root / "blob.bin"
+    blob.write_bytes(b"x" * 4000)
+    outside = tmp_path / "kept.bin"
+    try:
+        os.link(blob, root / "twin.bin")
+        os.link(blob, outside)
+    except OSError:
+        pytest.skip("hard links not supported")
+    (res,) = iter_clean([Candidate(Rule("cache", root), root, 0)])
+    assert res.files == 2 and res.freed < 4000  # a third link keeps the data
+    outside.unlink()
+
+    root.mkdir()
+    blob.write_bytes(b"x" * 4000)
+    os.link(blob, root / "twin.bin")
+    (res,) = iter_clean([Candidate(Rule("cache", root), root, 0)])
+    assert res.files == 2 and 4000 <= res.freed < 8000
+
+
+def _aged_tree(root: Path) -> None:
+    old = 1_000_000_000.0  # 2001
+    for name in ("a", "b/c", "keep/x", "fresh"):
+        (root / name).mkdir(parents=True, exist_ok=True)
+    for rel in ("a/1.log", "b/c/2.log", "keep/x/3.log", "a/4.bin"):
+        (root / rel).write_bytes(b"o" * 500)
+        os.utime(root / rel, (old, old))
+    (root / "fresh" / "new.log").write_bytes(b"n" * 700)
+    (root / "a" / "new.log").write_bytes(b"n" * 700)
+    for d in ("a", "b/c", "b", "keep/x", "keep"):
+        os.utime(root / d, (old, old))
+
+
+@pytest.mark.parametrize("tree_nodes", [0, 1000])
+def test_clean_removes_only_what_was_counted(tmp_path: Path, tree_nodes):
+    from sweeper.core.collector import collect
+
+    root = tmp_path / "logs"
+    _aged_tree(root)
+    rule = Rule("logs", root, min_age=30, exclude=["*.bin"], prune=["keep"])
+    (cand,) = collect([rule], include={"safe"}, tree_nodes=tree_nodes)
+    (res,) = iter_clean([cand])
+    assert not res.failed
+    assert res.freed == cand.size - (root / "a").stat().st_size  # "a" keeps new.log
+    assert not (root / "a" / "1.log").exists() and not (root / "b").exists()
+    assert (root / "a" / "4.bin").exists() and (root / "a" / "new.log").exists()
+    assert (root / "keep" / "x" / "3.log").exists()
+    assert (root / "fresh" / "new.log").exists()
+
+
+def test_clean_skips_folders_the_scan_found_empty(tmp_path: Path, monkeypatch):
+    from sweeper.core.collector import collect
+
+    root = tmp_path / "logs"
+    _aged_tree(root)
+    rule = Rule("logs", root, min_age=30)
+    (cand,) = collect([rule], include={"safe"}, tree_nodes=1000)
+    (root / "later").mkdir()  # not there at scan time
+    (root / "later" / "old.log").write_bytes(b"o" * 10)
+    os.utime(root / "later" / "old.log", (1e9, 1e9))
+    listed = []
+    real = os.scandir
+    monkeypatch.setattr(cleaner.os, "scandir", lambda d: listed.append(d) or real(d))
+    (res,) = iter_clean([cand])
+    assert res.freed == cand.size - (root / "a").stat().st_size
+    assert str(root / "fresh") not in listed
+    assert (root / "later" / "old.log").exists()
+
+
+def test_partial_clean_credits_links_not_targets(tmp_path: Path):
+    root = tmp_path / "logs"
+    root.mkdir()
+    target = tmp_path / "big.bin"
+    target.write_bytes(b"b" * 100_000)
+    os.utime(target, (1e9, 1e9))
+    try:
+        (root / "link.bin").symlink_to(target)
+    except OSError:
+        pytest.skip("symlinks not supported")
+    cand = Candidate(Rule("logs", root, min_age=30), root, 100_000, cutoff=2e9)
+    (res,) = iter_clean([cand])
+    assert res.files == 1 and res.freed < 100_000
+    assert target.exists() and not (root / "link.bin").exists()
+
+
+@pytest.mark.parametrize("min_age", [0, 30])
+def test_one_fs_clean_leaves_mounts(tmp_path: Path, monkeypatch, min_age):
+    from sweeper.core import walker
+    from sweeper.core.collector import collect
+
+    root = tmp_path / "cache"
+    (root / "mnt").mkdir(parents=True)
+    (root / "junk.bin").write_bytes(b"j" * 10)
+    (root / "mnt" / "precious").write_bytes(b"p" * 1000)
+    for p in (root / "junk.bin", root / "mnt" / "precious"):
+        os.utime(p, (1e9, 1e9))
+    mount = (root / "mnt").stat().st_ino  # pretend mnt is another filesystem
+    foreign = lambda st, dev: st.st_ino == mount
+    monkeypatch.setattr(walker, "_foreign", foreign)
+    monkeypatch.setattr(cleaner, "_foreign", foreign)
+    (cand,) = collect([Rule("cache", root, min_age=min_age)], include={"safe"}, one_fs=True)
+    (res,) = iter_clean([cand], one_fs=True)
+    assert not res.failed and res.files == 1
+    assert res.freed <= cand.size
+    assert (root / "mnt" / "precious").exists() and not (root / "junk.bin").exists()
+
+
+def test_partial_clean_does_not_enter_junctions(tmp_path: Path, monkeypatch):
+    root = tmp_path / "logs"
+    (root / "jct").mkdir(parents=True)
+    outside = root / "jct" / "elsewhere.log"  # stands for the junction's target
+    outside.write_bytes(b"o" * 100)
+    os.utime(outside, (1e9, 1e9))
+    junction = (root / "jct").stat().st_ino
+    real = cleaner._is_link
+    monkeypatch.setattr(cleaner, "_is_link", lambda st: st.st_ino == junction or real(st))
+    cand = Candidate(Rule("logs", root, min_age=30), root, 100, cutoff=2e9)
+    (res,) = iter_clean([cand])
+    assert outside.exists() and res.files == 0 and res.freed == 0
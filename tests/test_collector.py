@@ -0,0 +1,76 @@
+from pathlib import Path
+
+from sweeper.core.collector import collect, iter_collect
+from sweeper.core.rules import Rule
+from sweeper.core.stats import SweepStats
+from sweeper.core.walker import CancelToken
+
+
+def _tree(base: Path, name: str, size: int) -> Path:
+    d = base / name
+    d.mkdir()
+    (d / "blob.bin").write_bytes(b"x" * size)
+    return d
+
+
+def test_collect_workers_keep_serial_order(tmp_path: Path):
+    dirs = [_tree(tmp_path, f"d{i}", 100 * (i + 1)) for i in range(6)]
+    rules = [Rule(f"r{i}", d) for i, d in enumerate(dirs)]
+    rules.append(Rule("missing", tmp_path / "nope"))
+    serial = collect(rules, include={"safe"})
+    pooled = collect(rules, include={"safe"}, workers=4)
+    assert [(c.rule.label, c.size) for c in pooled] == \
+           [(c.rule.label, c.size) for c in serial]
+    assert [c.size for c in serial[:6]] == [100 * (i + 1) for i in range(6)]
+
+
+def test_collect_isolates_failing_paths(tmp_path: Path):
+    good = _tree(tmp_path, "good", 10)
+
+    def broken():
+        raise OSError("provider failed")
+
+    rules = [Rule("broken", broken), Rule("good", good)]
+    found = collect(rules, include={"safe"}, workers=2)
+    assert [c.rule.label for c in found] == ["good"]
+
+
+def test_iter_collect_streams_progress_and_cancels(tmp_path: Path):
+    rules = [Rule(f"r{i}", _tree(tmp_path, f"d{i}", 10)) for i in range(3)]
+    seen = []
+    gen = iter_collect(rules, include={"safe"}, progress=seen.append)
+    first = next(gen)
+    assert first.rule.label == "r0" and seen[-1].bytes == 10
+    gen.close()
+
+    token = CancelToken()
+    found = []
+    for cand in iter_collect(rules, include={"safe"}, cancel=token, workers=2):
+        found.append(cand)
+        token.cancel()
+    assert len(found) == 1
+
+
+def test_collect_fills_stats(tmp_path: Path):
+    d = _tree(tmp_path, "d", 100)
+    stats = SweepStats()
+    collect([Rule("r", d), Rule("r", tmp_path / "nope")], include={"safe"}, stats=stats)
+    rs = stats.rules["r"]
+    assert (rs.paths, rs.files, rs.matched, rs.candidates) == (2, 1, 100, 2)
+    assert rs.stat_calls == 3 and stats.scan_wall > 0
+    assert "r" in stats.format_table()
+
+
+def test_collect_expands_wildcard_roots(tmp_path: Path):
+    for name in ("PyCharm2023.1", "PyCharm2024.2", "IntelliJ"):
+        _tree(tmp_path, name, 10)
+    found = collect([Rule("PyCharm", tmp_path / "PyCharm*")], include={"safe"})
+    assert [c.path.name for c in found] == ["PyCharm2023.1", "PyCharm2024.2"]
+
+
+def test_clean_nodes_only_tree_partial_rules(tmp_path: Path):
+    rules = [Rule("plain", _tree(tmp_path, "a", 10)),
+             Rule("aged", _tree(tmp_path, "b", 10), min_age=3),
+             Rule("filtered", _tree(tmp_path, "c", 10), exclude=["*.log"])]
+    cands = collect(rules, include={"safe"}, clean_nodes=100)
+    assert [c.tree is not None for c in cands] == [False, True, True]
@@ -0,0 +1,59 @@
+from pathlib import Path
+
+import pytest
+
+from sweeper.core.collector import collect, refine
+from sweeper.core.estimate import estimate_tree
+from sweeper.core.rules import Rule
+from sweeper.core.walker import CancelToken, walk_tree
+
+
+def _wide_tree(root: Path, dirs: int = 40, depth: int = 3) -> None:
+    for i in range(dirs):
+        d = root.joinpath(*(f"d{i}_{k}" for k in range(1 + i % depth)))
+        d.mkdir(parents=True)
+        for j in range(1 + i % 4):
+            (d / f"f{j}").write_bytes(b"x" * (1000 * (j + 1)))
+
+
+def test_small_tree_is_exact(tmp_path: Path):
+    _wide_tree(tmp_path, dirs=8)
+    est, stats = estimate_tree(tmp_path)
+    assert est.exact and est.size == walk_tree(tmp_path).size == stats.size
+    assert (est.low, est.high) == (est.size, est.size)
+
+
+def test_interval_decides_min_size(tmp_path: Path):
+    for k in range(12):
+        _wide_tree(tmp_path / f"g{k}")
+    true = walk_tree(tmp_path).size
+    for seed in range(5):
+        low, _ = estimate_tree(tmp_path, min_size=true // 10, seed=seed)
+        high, _ = estimate_tree(tmp_path, min_size=true * 10, seed=seed)
+        assert low.decided(true // 10) and low.low >= true // 10
+        assert high.decided(true * 10) and high.high < true * 10
+
+
+def test_collect_estimate_then_refine(tmp_path: Path):
+    for k in range(12):
+        _wide_tree(tmp_path / "big" / f"g{k}")
+    _wide_tree(tmp_path / "small", dirs=4)
+    rules = [Rule("big", tmp_path / "big", min_size=1),
+             Rule("small", tmp_path / "small", min_size=1)]
+    rough = collect(rules, include={"safe"}, estimate=True)
+    assert {c.rule.label for c in rough} == {"big", "small"}
+    assert all(c.estimate is not None for c in rough)
+    exact = refine(rough)
+    assert [c.rule for c in exact] == [c.rule for c in rough]
+    for c in exact:
+        assert c.size == walk_tree(c.path).size
+        assert c.estimate is None or c.estimate.exact
+
+
+def test_refine_raises_when_cancelled(tmp_path: Path):
+    _wide_tree(tmp_path / "small", dirs=4)
+    rough = collect([Rule("small", tmp_path / "small")], include={"safe"}, estimate=True)
+    cancel = CancelToken()
+    cancel.cancel()
+    with pytest.raises(RuntimeError, match="cancelled"):
+        refine(rough, cancel=cancel)
@@ -0,0 +1,43 @@
+import time
+
+import pytest
+
+pytest.importorskip("PySide6")
+
+from PySide6.QtCore import Qt
+
+from sweeper.core.agehist import DAY, AgeHistogram
+from sweeper.core.rules import Candidate, Rule
+from sweeper.gui.mainwindow import CandidateModel
+
+ROWS = 200_000
+
+
+def _candidates(n: int) -> list[Candidate]:
+    now = time.time()
+    rules = [Rule(f"rule{i}", f"/r{i}", min_size=300) for i in range(50)]
+    cands = []
+    for i in range(n):
+        hist = AgeHistogram(now)
+        for k in range(8):  # a few distinct days per root
+            hist.add(now - (i % 97 + k * 13) * DAY - 1, 40 * (i % 31 + 1))
+        hist.compact()
+        r = rules[i % len(rules)]
+        cands.append(Candidate(r, f"/r{i}", hist.older_than(0), hist=hist))
+    return cands
+
+
+def test_model_scales_and_keeps_sort_over_min_age():
+    model = CandidateModel(_candidates(ROWS))
+    assert model.rowCount() == ROWS
+    model.sort(1, Qt.DescendingOrder)
+    model.toggle_all(True)
+    t0 = time.perf_counter()
+    model.set_min_age(30)
+    assert time.perf_counter() - t0 < 10
+    labels = [model.candidate(r).rule.label.lower() for r in range(model.rowCount())]
+    assert labels == sorted(labels, reverse=True)  # the user's sort survived
+    assert 0 < model.rowCount() < ROWS  # young roots fell below min_size
+    assert model.selected_bytes == sum(model.size_of(c) for c in model.selected())
+    model.set_min_age(None)
+    assert model.rowCount() == ROWS
@@ -0,0 +1,91 @@
+import os
+import shutil
+import time
+from pathlib import Path
+
+from sweeper.core.index import ScanIndex
+from sweeper.core.walker import walk_tree
+
+
+def _populate(root: Path) -> None:
+    for i in range(3):
+        d = root / f"d{i}" / "sub"
+        d.mkdir(parents=True)
+        for j in range(4):
+            f = d / f"f{j}.bin"
+            f.write_bytes(b"x" * (10 * i + j + 1))
+            os.utime(f, (1_000_000 * j, 1_000_000 * j))
+
+
+def test_index_matches_plain_walk(tmp_path: Path):
+    root = tmp_path / "root"
+    root.mkdir()
+    _populate(root)
+    cutoff = 2_500_000.0
+    with ScanIndex(tmp_path / "index.sqlite3") as index:
+        first = walk_tree(root, cutoff=cutoff, index=index)
+        index.flush()
+        again = walk_tree(root, cutoff=cutoff, index=index)
+        older = walk_tree(root, cutoff=1_500_000.0, index=index)
+    assert first.cached == 0 and again.cached == 7
+    for got, ref in ((first, walk_tree(root, cutoff=cutoff)),
+                     (again, walk_tree(root, cutoff=cutoff)),
+                     (older, walk_tree(root, cutoff=1_500_000.0))):
+        assert (got.size, got.files, got.dirs) == (ref.size, ref.files, ref.dirs)
+
+
+def test_index_rescans_changed_dirs(tmp_path: Path):
+    root = tmp_path / "root"
+    root.mkdir()
+    _populate(root)
+    index = ScanIndex(":memory:")
+    walk_tree(root, index=index)
+    sub = root / "d1" / "sub"
+    (sub / "new.bin").write_bytes(b"n" * 500)
+    later = time.time() + 5
+    os.utime(sub, (later, later))
+    st = walk_tree(root, index=index)
+    assert st.size == walk_tree(root).size
+    assert st.cached == 6
+    index.close()
+
+
+def test_index_drops_rows_of_removed_dirs(tmp_path: Path):
+    root = tmp_path / "root"
+    root.mkdir()
+    _populate(root)
+    (root / "d1" / "sub" / "deep").mkdir()
+    (root / "d10").mkdir()  # sorts right after "d1" + os.sep: must survive
+    with ScanIndex(":memory:") as index:
+        walk_tree(root, index=index)
+        assert len(index) == 9
+        shutil.rmtree(root / "d1")
+        (root / "d2").rename(root / "renamed")
+        later = time.time() + 5
+        os.utime(root, (later, later))
+        st = walk_tree(root, index=index)
+        assert st.size == walk_tree(root).size
+        assert len(index) == 6  # root, d0 + sub, d10, renamed + sub
+        other = walk_tree(root, index=index, one_fs=True)  # separate tag
+        assert len(index) == 12 and other.size == st.size
+
+
+def test_index_keeps_one_fs_rows_apart(tmp_path: Path, monkeypatch):
+    from sweeper.core import walker
+    from sweeper.core.collector import collect
+    from sweeper.core.rules import Rule
+
+    root = tmp_path / "root"
+    root.mkdir()
+    _populate(root)
+    mount = (root / "d1").stat().st_ino  # pretend d1 is another filesystem
+    monkeypatch.setattr(walker, "_foreign", lambda st, dev: st.st_ino == mount)
+    full = walk_tree(root)
+    with ScanIndex(tmp_path / "index.sqlite3") as index:
+        local = walk_tree(root, index=index, one_fs=True)
+        index.flush()
+        assert walk_tree(root, index=index).size == full.size
+        (cand,) = collect([Rule("r", root)], include={"safe"}, index=index, one_fs=True)
+        assert cand.size == local.size < full.size
+        (cand,) = collect([Rule("r", root)], include={"safe"}, index=index)
+        assert cand.size == full.size
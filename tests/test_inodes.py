@@ -0,0 +1,16 @@
+from sweeper.core.inodes import InodeSet
+
+
+def test_inode_set_grows_and_dedupes():
+    seen = InodeSet()
+    assert all(seen.add(dev, ino) for dev in (1, 2) for ino in range(5000))
+    assert len(seen) == 10_000 and seen.nbytes() <= 10_000 * 8 * 3
+    assert not any(seen.add(dev, ino) for dev in (1, 2) for ino in range(5000))
+    assert not seen.overflowed
+
+
+def test_inode_set_overflow_over_counts():
+    seen = InodeSet(max_items=10)
+    assert all(seen.add(0, ino) for ino in range(10))
+    assert seen.add(0, 99) and seen.add(0, 99)  # full: reported as new each time
+    assert seen.overflowed and not seen.add(0, 3)
@@ -0,0 +1,64 @@
+import json
+from pathlib import Path
+
+from sweeper.core.report import LogHistogram, aggregate, write_report
+from sweeper.core.rules import Candidate, Rule
+
+
+def test_reports_aggregate_per_rule_and_host(tmp_path: Path):
+    temp, pip = Rule("Temp", tmp_path / "Temp"), Rule("pip, \"cache\"", tmp_path / "pip")
+    paths = []
+    for i in range(20):
+        cands = [Candidate(temp, temp.path, (i + 1) * 1000)]
+        if i % 2:
+            cands.append(Candidate(pip, pip.path, 10**6))
+        p = tmp_path / (f"h{i}.ndjson.gz" if i % 3 else f"h{i}.ndjson")
+        write_report(cands, p, host=f"host{i}", when=1_700_000_000.0 + i)
+        paths.append(p)
+    with open(paths[0], "a", encoding="utf-8") as fh:
+        fh.write("not json\n" + json.dumps({"v": 99, "type": "scan"}) + "\n")
+
+    agg = aggregate(paths, worst=3)
+    assert agg.hosts == 20 and agg.skipped == 2
+    assert agg.size == sum((i + 1) * 1000 for i in range(20)) + 10 * 10**6
+    t, p = agg.rules["Temp"], agg.rules['pip, "cache"']
+    assert (t.candidates, t.size, t.sizes.high) == (20, 210_000, 20_000)
+    assert (p.candidates, p.sizes.percentile(50)) == (10, 10**6)
+    assert [h for _, h, _ in agg.worst_hosts()] == ["host19", "host17", "host15"]
+    assert agg.to_dict()["rules"][0]["rule"] == 'pip, "cache"'
+    assert "host19" in agg.format_table()
+
+
+def test_log_histogram_percentiles_are_close():
+    h = LogHistogram()
+    for v in range(1, 10_001):
+        h.add(v)
+    for p in (50, 90, 99):
+        assert abs(h.percentile(p) - p * 100) <= p * 100 * 0.05
+    assert h.percentile(100) == 10_000 and LogHistogram().percentile(50) == 0
+
+
+def test_record_stream_is_a_report(tmp_path: Path):
+    import io
+
+    from sweeper.core.collector import iter_collect
+    from sweeper.core.report import RecordStream
+
+    (tmp_path / "Temp" / "a").mkdir(parents=True)
+    (tmp_path / "Temp" / "a" / "f.bin").write_bytes(b"x" * 5000)
+    rules = [Rule("Temp", tmp_path / "Temp", min_size=1)]
+    fh = io.StringIO()
+    out = RecordStream(fh, host="h1")
+    cands = []
+    for c in iter_collect(rules, include={"safe"}, progress=out.progress):
+        cands.append(c)
+        out.candidate(c)
+    out.scan(cands, 0.1)
+    recs = [json.loads(line) for line in fh.getvalue().splitlines()]
+    assert [r["type"] for r in recs][-2:] == ["candidate", "scan"]
+    assert {r["type"] for r in recs[:-2]} <= {"progress"}
+
+    report = tmp_path / "h1.ndjson"
+    report.write_text(fh.getvalue(), encoding="utf-8")
+    agg = aggregate([report])
+    assert agg.skipped == 0 and agg.rules["Temp"].size == cands[0].size == agg.size
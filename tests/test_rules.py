@@ -0,0 +1,60 @@
+from pathlib import Path
+
+from sweeper.core import rules
+
+YAML = """
+- label: Scratch
+  path: "{LOCAL}/Scratch"
+  min_size: 10
+  min_age: 3
+- label: Edge Cache
+  path: edge_caches
+"""
+
+
+def _write(tmp_path: Path, monkeypatch) -> Path:
+    monkeypatch.setattr(rules, "RULES_CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(rules, "_loaded", {})
+    y = tmp_path / "rules.yaml"
+    y.write_text(YAML, encoding="utf-8")
+    return y
+
+
+def test_load_rules_parses_yaml(tmp_path: Path, monkeypatch):
+    loaded = rules.load_rules(_write(tmp_path, monkeypatch))
+    scratch, edge = loaded
+    assert scratch.path == rules.LOCAL / "Scratch" and scratch.min_age == 3
+    assert callable(edge.path) and edge.path.__name__ == "edge_caches"
+
+
+def test_warm_start_skips_yaml(tmp_path: Path, monkeypatch):
+    y = _write(tmp_path, monkeypatch)
+    first = rules.load_rules(y)
+    assert list((tmp_path / "cache").glob("rules-*.json"))
+    monkeypatch.setattr(rules, "_loaded", {})
+
+    def no_yaml(path):
+        raise AssertionError("YAML parsed on a warm start")
+
+    monkeypatch.setattr(rules, "_parse_yaml", no_yaml)
+    warm = rules.load_rules(y)
+    assert [r.label for r in warm] == [r.label for r in first]
+    assert rules.load_rules(y) is warm  # memoised until the file changes
+
+
+def test_settings_block(tmp_path: Path, monkeypatch):
+    y = _write(tmp_path, monkeypatch)
+    y.write_text("settings:\n  stat_rate: 100\n  delete_rate: 2G\nrules:\n" + YAML,
+                 encoding="utf-8")
+    assert [r.label for r in rules.load_rules(y)] == ["Scratch", "Edge Cache"]
+    assert rules.load_settings(y) == {"stat_rate": 100, "delete_rate": "2G"}
+    assert rules.parse_size("2G") == 2 * rules.GB and rules.parse_size("1.5 MB") == 3 * 2 ** 19
+
+
+def test_broken_yaml_warns_once_on_stderr(tmp_path: Path, monkeypatch, capsys):
+    y = _write(tmp_path, monkeypatch)
+    y.write_text("- label: [unclosed\n", encoding="utf-8")
+    assert rules.load_rules(y) is rules._BUILTIN_RULES
+    assert rules.load_settings(y) == {}
+    out, err = capsys.readouterr()
+    assert out == "" and err.count("falling back") == 1
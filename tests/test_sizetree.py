@@ -0,0 +1,54 @@
+from pathlib import Path
+
+from sweeper.core.collector import collect
+from sweeper.core.index import ScanIndex
+from sweeper.core.rules import Rule
+from sweeper.core.sizetree import NODE_BYTES, SizeTree
+from sweeper.core.walker import WalkJob, walk_shared, walk_tree
+
+
+def _tree(base: Path) -> Path:
+    for sub, size in [("big/x", 400), ("big/y", 300), ("small", 10), ("", 1)]:
+        d = base / sub
+        d.mkdir(parents=True, exist_ok=True)
+        (d / "blob.bin").write_bytes(b"b" * size)
+    return base
+
+
+def _shape(t: SizeTree) -> dict[str, tuple[int, int]]:
+    return {t.path(i): (t.size[i], t.files[i]) for i in range(len(t))}
+
+
+def test_size_tree_matches_walk(tmp_path: Path):
+    root = _tree(tmp_path)
+    tree = SizeTree(root)
+    st = walk_tree(root, tree=tree)
+    assert tree.size[0] == st.size and tree.files[0] == st.files == 4
+    big, small = tree.children(0)
+    assert tree.name(big) == "big" and tree.name(small) == "small"
+    assert [tree.name(k) for k in tree.children(big)] == ["x", "y"]
+    assert tree.path(tree.children(big)[0]) == str(root / "big" / "x")
+    assert [lvl for lvl, _ in tree.walk(1)] == [1, 1]
+    assert tree.nbytes() <= len(tree) * NODE_BYTES + 16
+
+    with ScanIndex(":memory:") as index:
+        for _ in range(2):  # cold, then answered from the index
+            again = SizeTree(root)
+            walk_tree(root, index=index, tree=again)
+            assert _shape(again) == _shape(tree)
+    shared = WalkJob(root / "big", tree=SizeTree(root / "big"))
+    walk_shared([WalkJob(root), shared])
+    alone = SizeTree(root / "big")
+    walk_tree(root / "big", tree=alone)
+    assert _shape(shared.tree) == _shape(alone)
+
+
+def test_size_tree_budget_and_collect(tmp_path: Path):
+    root = _tree(tmp_path)
+    tree = SizeTree(root, max_nodes=2)
+    st = walk_tree(root, tree=tree)
+    assert tree.truncated and len(tree) == 2 and tree.size[0] == st.size
+
+    cand, = collect([Rule("r", root)], include={"safe"}, tree_nodes=100)
+    assert cand.tree is not None and cand.tree.size[0] == cand.size
+    assert collect([Rule("r", root)], include={"safe"})[0].tree is None
@@ -0,0 +1,69 @@
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from sweeper.core.cleaner import iter_clean
+from sweeper.core.collector import collect
+from sweeper.core.rules import Rule
+from sweeper.core.stats import SweepStats
+from sweeper.core.throttle import Limits, TokenBucket
+from sweeper.core.walker import CancelToken
+
+
+def _tree(root: Path, dirs: int = 10, files: int = 10) -> None:
+    for i in range(dirs):
+        d = root / f"d{i}"
+        d.mkdir(parents=True)
+        for j in range(files):
+            (d / f"f{j}").write_bytes(b"x" * 10)
+
+
+def test_bucket_rate_is_shared_across_threads():
+    bucket = TokenBucket(200, burst=10)
+    t0 = time.monotonic()
+    threads = [threading.Thread(target=lambda: [bucket.take(1) for _ in range(25)])
+               for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.monotonic() - t0
+    assert 0.4 <= elapsed < 2.0  # (100 - 10 burst) / 200 per second
+    assert bucket.waited > 0
+
+
+def test_bucket_sleep_ends_on_cancel():
+    bucket = TokenBucket(1, burst=1)
+    cancel = CancelToken()
+    threading.Timer(0.05, cancel.cancel).start()
+    t0 = time.monotonic()
+    bucket.take(100, cancel)
+    assert time.monotonic() - t0 < 5
+
+
+def test_scan_and_clean_are_throttled(tmp_path: Path):
+    _tree(tmp_path / "cache")
+    limits = Limits.from_settings({"stat_rate": 500, "unlink_rate": 500,
+                                   "delete_rate": "1K"})
+    assert limits.delete_rate == 1024
+    stats = SweepStats()
+    t0 = time.monotonic()
+    cand, = collect([Rule("cache", tmp_path / "cache")], include={"safe"}, stats=stats,
+                    throttle=limits.throttle())
+    assert time.monotonic() - t0 >= 0.1  # ~110 stat calls at 500/s, 50 burst
+    assert stats.rule("cache").throttled > 0
+
+    (res,) = iter_clean([cand], throttle=limits.throttle(), stats=stats)
+    assert res.files == 100 and res.throttled > 0.5  # 1000 bytes at 1K/s
+    assert "throttled" in stats.format_table()
+    assert Limits().throttle() is None
+
+
+def test_limits_reject_bad_settings():
+    assert Limits.from_settings({"delete_rate": "50M"}).delete_rate == 50 * 1024 ** 2
+    for bad in ({"stat_rate": 0}, {"unlink_rate": -5}, {"stat_rate": "fast"},
+                {"delete_rate": "lots"}, {"delete_rate": 0}):
+        with pytest.raises(ValueError, match=next(iter(bad))):
+            Limits.from_settings(bad)
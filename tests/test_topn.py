@@ -0,0 +1,71 @@
+import os
+import random
+from pathlib import Path
+
+from sweeper.core.collector import collect
+from sweeper.core.index import ScanIndex
+from sweeper.core.rules import Rule
+from sweeper.core.topn import TopN
+from sweeper.core.walker import WalkJob, walk_shared, walk_tree
+
+
+def _random_tree(root: Path, seed: int = 1) -> None:
+    rng = random.Random(seed)
+    dirs = [root]
+    for i in range(60):
+        d = rng.choice(dirs) / f"d{i}"
+        d.mkdir()
+        dirs.append(d)
+    for i in range(200):
+        (rng.choice(dirs) / f"f{i}.bin").write_bytes(b"x" * rng.randrange(1, 5000))
+
+
+def _expected(root: Path, n: int):
+    files = sorted(((p.stat().st_size, str(p)) for p in root.rglob("*") if p.is_file()),
+                   reverse=True)[:n]
+    dirs = []
+    for d in root.iterdir():
+        if d.is_dir():
+            total = d.stat().st_size + sum(p.stat().st_size for p in d.rglob("*"))
+            dirs.append((total, str(d)))
+    return files, sorted(dirs, reverse=True)[:n]
+
+
+def test_top_n_matches_brute_force(tmp_path: Path):
+    _random_tree(tmp_path)
+    want = _expected(tmp_path, 5)
+    top = TopN(5)
+    walk_tree(tmp_path, top=top)
+    assert (top.files, top.dirs) == want
+
+    with ScanIndex(":memory:") as index:
+        for _ in range(2):  # the warm run must still see every file
+            top = TopN(5)
+            walk_tree(tmp_path, index=index, top=top)
+            assert (top.files, top.dirs) == want
+    inner = next(d for d in sorted(tmp_path.iterdir()) if d.is_dir())
+    jobs = [WalkJob(tmp_path, top=TopN(5)), WalkJob(inner, top=TopN(5))]
+    walk_shared(jobs)
+    assert (jobs[0].top.files, jobs[0].top.dirs) == want
+    assert (jobs[1].top.files, jobs[1].top.dirs) == _expected(inner, 5)
+
+
+def test_collect_top_n(tmp_path: Path):
+    (tmp_path / "a").mkdir()
+    for i, size in enumerate([10, 300, 20]):
+        (tmp_path / "a" / f"f{i}").write_bytes(b"x" * size)
+    cand, = collect([Rule("r", tmp_path)], include={"safe"}, top_n=2)
+    assert [s for s, _ in cand.top.files] == [300, 20]
+    assert cand.top.dirs == [(cand.size, os.path.join(str(tmp_path), "a"))]
+
+
+def test_refine_fills_top_n_on_demand(tmp_path: Path):
+    from sweeper.core.collector import refine
+
+    (tmp_path / "a").mkdir()
+    for i, size in enumerate([10, 300, 20]):
+        (tmp_path / "a" / f"f{i}").write_bytes(b"x" * size)
+    cand, = collect([Rule("r", tmp_path)], include={"safe"})
+    assert cand.top is None
+    (again,) = refine([cand], top_n=2)
+    assert again.rule is cand.rule and [s for s, _ in again.top.files] == [300, 20]
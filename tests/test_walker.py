@@ -0,0 +1,194 @@
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from sweeper.core.index import ScanIndex
+from sweeper.core.inodes import InodeSet
+from sweeper.core.walker import PathFilter, WalkJob, group_jobs, walk_shared, walk_tree
+
+
+def test_walk_tree_counts(tmp_path: Path):
+    (tmp_path / "a").mkdir()
+    (tmp_path / "a" / "one.bin").write_bytes(b"x" * 100)
+    (tmp_path / "two.bin").write_bytes(b"y" * 50)
+    st = walk_tree(tmp_path)
+    assert (st.files, st.dirs, st.errors) == (2, 1, 0)
+    assert st.size == 150 + (tmp_path / "a").stat().st_size
+
+
+def test_walk_tree_cutoff_and_missing(tmp_path: Path):
+    old = tmp_path / "old.bin"
+    old.write_bytes(b"o" * 10)
+    os.utime(old, (0, 0))
+    (tmp_path / "new.bin").write_bytes(b"n" * 20)
+    assert walk_tree(tmp_path, cutoff=time.time() - 60).size == 10
+    assert walk_tree(tmp_path / "nope").size == 0
+    assert walk_tree(old).size == 10
+
+
+def test_walk_tree_skips_symlinked_dirs(tmp_path: Path):
+    target = tmp_path / "target"
+    target.mkdir()
+    (target / "f.bin").write_bytes(b"z" * 10)
+    root = tmp_path / "root"
+    root.mkdir()
+    try:
+        (root / "link").symlink_to(target, target_is_directory=True)
+    except OSError:
+        pytest.skip("symlinks not supported")
+    st = walk_tree(root)
+    assert st.dirs == 0 and st.files == 1
+
+
+def test_walk_tree_filters(tmp_path: Path):
+    (tmp_path / "keep.tmp").write_bytes(b"k" * 10)
+    (tmp_path / "skip.lock").write_bytes(b"s" * 20)
+    (tmp_path / "node_modules").mkdir()
+    (tmp_path / "node_modules" / "dep.tmp").write_bytes(b"d" * 40)
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "deep.tmp").write_bytes(b"x" * 80)
+    (tmp_path / "sub" / "deep.log").write_bytes(b"l" * 160)
+    filt = PathFilter(include=["*.tmp", "sub/*.log"], exclude=["*.lock"],
+                      prune=["node_modules"])
+    st = walk_tree(tmp_path, filters=filt)
+    assert st.size == 10 + 80 + 160 and st.dirs == 1 and st.files == 4
+
+    with ScanIndex(":memory:") as index:
+        cold = walk_tree(tmp_path, filters=filt, index=index)
+        warm = walk_tree(tmp_path, filters=filt, index=index)
+        other = walk_tree(tmp_path, index=index)  # unfiltered rows are separate
+    assert (cold.size, cold.files) == (warm.size, warm.files) == (st.size, st.files)
+    assert warm.cached == 2 and other.cached == 0
+
+
+def test_walk_shared_matches_separate_walks(tmp_path: Path):
+    for i, sub in enumerate(["a", "a/b", "a/b/c", "a/d", "e"]):
+        d = tmp_path / sub
+        d.mkdir(parents=True)
+        (d / f"f{i}.tmp").write_bytes(b"x" * (10 << i))
+        (d / f"g{i}.log").write_bytes(b"y" * (7 << i))
+        os.utime(d / f"g{i}.log", (0, 0))
+    cutoff = time.time() - 60
+    specs = [
+        (tmp_path, None, None),
+        (tmp_path / "a", cutoff, None),
+        (tmp_path / "a" / "b", None, PathFilter(include=["*.log"])),
+        (tmp_path / "a" / "b", cutoff, None),
+        (tmp_path / "a" / "b" / "c", None, None),
+        (tmp_path / "a" / "d", None, None),
+        (tmp_path / "nope", None, None),
+    ]
+    wide = PathFilter(prune=["b"])  # pruned for the outer root, nested roots still sized
+    specs.append((tmp_path / "a", None, wide))
+    jobs = [WalkJob(p, cutoff=c, filters=f) for p, c, f in specs]
+    assert len(group_jobs(jobs)) == 1
+    with ScanIndex(":memory:") as index:
+        for idx in (None, index, index):
+            walk_shared(jobs, index=idx)
+            for (p, c, f), job in zip(specs, jobs):
+                alone = walk_tree(p, cutoff=c, filters=f)
+                got = job.stats
+                assert (got.size, got.files, got.dirs, got.skipped, got.errors) == \
+                       (alone.size, alone.files, alone.dirs, alone.skipped, alone.errors), p
+        assert jobs[0].stats.cached  # third pass answered from the index
+
+
+def test_walk_tree_counts_hard_links_once(tmp_path: Path):
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    blob = tmp_path / "a" / "blob.bin"
+    blob.write_bytes(b"x" * 5000)
+    try:
+        os.link(blob, tmp_path / "b" / "blob.bin")
+        os.link(blob, tmp_path / "b" / "again.bin")
+    except OSError:
+        pytest.skip("hard links not supported")
+    (tmp_path / "b" / "own.bin").write_bytes(b"y" * 100)
+    dirs = sum((tmp_path / d).stat().st_size for d in "ab")
+
+    naive = walk_tree(tmp_path)
+    assert naive.size == 3 * 5000 + 100 + dirs and naive.alloc == 0
+    st = walk_tree(tmp_path, links=InodeSet())
+    assert st.size == 5000 + 100 + dirs and st.linked == 2 * 5000
+    assert st.files == 4 and st.alloc > 0
+    with ScanIndex(":memory:") as index:
+        walk_tree(tmp_path, index=index)  # plain rows must not be reused
+        assert walk_tree(tmp_path, index=index, links=InodeSet()).size == st.size
+    job = WalkJob(tmp_path, links=InodeSet())
+    inner = WalkJob(tmp_path / "b", links=InodeSet())
+    walk_shared([job, inner])
+    assert (job.stats.size, job.stats.alloc) == (st.size, st.alloc)
+    assert inner.stats.size == 5000 + 100
+    assert walk_tree(tmp_path, links=InodeSet(), one_fs=True).size == st.size
+
+
+def test_parallel_walk_matches_serial(tmp_path: Path):
+    from sweeper.core.agehist import AgeHistogram
+
+    for i in range(6):
+        d = tmp_path / f"d{i}" / "sub" / "deeper"
+        d.mkdir(parents=True)
+        for j in range(5):
+            f = d.parent / f"f{j}.tmp"
+            f.write_bytes(b"x" * (i * 10 + j))
+            os.utime(f, (0, 0) if j % 2 else None)
+            (d / f"g{j}.log").write_bytes(b"y" * j)
+    (tmp_path / "d0" / "node_modules").mkdir()
+    (tmp_path / "d0" / "node_modules" / "dep.tmp").write_bytes(b"d" * 40)
+    filt = PathFilter(include=["*.tmp"], prune=["node_modules"])
+    now = time.time()
+
+    def fields(st):
+        return (st.size, st.files, st.dirs, st.errors, st.stat_calls, st.skipped)
+
+    for kw in ({}, {"filters": filt}, {"cutoff": now - 60}):
+        serial_hist = AgeHistogram(now)
+        serial = walk_tree(tmp_path, threads=1, hist=serial_hist, **kw)
+        for after in (0, 7):
+            par_hist = AgeHistogram(now)
+            par = walk_tree(tmp_path, threads=4, parallel_after=after, hist=par_hist, **kw)
+            assert fields(par) == fields(serial)
+            assert par_hist.buckets == serial_hist.buckets
+        with ScanIndex(":memory:") as index:
+            cold = walk_tree(tmp_path, index=index, threads=4, parallel_after=0, **kw)
+            warm = walk_tree(tmp_path, index=index, threads=4, parallel_after=0, **kw)
+        assert cold.size == warm.size == serial.size
+        assert warm.files == serial.files and warm.cached == serial.dirs + 1
+
+
+def test_tree_keeping_walk_goes_parallel(tmp_path: Path, monkeypatch):
+    from sweeper.core import walker
+    from sweeper.core.sizetree import SizeTree
+
+    for i in range(40):  # wide: the breakdown tree must not force a serial walk
+        d = tmp_path / f"w{i}" / "inner"
+        d.mkdir(parents=True)
+        (d / "f.bin").write_bytes(b"x" * (i + 1))
+        (d.parent / "g.bin").write_bytes(b"y" * 7)
+        os.utime(d.parent / "g.bin", (0, 0) if i % 3 else None)
+    fanned = []
+    real = walker._walk_parallel
+    monkeypatch.setattr(walker, "_walk_parallel",
+                        lambda *a: fanned.append(1) or real(*a))
+
+    def sizes(tree):
+        return {tree.path(n): (tree.size[n], tree.files[n]) for n in range(len(tree))}
+
+    for kw in ({}, {"cutoff": time.time() - 60}):
+        serial = SizeTree(tmp_path)
+        walk_tree(tmp_path, tree=serial, threads=1, **kw)
+        with ScanIndex(":memory:") as index:
+            for _ in ("cold", "warm"):
+                fanned.clear()
+                tree = SizeTree(tmp_path)
+                st = walk_tree(tmp_path, tree=tree, index=index, threads=4,
+                               parallel_after=5, **kw)
+                assert fanned and sizes(tree) == sizes(serial)
+                assert tree.size[0] == st.size
+        fanned.clear()
+        monkeypatch.setattr(walker, "PARALLEL_THRESHOLD", 5)
+        job = WalkJob(tmp_path, tree=SizeTree(tmp_path), **kw)
+        walk_shared([job], threads=4)  # what collect() runs for a GUI scan
+        assert fanned and sizes(job.tree) == sizes(serial)
@@ -0,0 +1,83 @@
+import time
+from pathlib import Path
+
+from sweeper.core.agehist import load_snapshot
+from sweeper.core.rules import Rule
+from sweeper.core.walker import walk_tree
+from sweeper.core.watch import Watcher, query
+
+
+def _tree(root: Path, dirs: int = 10) -> None:
+    for i in range(dirs):
+        d = root / f"d{i}"
+        d.mkdir(parents=True)
+        (d / "f.bin").write_bytes(b"x" * 1000)
+
+
+def test_refresh_is_incremental_and_published(tmp_path: Path):
+    local = tmp_path / "LOCAL"
+    _tree(local / "Temp")
+    _tree(local / "pip", dirs=3)
+    rules = [Rule("Temp", local / "Temp", min_size=1), Rule("pip", local / "pip")]
+    snap = tmp_path / "last_scan.json"
+    w = Watcher(rules, snapshot=snap)
+    try:
+        assert query(w.serve()) is None  # nothing until the first pass
+        first = {c.rule.label: c.size for c in w.refresh()}
+        assert first["Temp"] == walk_tree(local / "Temp").size
+        assert w.stats.rule("Temp").cached == 0
+
+        (local / "Temp" / "d3" / "new.bin").write_bytes(b"n" * 500)
+        second = {c.rule.label: c.size for c in w.refresh()}
+        assert second["Temp"] == first["Temp"] + 500
+        assert second["pip"] == first["pip"]
+        assert w.stats.rule("Temp").cached == 10  # only d3 was listed again
+
+        port = w._server.server_address[1]
+        when, cands = query(port)
+        assert when == w.when and {c.rule.label: c.size for c in cands} == second
+        when, cands = load_snapshot(snap)
+        assert when == w.when and {c.rule.label: c.size for c in cands} == second
+    finally:
+        w.close()
+
+
+def test_index_is_rebuilt_periodically(tmp_path: Path):
+    _tree(tmp_path / "Temp", dirs=3)
+    rules = [Rule("Temp", tmp_path / "Temp")]
+    for rebuild, cached in ((None, 4), (0.0, 0)):  # 3 dirs + the root
+        w = Watcher(rules, snapshot=None, rebuild=rebuild)
+        try:
+            first = w.refresh()[0].size
+            f = tmp_path / "Temp" / "d1" / "f.bin"
+            mtime = (tmp_path / "Temp" / "d1").stat().st_mtime_ns
+            f.write_bytes(b"y" * 3000)  # rewritten in place: d1 keeps its mtime
+            assert (tmp_path / "Temp" / "d1").stat().st_mtime_ns == mtime
+            second = w.refresh()[0].size
+            assert w.stats.rule("Temp").cached == cached
+            assert second == (first if rebuild is None else first + 2000)
+            f.write_bytes(b"x" * 1000)
+        finally:
+            w.close()
+
+
+def test_auto_clean_fires_at_threshold(tmp_path: Path):
+    _tree(tmp_path / "Temp")
+    _tree(tmp_path / "Keep")
+    rules = [Rule("Temp", tmp_path / "Temp"), Rule("Keep", tmp_path / "Keep")]
+    w = Watcher(rules, snapshot=None, auto_clean={"Temp": 5000, "Keep": 10 ** 9},
+                interval=0.01)
+    refreshes = []
+
+    def on_refresh(w: Watcher) -> None:
+        refreshes.append({c.rule.label: c.size for c in w.candidates})
+        if len(refreshes) == 2:
+            w.stop()
+
+    t0 = time.monotonic()
+    w.run(on_refresh)
+    w.close()
+    assert time.monotonic() - t0 < 10
+    assert not (tmp_path / "Temp").exists() and (tmp_path / "Keep").exists()
+    assert refreshes[0]["Temp"] == 0 and refreshes[0]["Keep"] > 10_000
+    assert w.cleaned == []  # nothing left to clean on the second pass